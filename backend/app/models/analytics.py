@@ -26,9 +26,11 @@ class CallAnalytics:
         call_type: str = "standard",
         outcome: str = "completed",
         response_time: Optional[int] = None,
-        team_member_id: Optional[str] = None
+        team_member_id: Optional[str] = None,
+        timestamp: Optional[datetime] = None
     ):
-        """Record a call for analytics"""
+        """Record a call for analytics (timestamp defaults to now, replays pass the original)"""
+        timestamp = timestamp or datetime.utcnow()
         self.total_calls += 1
         self.call_duration_total += duration
         
@@ -51,13 +53,13 @@ class CallAnalytics:
                 )
         
         # Update daily stats
-        today = datetime.utcnow().date().isoformat()
+        today = timestamp.date().isoformat()
         self.daily_stats[today]["calls"] += 1
         if is_emergency:
             self.daily_stats[today]["emergencies"] += 1
         self.daily_stats[today]["duration"] += duration
         
-        self.last_updated = datetime.utcnow()
+        self.last_updated = timestamp
         
     def get_summary(self) -> Dict[str, Any]:
         """Get analytics summary"""
@@ -97,6 +99,39 @@ class CallAnalytics:
         # For now, return a placeholder
         return {str(hour): 0 for hour in range(24)}
         
+    def to_state(self) -> Dict[str, Any]:
+        """Plain-container copy of all counters, safe to pickle (unlike the defaultdict factories)"""
+        return {
+            "id": self.id,
+            "total_calls": self.total_calls,
+            "emergency_calls": self.emergency_calls,
+            "call_duration_total": self.call_duration_total,
+            "response_times": list(self.response_times),
+            "call_types": dict(self.call_types),
+            "call_outcomes": dict(self.call_outcomes),
+            "daily_stats": {day: dict(stats) for day, stats in self.daily_stats.items()},
+            "team_performance": {member: dict(stats) for member, stats in self.team_performance.items()},
+            "created_at": self.created_at,
+            "last_updated": self.last_updated
+        }
+        
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "CallAnalytics":
+        """Rebuild an instance from to_state() output"""
+        analytics = cls()
+        analytics.id = state["id"]
+        analytics.total_calls = state["total_calls"]
+        analytics.emergency_calls = state["emergency_calls"]
+        analytics.call_duration_total = state["call_duration_total"]
+        analytics.response_times = list(state["response_times"])
+        analytics.call_types.update(state["call_types"])
+        analytics.call_outcomes.update(state["call_outcomes"])
+        analytics.daily_stats.update({day: dict(stats) for day, stats in state["daily_stats"].items()})
+        analytics.team_performance.update({member: dict(stats) for member, stats in state["team_performance"].items()})
+        analytics.created_at = state["created_at"]
+        analytics.last_updated = state["last_updated"]
+        return analytics
+        
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for JSON serialization"""
         return {
@@ -0,0 +1,33 @@
+from abc import ABC, abstractmethod
+from typing import Any, Dict
+
+
+class SlottedModel(ABC):
+    """
+    Base for in-memory models kept by the thousands
+
+    Subclasses declare __slots__ (no per-instance __dict__) and implement
+    _build_dict(). to_dict() builds the serialized form once and serves
+    copies of it until any attribute is assigned; in-place changes to
+    list/dict attributes must call _invalidate().
+    """
+    __slots__ = ("_cached_dict",)
+
+    def __setattr__(self, name: str, value: Any):
+        object.__setattr__(self, name, value)
+        object.__setattr__(self, "_cached_dict", None)
+
+    def _invalidate(self):
+        object.__setattr__(self, "_cached_dict", None)
+
+    @abstractmethod
+    def _build_dict(self) -> Dict[str, Any]:
+        """Serialized form of the model, cached by to_dict()"""
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary for JSON serialization"""
+        cached = self._cached_dict
+        if cached is None:
+            cached = self._build_dict()
+            object.__setattr__(self, "_cached_dict", cached)
+        return dict(cached)
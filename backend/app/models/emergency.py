@@ -2,6 +2,7 @@ from datetime import datetime
 from typing import Optional, Dict, Any
 from enum import Enum
 import uuid
+from .base import SlottedModel
 
 
 class EmergencyType(str, Enum):
@@ -27,7 +28,13 @@ class EmergencyStatus(str, Enum):
     FALSE_ALARM = "false_alarm"
 
 
-class EmergencyCall:
+class EmergencyCall(SlottedModel):
+    __slots__ = (
+        "id", "call_sid", "emergency_type", "priority", "caller_location", "caller_phone",
+        "description", "assigned_team_member", "status", "created_at", "updated_at",
+        "resolution_notes", "escalation_level"
+    )
+    
     def __init__(
         self,
         call_sid: str,
@@ -81,8 +88,7 @@ class EmergencyCall:
         self.status = EmergencyStatus.FALSE_ALARM
         self.updated_at = datetime.utcnow()
         
-    def to_dict(self) -> Dict[str, Any]:
-        """Convert to dictionary for JSON serialization"""
+    def _build_dict(self) -> Dict[str, Any]:
         return {
             "id": self.id,
             "call_sid": self.call_sid,
@@ -1,7 +1,17 @@
-from datetime import datetime
-from typing import Dict, List, Any, Optional
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Dict, List, Any, Optional, Tuple
 from enum import Enum
+from itertools import count, islice
+import bisect
+import threading
+import time
 import uuid
+from backend.utils.metrics_registry import metrics
+from .base import SlottedModel
+
+# Notifications still waiting to be sent, kept current by status transitions
+notification_queue_depth = metrics.gauge("notification_queue_depth", "Notifications waiting to be sent (pending)")
 
 
 class NotificationType(str, Enum):
@@ -35,7 +45,13 @@ class NotificationStatus(str, Enum):
     FAILED = "failed"
 
 
-class Notification:
+class Notification(SlottedModel):
+    __slots__ = (
+        "id", "recipient_id", "title", "message", "notification_type", "priority", "channels",
+        "data", "status", "created_at", "sent_at", "delivered_at", "read_at", "retry_count",
+        "max_retries", "error_message", "_manager", "_created_key"
+    )
+    
     def __init__(
         self,
         recipient_id: str,
@@ -55,6 +71,7 @@ class Notification:
         self.channels = channels or [NotificationChannel.IN_APP]
         self.data = data or {}
         self.status = NotificationStatus.PENDING
+        notification_queue_depth.inc()
         self.created_at = datetime.utcnow()
         self.sent_at: Optional[datetime] = None
         self.delivered_at: Optional[datetime] = None
@@ -62,34 +79,43 @@ class Notification:
         self.retry_count = 0
         self.max_retries = 3
         self.error_message: Optional[str] = None
+        self._manager: Optional["NotificationManager"] = None  # Set while stored, to keep its indexes current
+        self._created_key: Optional[float] = None  # created_at as the manager's sort key, set while stored
+        
+    def _set_status(self, status: NotificationStatus):
+        previous = self.status
+        if previous == NotificationStatus.PENDING:
+            notification_queue_depth.dec()
+        self.status = status
+        if self._manager is not None and previous != status:
+            self._manager._status_changed(self, previous)
         
     def mark_sent(self):
         """Mark notification as sent"""
-        self.status = NotificationStatus.SENT
+        self._set_status(NotificationStatus.SENT)
         self.sent_at = datetime.utcnow()
         
     def mark_delivered(self):
         """Mark notification as delivered"""
-        self.status = NotificationStatus.DELIVERED
+        self._set_status(NotificationStatus.DELIVERED)
         self.delivered_at = datetime.utcnow()
         
     def mark_read(self):
         """Mark notification as read"""
-        self.status = NotificationStatus.READ
+        self._set_status(NotificationStatus.READ)
         self.read_at = datetime.utcnow()
         
     def mark_failed(self, error_message: str):
         """Mark notification as failed"""
-        self.status = NotificationStatus.FAILED
         self.error_message = error_message
         self.retry_count += 1
+        self._set_status(NotificationStatus.FAILED)
         
     def can_retry(self) -> bool:
         """Check if notification can be retried"""
         return self.retry_count < self.max_retries and self.status == NotificationStatus.FAILED
         
-    def to_dict(self) -> Dict[str, Any]:
-        """Convert to dictionary for JSON serialization"""
+    def _build_dict(self) -> Dict[str, Any]:
         return {
             "id": self.id,
             "recipient_id": self.recipient_id,
@@ -108,12 +134,190 @@ class Notification:
             "error_message": self.error_message
         }
 
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Notification":
+        """Rebuild a notification from to_dict() output (e.g. a stored outbox row)"""
+        notification = cls(
+            recipient_id=data["recipient_id"],
+            title=data["title"],
+            message=data["message"],
+            notification_type=NotificationType(data["notification_type"]),
+            priority=NotificationPriority(data["priority"]),
+            channels=[NotificationChannel(channel) for channel in data["channels"]],
+            data=data.get("data")
+        )
+        notification.id = data["id"]
+        notification.created_at = datetime.fromisoformat(data["created_at"])
+        for field in ("sent_at", "delivered_at", "read_at"):
+            if data.get(field):
+                setattr(notification, field, datetime.fromisoformat(data[field]))
+        notification.retry_count = data.get("retry_count", 0)
+        notification.error_message = data.get("error_message")
+        status = NotificationStatus(data.get("status", NotificationStatus.PENDING.value))
+        if status != NotificationStatus.PENDING:
+            notification._set_status(status)
+        return notification
+
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _sort_time(created_at: datetime) -> float:
+    # Float keys compare much faster than datetimes inside tuples
+    return (created_at - _EPOCH).total_seconds()
+
+
+def _insert_ordered(entries: list, entry: tuple):
+    # Notifications mostly arrive in creation order, so most inserts are appends
+    if not entries or entry >= entries[-1]:
+        entries.append(entry)
+    else:
+        bisect.insort(entries, entry)
+
+
+def _discard_ordered(entries: list, entry: tuple):
+    i = bisect.bisect_left(entries, entry)
+    if i < len(entries) and entries[i] == entry:
+        del entries[i]
+
 
 class NotificationManager:
-    def __init__(self):
-        self.notifications: List[Notification] = []
+    """
+    Indexed in-memory notification store
+
+    Notifications are kept in arrival order in an id map, and indexed per
+    recipient (all and unread, as (created_at, id, notification) lists,
+    oldest first) and per status, so lookups, a user's newest k
+    notifications and the pending/failed lists cost O(1) or O(k) instead of
+    a scan of every notification. Notifications report their status changes
+    back to the manager that stores them.
+
+    Arrival order is not creation order (the outbox relay re-adds older
+    notifications), so the recipient lists and the expiry list are kept
+    sorted by created_at: appends in the usual case, a bisect insert for a
+    late arrival. Expired notifications that are still pending are set
+    aside and return to the expiry list when their status changes, so a
+    cleanup only touches what it can remove.
+
+    Args:
+        retention_days: When set, sent/delivered/read/failed notifications
+            older than this are dropped as new ones arrive (checked at most
+            once a minute); pending ones are always kept
+    """
+
+    EXPIRY_CHECK_SECONDS = 60
+
+    def __init__(self, retention_days: Optional[int] = None):
+        self._by_id: Dict[str, Notification] = {}
+        self._by_recipient: Dict[str, List[Tuple[float, str, "Notification"]]] = {}
+        self._unread_by_recipient: Dict[str, List[Tuple[float, str, "Notification"]]] = {}
+        self._by_status: Dict[NotificationStatus, Dict[str, Notification]] = {status: {} for status in NotificationStatus}
+        self.type_counts: Counter = Counter()
+        self.priority_counts: Counter = Counter()
+        self.retention_days = retention_days
+        self._next_expiry_check = 0.0
+        self._expiry: List[tuple] = []  # (created_at, seq, notification), oldest first
+        self._expiry_seq = count()
+        self._expired_pending: Dict[str, Notification] = {}  # Past a cutoff, kept until no longer pending
+        self._lock = threading.RLock()  # Bulk sends change statuses from worker threads
         self.templates = self._initialize_templates()
         
+    @property
+    def notifications(self) -> List[Notification]:
+        """Every stored notification, in arrival order (a copy)"""
+        return list(self._by_id.values())
+        
+    def __len__(self) -> int:
+        return len(self._by_id)
+        
+    def add(self, notification: Notification) -> Notification:
+        """Store a notification and index it (replacing a stored one with the same id)"""
+        with self._lock:
+            replaced = self._by_id.get(notification.id)
+            if replaced is notification:
+                return notification
+            if replaced is not None:
+                self._remove_all([replaced])
+            self._by_id[notification.id] = notification
+            object.__setattr__(notification, "_created_key", _sort_time(notification.created_at))
+            entry = (notification._created_key, notification.id, notification)
+            _insert_ordered(self._by_recipient.setdefault(notification.recipient_id, []), entry)
+            if notification.status != NotificationStatus.READ:
+                _insert_ordered(self._unread_by_recipient.setdefault(notification.recipient_id, []), entry)
+            self._by_status[notification.status][notification.id] = notification
+            self.type_counts[notification.notification_type] += 1
+            self.priority_counts[notification.priority] += 1
+            _insert_ordered(self._expiry, (notification._created_key, next(self._expiry_seq), notification))
+            object.__setattr__(notification, "_manager", self)
+        if self.retention_days is not None and time.monotonic() >= self._next_expiry_check:
+            self._next_expiry_check = time.monotonic() + self.EXPIRY_CHECK_SECONDS
+            self.cleanup_old_notifications(self.retention_days)
+        return notification
+        
+    def _remove_all(self, notifications: List[Notification]):
+        removed_ids = set()
+        newest_removed: Dict[str, tuple] = {}  # Per recipient
+        for notification in notifications:
+            del self._by_id[notification.id]
+            self._by_status[notification.status].pop(notification.id, None)
+            removed_ids.add(notification.id)
+            entry = (notification._created_key, notification.id, notification)
+            newest = newest_removed.get(notification.recipient_id)
+            if newest is None or entry > newest:
+                newest_removed[notification.recipient_id] = entry
+            object.__setattr__(notification, "_manager", None)  # Bookkeeping only, keeps the cached to_dict
+        self.type_counts.subtract(Counter(notification.notification_type for notification in notifications))
+        self.priority_counts.subtract(Counter(notification.priority for notification in notifications))
+        # Removed entries all sort at or before the recipient's newest removed one, so only that prefix is filtered
+        for index in (self._by_recipient, self._unread_by_recipient):
+            for recipient_id, newest in newest_removed.items():
+                entries = index.get(recipient_id)
+                if entries is None:
+                    continue
+                end = bisect.bisect_right(entries, newest)
+                entries[:end] = [entry for entry in entries[:end] if entry[1] not in removed_ids]
+                if not entries:
+                    del index[recipient_id]
+        
+    def _status_changed(self, notification: Notification, previous: NotificationStatus):
+        with self._lock:
+            if notification._manager is self:  # Not removed by a cleanup in the meantime
+                self._reindex_status(notification, previous)
+            
+    def _reindex_status(self, notification: Notification, previous: NotificationStatus):
+        self._by_status[previous].pop(notification.id, None)
+        self._by_status[notification.status][notification.id] = notification
+        if previous == NotificationStatus.PENDING and self._expired_pending.get(notification.id) is notification:
+            del self._expired_pending[notification.id]
+            _insert_ordered(self._expiry, (notification._created_key, next(self._expiry_seq), notification))
+        unread = self._unread_by_recipient
+        entry = (notification._created_key, notification.id, notification)
+        if notification.status == NotificationStatus.READ:
+            entries = unread.get(notification.recipient_id)
+            if entries is not None:
+                _discard_ordered(entries, entry)
+                if not entries:
+                    del unread[notification.recipient_id]
+        elif previous == NotificationStatus.READ:
+            # Re-sent after being read: back among the unread, in creation order
+            _insert_ordered(unread.setdefault(notification.recipient_id, []), entry)
+            
+    def get_notification(self, notification_id: str) -> Optional[Notification]:
+        """Get a notification by id"""
+        return self._by_id.get(notification_id)
+        
+    def status_counts(self) -> Dict[str, int]:
+        """Number of notifications per status, without zero entries"""
+        return {status.value: len(index) for status, index in self._by_status.items() if index}
+        
+    def type_distribution(self) -> Dict[str, int]:
+        """Number of notifications per type, without zero entries"""
+        return {key.value: count for key, count in self.type_counts.items() if count}
+        
+    def priority_distribution(self) -> Dict[str, int]:
+        """Number of notifications per priority, without zero entries"""
+        return {key.value: count for key, count in self.priority_counts.items() if count}
+        
     def _initialize_templates(self) -> Dict[str, Dict[str, str]]:
         """Initialize notification templates"""
         return {
@@ -149,6 +353,18 @@ class NotificationManager:
         notification_type: NotificationType = NotificationType.SYSTEM_ALERT
     ) -> Notification:
         """Create a notification from template"""
+        return self.add(self.build_notification(recipient_id, template_key, data, priority, channels, notification_type))
+        
+    def build_notification(
+        self,
+        recipient_id: str,
+        template_key: str,
+        data: Optional[Dict[str, Any]] = None,
+        priority: NotificationPriority = NotificationPriority.MEDIUM,
+        channels: List[NotificationChannel] = None,
+        notification_type: NotificationType = NotificationType.SYSTEM_ALERT
+    ) -> Notification:
+        """Render a template into a notification without storing it"""
         template = self.templates.get(template_key, {
             "title": "Notification",
             "message": "You have a new notification"
@@ -168,7 +384,6 @@ class NotificationManager:
             data=data
         )
         
-        self.notifications.append(notification)
         return notification
         
     def create_emergency_notification(
@@ -198,37 +413,49 @@ class NotificationManager:
         unread_only: bool = False,
         limit: int = 50
     ) -> List[Notification]:
-        """Get notifications for a specific user"""
-        notifications = [n for n in self.notifications if n.recipient_id == user_id]
-        
-        if unread_only:
-            notifications = [n for n in notifications if n.status != NotificationStatus.READ]
-            
-        # Sort by created_at descending
-        notifications.sort(key=lambda n: n.created_at, reverse=True)
-        
-        return notifications[:limit]
+        """Get notifications for a specific user, newest first"""
+        index = self._unread_by_recipient if unread_only else self._by_recipient
+        entries = index.get(user_id)
+        if not entries:
+            return []
+        return [notification for _, _, notification in islice(reversed(entries), limit)]
         
     def mark_notification_read(self, notification_id: str) -> bool:
         """Mark a notification as read"""
-        for notification in self.notifications:
-            if notification.id == notification_id:
-                notification.mark_read()
-                return True
-        return False
+        notification = self._by_id.get(notification_id)
+        if notification is None:
+            return False
+        notification.mark_read()
+        return True
         
     def get_pending_notifications(self) -> List[Notification]:
         """Get all pending notifications"""
-        return [n for n in self.notifications if n.status == NotificationStatus.PENDING]
+        return list(self._by_status[NotificationStatus.PENDING].values())
         
     def get_failed_notifications(self) -> List[Notification]:
         """Get all failed notifications that can be retried"""
-        return [n for n in self.notifications if n.can_retry()]
+        return [n for n in self._by_status[NotificationStatus.FAILED].values() if n.can_retry()]
         
-    def cleanup_old_notifications(self, days: int = 30):
-        """Clean up old notifications"""
+    def cleanup_old_notifications(self, days: int = 30) -> int:
+        """
+        Clean up old notifications (pending ones are kept)
+
+        Returns:
+            Number of notifications removed
+        """
         cutoff_date = datetime.utcnow() - timedelta(days=days)
-        self.notifications = [
-            n for n in self.notifications 
-            if n.created_at > cutoff_date or n.status == NotificationStatus.PENDING
-        ]
+        with self._lock:
+            # The expiry list is sorted, so everything past the cutoff is one prefix
+            end = bisect.bisect_right(self._expiry, (_sort_time(cutoff_date), float("inf")))
+            due = self._expiry[:end]
+            del self._expiry[:end]
+            expired = []
+            for _, _, notification in due:
+                if self._by_id.get(notification.id) is not notification:
+                    continue  # Removed or replaced since it was pushed
+                if notification.status == NotificationStatus.PENDING:
+                    self._expired_pending[notification.id] = notification
+                else:
+                    expired.append(notification)
+            self._remove_all(expired)
+        return len(expired)
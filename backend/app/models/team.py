@@ -2,6 +2,7 @@ from datetime import datetime
 from typing import Dict, List, Any, Optional
 from enum import Enum
 import uuid
+from .base import SlottedModel
 
 
 class TeamRole(str, Enum):
@@ -18,7 +19,13 @@ class TeamStatus(str, Enum):
     BUSY = "busy"
 
 
-class TeamMember:
+class TeamMember(SlottedModel):
+    __slots__ = (
+        "id", "name", "email", "phone", "role", "team_id", "status", "is_on_call", "skills",
+        "max_concurrent_calls", "current_calls", "total_calls_handled", "avg_response_time",
+        "rating", "created_at", "last_active"
+    )
+    
     def __init__(
         self,
         name: str,
@@ -80,6 +87,7 @@ class TeamMember:
         """Add a skill to the team member"""
         if skill not in self.skills:
             self.skills.append(skill)
+            self._invalidate()
             
     def is_available_for_call(self) -> bool:
         """Check if team member is available for new calls"""
@@ -88,8 +96,7 @@ class TeamMember:
             self.current_calls < self.max_concurrent_calls
         )
         
-    def to_dict(self) -> Dict[str, Any]:
-        """Convert to dictionary for JSON serialization"""
+    def _build_dict(self) -> Dict[str, Any]:
         return {
             "id": self.id,
             "name": self.name,
@@ -111,6 +118,12 @@ class TeamMember:
 
 
 class Team:
+    # Slotted, but to_dict() is not cached: its stats follow member changes
+    __slots__ = (
+        "id", "name", "description", "specialization", "members", "active_calls",
+        "total_calls_handled", "created_at"
+    )
+    
     def __init__(
         self,
         name: str,
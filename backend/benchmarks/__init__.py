@@ -0,0 +1,7 @@
+"""
+Micro-benchmarks for hot paths
+
+Run from the backend directory, e.g.:
+
+python -m benchmarks.bench_summary_extraction
+"""
@@ -0,0 +1,90 @@
+"""
+AnalyticsService per-call lookup benchmark
+
+Fills a CallDetailStore with synthetic calls in arrival order, then times
+get_call_analytics-style point lookups and get_recent_calls-style recent-N
+queries through the call_sid index and the insertion-ordered tail, against
+a linear scan of the call_sid column and a full sort by timestamp (both
+lower bounds for the old dict-list implementation, which also parsed every
+ISO timestamp).
+
+Usage:
+
+python -m benchmarks.bench_analytics_lookup --rows 1000000 --lookups 200
+"""
+
+import argparse
+import random
+import time
+from utils.columnar_store import CallDetailStore
+
+OUTCOMES = ["completed", "completed", "completed", "dropped", "transferred"]
+CALL_TYPES = ["standard", "emergency", "followup"]
+
+
+def build_store(rows: int, seed: int = 7) -> CallDetailStore:
+    """Repeatable store of `rows` calls, one every ~2 seconds"""
+    rng = random.Random(seed)
+    store = CallDetailStore()
+    timestamp = time.time() - rows * 2
+    for i in range(rows):
+        timestamp += rng.uniform(0.5, 3.5)
+        store.append(
+            call_sid=f"CA{i:032x}",
+            timestamp=timestamp,
+            duration=rng.randint(10, 900),
+            is_emergency=rng.random() < 0.3,
+            call_type=rng.choice(CALL_TYPES),
+            outcome=rng.choice(OUTCOMES),
+            response_time=rng.randint(5, 120) if rng.random() < 0.8 else None,
+            team_member_id=f"member-{rng.randint(1, 40)}",
+            quality_score=round(rng.uniform(1, 5), 1) if rng.random() < 0.5 else None
+        )
+    return store
+
+
+def time_per_call(fn, arguments):
+    """Mean wall-clock time per call, in microseconds"""
+    start = time.perf_counter()
+    for argument in arguments:
+        fn(argument)
+    return (time.perf_counter() - start) / len(arguments) * 1_000_000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark AnalyticsService call lookups")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Stored calls")
+    parser.add_argument("--lookups", type=int, default=200, help="Timed queries per variant")
+    parser.add_argument("--limit", type=int, default=50, help="Recent calls per query")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    store = build_store(args.rows)
+    build_s = time.perf_counter() - start
+
+    rng = random.Random(11)
+    sids = [store.call_sid[rng.randrange(args.rows)] for _ in range(args.lookups)]
+    limits = [args.limit] * max(1, args.lookups // 20)
+
+    mismatches = sum(1 for sid in sids if store.find(sid) != store.call_sid.index(sid))
+    full_sort = sorted(range(len(store)), key=store.timestamp.__getitem__, reverse=True)[:args.limit]
+    recent_matches = store.recent(args.limit) == full_sort
+
+    scan_us = time_per_call(store.call_sid.index, sids)
+    index_us = time_per_call(store.find, sids)
+    sort_us = time_per_call(
+        lambda limit: sorted(range(len(store)), key=store.timestamp.__getitem__, reverse=True)[:limit], limits
+    )
+    tail_us = time_per_call(store.recent, limits)
+    rows_us = time_per_call(lambda limit: store.rows(store.recent(limit)), limits)
+
+    print(f"Rows:               {len(store)} (built in {build_s:.1f}s, ~{store.nbytes() / len(store):.0f} bytes/row)")
+    print(f"Lookup mismatches:  {mismatches}, recent-{args.limit} matches full sort: {recent_matches}")
+    print(f"Point lookup scan:  {scan_us:.1f}us")
+    print(f"Point lookup index: {index_us:.2f}us ({scan_us / index_us:.0f}x)")
+    print(f"Recent full sort:   {sort_us / 1000:.1f}ms")
+    print(f"Recent tail:        {tail_us:.1f}us ({sort_us / tail_us:.0f}x), {rows_us:.1f}us with row dicts")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+TeamService batch assignment benchmark
+
+Queues a surge of calls with mixed priorities, emergency types and skill
+requirements, then assigns them to the same synthetic responder pool twice:
+greedily in arrival order through assign_call_to_team_member, and in one
+weighted matching through assign_calls_batch. Reports how many calls (and
+critical calls) each approach placed, the summed pair weight, and the time
+the batch solve takes.
+
+Usage (team modules use backend.* imports, so run from the repository root; backend.services
+also loads the top-level config and utils packages, so backend/ goes on PYTHONPATH):
+
+PYTHONPATH=backend python -m backend.benchmarks.bench_batch_assignment --members 200 --calls 200
+"""
+
+import argparse
+import random
+import time
+from backend.benchmarks.bench_team_assignment import SKILLS, EMERGENCY_TYPES, build_service
+from backend.services import batch_assignment
+
+
+def build_queue(count: int, seed: int = 17):
+    """Repeatable queue of calls, about 10% critical"""
+    rng = random.Random(seed)
+    return [
+        {
+            "call_sid": f"CA-surge-{i}",
+            "emergency_type": rng.choice(EMERGENCY_TYPES),
+            "required_skills": rng.sample(SKILLS, rng.randint(0, 2)),
+            "priority": 1 if rng.random() < 0.1 else rng.randint(2, 10),
+        }
+        for i in range(count)
+    ]
+
+
+def greedy(service, queue):
+    """The one-call-at-a-time path, as calls arrive"""
+    assignments = []
+    for call in queue:
+        member = service.assign_call_to_team_member(call["call_sid"], call["emergency_type"], call["required_skills"])
+        if member:
+            assignments.append((call["call_sid"], member))
+    return assignments
+
+
+def summarize(queue, assignments):
+    """Placed calls, placed critical calls and the summed pair weight (load ignored)"""
+    calls = {call["call_sid"]: call for call in queue}
+    weight = sum(
+        batch_assignment.pair_weight(
+            calls[call_sid]["priority"], calls[call_sid]["required_skills"], member.skills, 0, member.avg_response_time
+        )
+        for call_sid, member in assignments
+    )
+    critical = sum(1 for call_sid, _ in assignments if calls[call_sid]["priority"] == 1)
+    return len(assignments), critical, weight
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark TeamService batch call assignment")
+    parser.add_argument("--members", type=int, default=200, help="Team members")
+    parser.add_argument("--calls", type=int, default=200, help="Queued calls")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed batch solves")
+    args = parser.parse_args()
+
+    queue = build_queue(args.calls)
+    total_critical = sum(1 for call in queue if call["priority"] == 1)
+
+    greedy_placed, greedy_critical, greedy_weight = summarize(queue, greedy(build_service(args.members), queue))
+
+    timings = []
+    for _ in range(args.repeat):
+        service = build_service(args.members)
+        start = time.perf_counter()
+        result = service.assign_calls_batch(queue)
+        timings.append(time.perf_counter() - start)
+    batch_placed, batch_critical, batch_weight = summarize(queue, result["assignments"])
+
+    print(f"Queue:        {args.calls} calls ({total_critical} critical), {args.members} members")
+    print(f"Greedy:       {greedy_placed} placed, {greedy_critical} critical, weight {greedy_weight:.0f}")
+    print(f"Batch:        {batch_placed} placed, {batch_critical} critical, weight {batch_weight:.0f}")
+    print(f"Batch solve:  {min(timings) * 1000:.1f}ms best of {args.repeat} ({result['solver']})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Emergency history benchmark
+
+Creates and resolves --emergencies emergency calls (a share escalated or
+acknowledged first) in an EmergencyService backed by a scratch archive,
+then times get_emergency_statistics against the previous implementation,
+which concatenated the active and history lists and walked all of them on
+every call. Checks both report the same numbers, that the in-memory history
+stays at EMERGENCY_HISTORY_SIZE, and that a new service (a restart) picks
+the statistics up from the archive.
+
+Usage (emergency modules use backend.* imports, so run from the repository root; backend.services
+also loads the top-level config and utils packages, so backend/ goes on PYTHONPATH):
+
+PYTHONPATH=backend python -m backend.benchmarks.bench_emergency_history --emergencies 50000 --active 500
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+TYPES = ["medical", "fire", "police", "accident", "other"]
+
+
+def legacy_statistics(active, history):
+    """get_emergency_statistics as it was"""
+    from backend.app.models.emergency import EmergencyStatus
+
+    total_emergencies = len(history) + len(active)
+    type_counts, priority_counts, status_counts = {}, {}, {}
+    for emergency in list(active) + history:
+        type_counts[emergency.emergency_type.value] = type_counts.get(emergency.emergency_type.value, 0) + 1
+        priority_counts[emergency.priority.value] = priority_counts.get(emergency.priority.value, 0) + 1
+        status_counts[emergency.status.value] = status_counts.get(emergency.status.value, 0) + 1
+    resolved = [e for e in history if e.status == EmergencyStatus.RESOLVED]
+    avg_resolution_time = 0
+    if resolved:
+        avg_resolution_time = sum((e.updated_at - e.created_at).total_seconds() for e in resolved) / len(resolved)
+    return {
+        "total_emergencies": total_emergencies,
+        "active_emergencies": len(active),
+        "resolved_emergencies": len(resolved),
+        "type_distribution": type_counts,
+        "priority_distribution": priority_counts,
+        "status_distribution": status_counts,
+        "average_resolution_time_seconds": avg_resolution_time
+    }
+
+
+def timed(function, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) / repeat * 1_000_000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark emergency statistics and history")
+    parser.add_argument("--emergencies", type=int, default=50_000, help="Emergencies created and resolved")
+    parser.add_argument("--active", type=int, default=500, help="Emergencies left active")
+    parser.add_argument("--history-size", type=int, default=1000, help="EMERGENCY_HISTORY_SIZE")
+    parser.add_argument("--repeat", type=int, default=20, help="Timed repetitions")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        os.environ["EMERGENCY_ARCHIVE_PATH"] = os.path.join(directory, "emergency_archive.db")
+        os.environ["EMERGENCY_HISTORY_SIZE"] = str(args.history_size)
+        from backend.services.emergency_service import EmergencyService
+
+        rng = random.Random(4)
+        service = EmergencyService()
+        history = []  # What the unbounded list used to hold
+        start = time.perf_counter()
+        for i in range(args.emergencies + args.active):
+            call_sid = f"CA{i:08d}"
+            emergency = service.create_emergency_call(call_sid, rng.choice(TYPES))
+            if rng.random() < 0.2:
+                service.escalate_emergency(call_sid)
+            if rng.random() < 0.7:
+                service.acknowledge_emergency(call_sid, f"member-{i % 300}")
+            if i < args.emergencies:
+                service.resolve_emergency(call_sid)
+                history.append(emergency)
+        build = time.perf_counter() - start
+
+        expected = legacy_statistics(service.active_emergencies.values(), history)
+        assert service.get_emergency_statistics() == expected, "statistics differ"
+        before = timed(lambda: legacy_statistics(service.active_emergencies.values(), history), args.repeat)
+        after = timed(service.get_emergency_statistics, args.repeat * 100)
+        print(f"{args.emergencies} resolved, {args.active} active ({build:.1f}s to create, resolve and archive)\n")
+        print(f"{'statistics':<12}{'walk':>12}{'counters':>12}{'speedup':>10}")
+        print(f"{'':<12}{before:>10.0f}us{after:>10.2f}us{before / after:>9.0f}x")
+        print(f"\nin-memory history: {len(service.emergency_history)} (list: {len(history)}), archived: {len(service.archive)}")
+
+        service.archive.close()
+        restarted = EmergencyService()
+        restored = restarted.get_emergency_statistics()
+        archived_only = legacy_statistics([], history)
+        assert restored == {**archived_only, "active_emergencies": 0}, "restart lost statistics"
+        print(f"after restart: {restored['total_emergencies']} emergencies, {restored['resolved_emergencies']} resolved (from the archive)")
+        restarted.archive.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Auto-escalation scheduler benchmark
+
+Fills an EmergencyService with active emergencies (most of them already
+acknowledged) and times one auto-escalation check with nothing due: the
+previous check_auto_escalation sweep over every active emergency, against
+the escalation scheduler's deadline heap. Then runs the scheduler on an
+event loop with short escalation deadlines and reports how late the
+escalations fired, next to the lateness a sweep every --poll seconds would
+have had for the same deadlines.
+
+Usage (emergency modules use backend.* imports, so run from the repository root; backend.services
+also loads the top-level config and utils packages, so backend/ goes on PYTHONPATH):
+
+PYTHONPATH=backend python -m backend.benchmarks.bench_escalation_scheduler --emergencies 20000 --timed 200
+"""
+
+import argparse
+import asyncio
+import math
+import random
+import statistics
+import time
+from datetime import datetime
+from backend.app.models.emergency import EmergencyStatus
+from backend.services.emergency_service import EmergencyService
+
+TYPES = ["medical", "fire", "police", "accident", "other"]
+
+
+def legacy_check(service: EmergencyService) -> int:
+    """check_auto_escalation as it was: recompute every active emergency's elapsed time"""
+    current_time = datetime.utcnow()
+    due = 0
+    for emergency in service.active_emergencies.values():
+        if emergency.status == EmergencyStatus.PENDING:
+            time_elapsed = (current_time - emergency.created_at).total_seconds()
+            rules = service.escalation_rules.get(emergency.emergency_type.value, {})
+            if time_elapsed > rules.get("auto_escalate_time", 60):
+                due += 1
+    return due
+
+
+def build_service(emergencies: int, seed: int = 3) -> EmergencyService:
+    rng = random.Random(seed)
+    service = EmergencyService()
+    for i in range(emergencies):
+        service.create_emergency_call(f"CA{i:08d}", rng.choice(TYPES))
+        if rng.random() < 0.8:
+            service.acknowledge_emergency(f"CA{i:08d}", f"member-{i % 300}")
+    return service
+
+
+def timed(function, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) / repeat * 1_000_000
+
+
+async def measure_lateness(count: int, max_delay: float, seed: int = 9):
+    """Escalate `count` emergencies with deadlines spread over max_delay seconds; returns (lateness, deadlines)"""
+    rng = random.Random(seed)
+    service = EmergencyService()
+    await service.start()
+    lateness = []
+    deadlines = []
+    fire = service.escalation_scheduler.on_due
+
+    def on_due(call_sid):
+        lateness.append(time.monotonic() - expected[call_sid])
+        fire(call_sid)
+
+    service.escalation_scheduler.on_due = on_due
+    expected = {}
+    start = time.monotonic()
+    for i in range(count):
+        delay = rng.uniform(0.05, max_delay)
+        service.escalation_rules["medical"]["auto_escalate_time"] = delay
+        emergency = service.create_emergency_call(f"CA{i:08d}", "medical")
+        expected[emergency.call_sid] = service.escalation_scheduler.deadline(emergency.call_sid)
+        deadlines.append(expected[emergency.call_sid] - start)
+        # Only the first deadline per emergency is measured
+        service.escalation_rules["medical"]["auto_escalate_time"] = 3600
+    await asyncio.sleep(max_delay + 0.2)
+    await service.shutdown()
+    return lateness, deadlines
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark auto-escalation scheduling")
+    parser.add_argument("--emergencies", type=int, default=20_000, help="Active emergencies")
+    parser.add_argument("--timed", type=int, default=200, help="Emergencies escalated on the event loop")
+    parser.add_argument("--max-delay", type=float, default=1.0, help="Longest escalation deadline in the lateness run (seconds)")
+    parser.add_argument("--poll", type=float, default=5.0, help="Sweep interval the lateness is compared against")
+    parser.add_argument("--repeat", type=int, default=20, help="Timed repetitions")
+    args = parser.parse_args()
+
+    service = build_service(args.emergencies)
+    pending = sum(1 for e in service.active_emergencies.values() if e.status == EmergencyStatus.PENDING)
+    sweep = timed(lambda: legacy_check(service), args.repeat)
+    heap = timed(service.check_auto_escalation, args.repeat * 100)
+    print(f"{args.emergencies} active emergencies ({pending} unacknowledged)\n")
+    print(f"{'check (none due)':<20}{'sweep':>12}{'heap':>12}{'speedup':>10}")
+    print(f"{'':<20}{sweep:>10.1f}us{heap:>10.2f}us{sweep / heap:>9.0f}x")
+
+    lateness, deadlines = asyncio.run(measure_lateness(args.timed, args.max_delay))
+    swept = [math.ceil(d / args.poll) * args.poll - d for d in deadlines]
+    print(f"\nescalation lateness over {len(lateness)} deadlines")
+    print(f"{'':<20}{'mean':>12}{'max':>12}")
+    print(f"{'scheduler':<20}{statistics.mean(lateness) * 1000:>10.1f}ms{max(lateness) * 1000:>10.1f}ms")
+    print(f"{f'sweep every {args.poll:g}s':<20}{statistics.mean(swept) * 1000:>10.1f}ms{max(swept) * 1000:>10.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
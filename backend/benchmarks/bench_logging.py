@@ -0,0 +1,128 @@
+"""
+Hot-path logging overhead benchmark
+
+Runs classification + severity scoring over a synthetic transcript corpus
+with logging disabled entirely, then with the queue-based handler at each
+triage verbosity, and with the old synchronous stream + file handlers.
+Handlers write to os.devnull / a temp file so terminal speed does not
+skew the numbers.
+
+Usage:
+
+python -m benchmarks.bench_logging --transcripts 2000 --repeat 5
+"""
+
+import argparse
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import tempfile
+import time
+from services.classification_engine import classification_engine
+from services.severity_engine import severity_engine
+from utils.logging_config import LOG_FORMAT, TRIAGE_LOGGERS, DeferredQueueHandler
+
+FRAGMENTS = [
+    "There's a fire at Main Street",
+    "my father collapsed and is not breathing",
+    "someone has a gun outside the bank",
+    "there was a car accident on the highway",
+    "my friend says he wants to kill myself",
+    "smoke is coming from the kitchen",
+    "he is bleeding badly from the head",
+    "a child is unconscious near the pool",
+    "I think somebody broke in to my house",
+    "Help please",
+]
+
+
+def build_corpus(size: int, seed: int = 7):
+    """Build a repeatable corpus of transcripts from common fragments"""
+    rng = random.Random(seed)
+    return [
+        ". ".join(rng.sample(FRAGMENTS, rng.randint(1, 3)))
+        for _ in range(size)
+    ]
+
+
+def run_pipeline(corpus):
+    for transcript in corpus:
+        classification = classification_engine.classify(transcript)
+        severity_engine.calculate_severity(transcript, classification.emergency_type)
+
+
+def install_handlers(use_queue: bool, level: int, log_path: str):
+    """Point the root logger at devnull + a temp file, optionally through a queue"""
+    formatter = logging.Formatter(LOG_FORMAT)
+    handlers = [
+        logging.StreamHandler(open(os.devnull, 'w')),
+        logging.FileHandler(log_path, mode='w'),
+    ]
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+
+    listener = None
+    if use_queue:
+        log_queue = queue.SimpleQueue()
+        root.addHandler(DeferredQueueHandler(log_queue))
+        listener = logging.handlers.QueueListener(log_queue, *handlers)
+        listener.start()
+    else:
+        for handler in handlers:
+            root.addHandler(handler)
+
+    for name in TRIAGE_LOGGERS:
+        logging.getLogger(name).setLevel(level)
+    return listener
+
+
+def best_of(corpus, repeat):
+    """Best wall-clock time over several runs, in milliseconds"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run_pipeline(corpus)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark hot-path logging overhead")
+    parser.add_argument("--transcripts", type=int, default=2000, help="Corpus size")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per variant")
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.transcripts)
+    log_path = os.path.join(tempfile.mkdtemp(), "bench.log")
+
+    logging.disable(logging.CRITICAL)
+    baseline_ms = best_of(corpus, args.repeat)
+    logging.disable(logging.NOTSET)
+
+    variants = [
+        ("queue, WARNING", True, logging.WARNING),
+        ("queue, INFO", True, logging.INFO),
+        ("sync, INFO", False, logging.INFO),
+        ("queue, DEBUG", True, logging.DEBUG),
+    ]
+
+    per_call = 1000 / len(corpus)
+    print(f"Transcripts:      {len(corpus)}")
+    print(f"logging disabled: {baseline_ms:.2f}ms ({baseline_ms * per_call:.2f}us/call)")
+    for name, use_queue, level in variants:
+        listener = install_handlers(use_queue, level, log_path)
+        elapsed_ms = best_of(corpus, args.repeat)
+        if listener:
+            listener.stop()
+        overhead = (elapsed_ms - baseline_ms) / baseline_ms * 100
+        print(f"{name + ':':<17} {elapsed_ms:.2f}ms ({elapsed_ms * per_call:.2f}us/call, {overhead:+.1f}%)")
+
+
+if __name__ == "__main__":
+    main()
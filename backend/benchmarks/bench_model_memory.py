@@ -0,0 +1,105 @@
+"""
+In-memory model footprint benchmark
+
+Creates synthetic TeamMember, Team, EmergencyCall and Notification objects
+and measures, with tracemalloc, the memory of the objects themselves against
+the previous layout (a plain class whose attributes live in a per-instance
+__dict__), holding the very same attribute values. Also times to_dict() on
+a cold object and on a cached one.
+
+Usage (models use backend.* imports, so run from the repository root):
+
+python -m backend.benchmarks.bench_model_memory --objects 50000
+"""
+
+import argparse
+import time
+import tracemalloc
+from backend.app.models.base import SlottedModel
+from backend.app.models.emergency import EmergencyCall, EmergencyType
+from backend.app.models.notifications import Notification, NotificationType
+from backend.app.models.team import Team, TeamMember
+
+
+def make_objects(cls, count: int):
+    if cls is TeamMember:
+        return [TeamMember(f"Member {i}", f"member{i}@example.com", f"+1555{i:07d}") for i in range(count)]
+    if cls is Team:
+        return [Team(f"Team {i}", "Synthetic team", "medical") for i in range(count)]
+    if cls is EmergencyCall:
+        return [EmergencyCall(f"CA{i:032x}", EmergencyType.MEDICAL, caller_phone="+15550000000") for i in range(count)]
+    return [
+        Notification(f"member-{i}", "New Call Assigned", f"Call CA{i} has been assigned to you", NotificationType.CALL_ASSIGNED)
+        for i in range(count)
+    ]
+
+
+def slot_names(cls):
+    return [name for klass in cls.__mro__ for name in getattr(klass, "__slots__", ()) if name != "_cached_dict"]
+
+
+def measure(build) -> int:
+    """Bytes allocated by build(), which must keep its result alive"""
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    return after - before
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark in-memory model footprint")
+    parser.add_argument("--objects", type=int, default=50_000, help="Objects per model")
+    args = parser.parse_args()
+
+    print(f"{'Model':<16}{'__dict__ B/obj':>16}{'slotted B/obj':>15}{'saved':>8}{'to_dict cold':>15}{'cached':>10}")
+    for cls in (TeamMember, Team, EmergencyCall, Notification):
+        objects = make_objects(cls, args.objects)
+        names = slot_names(cls)
+        legacy_cls = type(f"Legacy{cls.__name__}", (), {})
+
+        def copy_legacy():
+            copies = []
+            for obj in objects:
+                legacy = legacy_cls()
+                for name in names:
+                    setattr(legacy, name, getattr(obj, name))
+                copies.append(legacy)
+            return copies
+
+        def copy_slotted():
+            copies = []
+            for obj in objects:
+                slotted = cls.__new__(cls)
+                for name in names:
+                    object.__setattr__(slotted, name, getattr(obj, name))
+                if issubclass(cls, SlottedModel):
+                    object.__setattr__(slotted, "_cached_dict", None)
+                copies.append(slotted)
+            return copies
+
+        # The list holding the copies costs the same in both layouts
+        legacy_bytes = measure(copy_legacy) / args.objects
+        slotted_bytes = measure(copy_slotted) / args.objects
+
+        sample = objects[: min(len(objects), 5000)]
+        start = time.perf_counter()
+        for obj in sample:
+            obj.to_dict()
+        cold_us = (time.perf_counter() - start) / len(sample) * 1_000_000
+        start = time.perf_counter()
+        for obj in sample:
+            obj.to_dict()
+        cached_us = (time.perf_counter() - start) / len(sample) * 1_000_000
+
+        print(
+            f"{cls.__name__:<16}{legacy_bytes:>16.0f}{slotted_bytes:>15.0f}"
+            f"{1 - slotted_bytes / legacy_bytes:>8.0%}{cold_us:>13.2f}us{cached_us:>8.2f}us"
+        )
+
+
+if __name__ == "__main__":
+    main()
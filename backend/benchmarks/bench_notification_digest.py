@@ -0,0 +1,99 @@
+"""
+Notification digest benchmark
+
+Replays a simulated alert storm against the NotificationCoalescer on a
+virtual clock: a handful of recurring alerts (high call volume and
+performance alerts to every supervisor, repeated emergency assignments for
+the same calls, members flapping offline) fired every few seconds for
+--minutes, plus a share of urgent emergency assignments for new calls.
+Compares outbound channel sends without coalescing (every notification
+sent) and with the digest window, and checks that no urgent alert for a
+new call was held back.
+
+Usage (notification modules use backend.* imports, so run from the repository root; backend.services
+also loads the top-level config and utils packages, so backend/ goes on PYTHONPATH):
+
+PYTHONPATH=backend python -m backend.benchmarks.bench_notification_digest --minutes 10 --window 60
+"""
+
+import argparse
+import random
+import time
+from backend.app.models.notifications import NotificationChannel, NotificationPriority, NotificationType
+from backend.services.notification_coalescer import NotificationCoalescer
+
+
+class VirtualClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def storm(minutes: int, supervisors: int, seed: int = 5):
+    """(second, recipient, template, data, priority, channels, type) events, in time order"""
+    rng = random.Random(seed)
+    events = []
+    email_sms = [NotificationChannel.EMAIL, NotificationChannel.SMS]
+    for second in range(minutes * 60):
+        for s in range(supervisors):
+            recipient = f"supervisor-{s}"
+            if second % 3 == 0:
+                events.append((second, recipient, "high_call_volume", {"percentage": 40 + rng.randrange(30)},
+                               NotificationPriority.HIGH, email_sms, NotificationType.SYSTEM_ALERT))
+            if second % 5 == 0:
+                events.append((second, recipient, "performance_alert", {"response_time": rng.randrange(40, 90), "threshold": 30},
+                               NotificationPriority.MEDIUM, [NotificationChannel.EMAIL], NotificationType.PERFORMANCE))
+            if second % 7 == 0:
+                member = f"Responder {rng.randrange(4)}"
+                events.append((second, recipient, "team_member_offline", {"member_name": member},
+                               NotificationPriority.MEDIUM, [NotificationChannel.IN_APP, NotificationChannel.EMAIL], NotificationType.TEAM_MEMBER_STATUS))
+        if second % 2 == 0:
+            # New calls (urgent, must go out) and re-sent assignments for ongoing ones
+            call = f"call-{second}" if rng.random() < 0.3 else f"call-{rng.randrange(max(second, 1))}"
+            data = {"emergency_type": "medical", "priority": "critical", "emergency_call_id": call}
+            events.append((second, f"member-{rng.randrange(20)}", "emergency_assigned", data,
+                           NotificationPriority.URGENT, [NotificationChannel.SMS, NotificationChannel.IN_APP], NotificationType.EMERGENCY))
+    return events
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark notification digesting")
+    parser.add_argument("--minutes", type=int, default=10, help="Simulated storm length")
+    parser.add_argument("--supervisors", type=int, default=10, help="Recipients of the recurring system alerts")
+    parser.add_argument("--window", type=float, default=60.0, help="Digest window in seconds")
+    args = parser.parse_args()
+
+    events = storm(args.minutes, args.supervisors)
+    baseline = sum(len(channels) for *_, channels, _ in events)
+
+    clock = VirtualClock()
+    digests = []
+    coalescer = NotificationCoalescer(args.window, digests.append, clock=clock)
+    sent = 0
+    sent_keys = set()
+    urgent_missed = 0
+    start = time.perf_counter()
+    for second, recipient, template, data, priority, channels, notification_type in events:
+        clock.now = second
+        if coalescer.offer(recipient, template, data, priority, channels, notification_type):
+            sent += len(channels)
+            sent_keys.add(coalescer.digest_key(recipient, template, data))
+        elif priority == NotificationPriority.URGENT and coalescer.digest_key(recipient, template, data) not in sent_keys:
+            urgent_missed += 1
+    clock.now += args.window
+    coalescer.flush()
+    elapsed = time.perf_counter() - start
+    digest_sends = sum(len(digest.channels) for digest in digests)
+
+    print(f"{len(events)} notifications over {args.minutes} min, {args.window:.0f}s window\n")
+    print(f"{'mode':<12}{'channel sends':>15}")
+    print(f"{'every alert':<12}{baseline:>15}")
+    print(f"{'coalesced':<12}{sent + digest_sends:>15}  ({sent} immediate + {digest_sends} in {len(digests)} digests, {baseline / (sent + digest_sends):.1f}x fewer)")
+    print(f"\nurgent alerts for new calls held back: {urgent_missed}")
+    print(f"coalescer overhead: {elapsed / len(events) * 1_000_000:.1f}us per notification")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Notification dispatch benchmark
+
+Sends the same batch of email + webhook notifications to the local sandbox
+servers (notification_sandbox.py) twice: the way send_notification used to,
+one after another with a new SMTP connection and a new HTTP connection per
+message, and through the async NotificationDispatcher with its per-channel
+workers, pooled SMTP sessions and keep-alive HTTP session. Reports wall
+time, throughput, connections opened and, with --fail-rate, how retries
+recovered transient failures.
+
+Usage (notification modules use backend.* imports, so run from the repository root; backend.services
+also loads the top-level config and utils packages, so backend/ goes on PYTHONPATH):
+
+PYTHONPATH=backend python -m backend.benchmarks.bench_notification_dispatch --notifications 200 --delay 0.02
+"""
+
+import argparse
+import asyncio
+import os
+import smtplib
+import time
+from email.mime.text import MIMEText
+from backend.app.models.notifications import NotificationChannel, NotificationPriority, NotificationType
+from backend.notification_sandbox import SandboxStats, start_sandbox
+
+CHANNELS = [NotificationChannel.EMAIL, NotificationChannel.WEBHOOK]
+
+
+def build_service(smtp_port: int, http_port: int, notifications: int):
+    os.environ.update({
+        "SMTP_SERVER": "127.0.0.1",
+        "SMTP_PORT": str(smtp_port),
+        "SMTP_STARTTLS": "false",
+        "WEBHOOK_URL": f"http://127.0.0.1:{http_port}/webhook",
+    })
+    from backend.services.notification_service import NotificationService
+    from backend.services.team_service import team_service
+
+    service = NotificationService()
+    members = [
+        team_service.create_team_member(f"Responder {i}", f"responder{i}@example.com", f"+1555{i:07d}")
+        for i in range(notifications)
+    ]
+    return service, members
+
+
+def make_batch(service, members, label: str):
+    return [
+        service.create_notification(
+            member.id,
+            f"{label} alert {i}",
+            "Multi-vehicle collision reported on the highway",
+            NotificationType.EMERGENCY,
+            NotificationPriority.URGENT if i % 10 == 0 else NotificationPriority.MEDIUM,
+            CHANNELS
+        )
+        for i, member in enumerate(members)
+    ]
+
+
+def legacy_send(service, notification):
+    """Per-message connections, as before the dispatcher"""
+    import requests
+
+    config = service.email_config
+    server = smtplib.SMTP(config["smtp_server"], config["smtp_port"], timeout=10)
+    message = MIMEText(notification.message)
+    message["Subject"] = notification.title
+    server.sendmail(config["from_email"], service._get_user_email(notification.recipient_id), message.as_string())
+    server.quit()
+    requests.post(os.environ["WEBHOOK_URL"], json={"notification_id": notification.id, "title": notification.title}, timeout=10)
+
+
+async def dispatch_all(service, notifications):
+    results = await asyncio.gather(*(service.dispatcher.submit(n) for n in notifications))
+    await service.dispatcher.stop()
+    return results
+
+
+def report(label: str, elapsed: float, count: int, connections: dict):
+    print(
+        f"{label:<12}{elapsed:>9.2f}s{count * len(CHANNELS) / elapsed:>12.0f} msg/s"
+        f"{connections['smtp']:>10}{connections['http']:>10}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark notification dispatch")
+    parser.add_argument("--notifications", type=int, default=200, help="Notifications per run (email + webhook each)")
+    parser.add_argument("--delay", type=float, default=0.02, help="Seconds the sandbox holds each message")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="Fraction of messages the sandbox rejects transiently")
+    parser.add_argument("--rate", type=float, default=1000.0, help="Per-channel sends per second allowed to the dispatcher")
+    args = parser.parse_args()
+
+    stats = SandboxStats(delay=args.delay)
+    smtp, webhook, stats = start_sandbox("127.0.0.1", 0, 0, stats)
+    service, members = build_service(smtp.server_address[1], webhook.server_address[1], args.notifications)
+    print(f"{'mode':<12}{'wall':>10}{'throughput':>16}{'smtp conn':>10}{'http conn':>10}")
+
+    notifications = make_batch(service, members, "Serial")
+    start = time.perf_counter()
+    for notification in notifications:
+        legacy_send(service, notification)
+    report("serial", time.perf_counter() - start, len(notifications), stats.connections)
+
+    stats.connections = {"smtp": 0, "http": 0}
+    stats.fail_rate = args.fail_rate
+    service.dispatcher.backoff_base = 0.05
+    for channel in CHANNELS:
+        workers, _ = service.dispatcher.limits[channel]
+        service.dispatcher.limits[channel] = (workers, args.rate)
+    notifications = make_batch(service, members, "Dispatch")
+    start = time.perf_counter()
+    results = asyncio.run(dispatch_all(service, notifications))
+    report("dispatcher", time.perf_counter() - start, len(notifications), stats.connections)
+    service.smtp_pool.close()
+
+    retries = sum(value for labels, value in service.dispatcher.deliveries.samples() if labels["outcome"] == "error")
+    print(f"\ndispatcher: {sum(results)}/{len(results)} delivered, {retries:.0f} attempts retried or abandoned")
+    print(f"sandbox rejected {stats.rejected}")
+    for server in (smtp, webhook):
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Notification outbox benchmark
+
+Fills a scratch outbox database with webhook notifications and drains it
+with 1, 2, 4 ... relay processes claiming batches concurrently, each
+sending through its own NotificationDispatcher to a stand-in sender that
+takes --send-ms per message. Reports drain time, throughput and duplicate
+sends (none expected without crashes). Then simulates a worker that claims
+a batch and dies: its rows come back once the lease expires and another
+relay delivers them (at-least-once).
+
+Usage (notification modules use backend.* imports, so run from the repository root; backend.services
+also loads the top-level config and utils packages, so backend/ goes on PYTHONPATH):
+
+PYTHONPATH=backend python -m backend.benchmarks.bench_notification_outbox --notifications 2000 --processes 1 2 4
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import tempfile
+import time
+from collections import Counter
+from backend.app.models.notifications import Notification, NotificationChannel, NotificationManager, NotificationPriority, NotificationType
+from backend.services.notification_dispatcher import NotificationDispatcher
+from backend.services.notification_outbox import NotificationOutbox, OutboxRelay
+
+
+def fill(path: str, count: int):
+    outbox = NotificationOutbox(path)
+    notifications = [
+        Notification(
+            f"member-{i % 500}", "High Call Volume Alert", "Call volume is 40% above normal",
+            NotificationType.SYSTEM_ALERT,
+            NotificationPriority.URGENT if i % 20 == 0 else NotificationPriority.MEDIUM,
+            [NotificationChannel.WEBHOOK]
+        )
+        for i in range(count)
+    ]
+    for start in range(0, count, 500):
+        outbox.enqueue(notifications[start:start + 500])
+    outbox.close()
+
+
+def drain(path: str, send_seconds: float, lease_seconds: float = 120.0):
+    """Relay process body: claim and send until the outbox has nothing due"""
+    sent = []
+
+    def send(notification):
+        time.sleep(send_seconds)
+        sent.append(notification.id)
+        return True
+
+    async def run():
+        dispatcher = NotificationDispatcher({NotificationChannel.WEBHOOK: send}, limits={NotificationChannel.WEBHOOK: (16, 100_000.0)})
+        relay = OutboxRelay(NotificationOutbox(path, lease_seconds), dispatcher, NotificationManager(), batch_size=100)
+        while await relay.run_once():
+            pass
+        await dispatcher.stop()
+
+    asyncio.run(run())
+    return sent
+
+
+def claim_and_die(path: str, lease_seconds: float, limit: int) -> int:
+    """A worker that leases a batch and crashes before sending it"""
+    return len(NotificationOutbox(path, lease_seconds).claim("crashed-worker", limit))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the notification outbox")
+    parser.add_argument("--notifications", type=int, default=2000, help="Rows to drain per run")
+    parser.add_argument("--processes", type=int, nargs="+", default=[1, 2, 4], help="Relay process counts to compare")
+    parser.add_argument("--send-ms", type=float, default=50.0, help="Time the stand-in sender takes per message (provider API latency)")
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context("fork")
+    with tempfile.TemporaryDirectory() as directory:
+        print(f"{'processes':>10}{'drain':>10}{'throughput':>16}{'duplicates':>12}")
+        for processes in args.processes:
+            path = os.path.join(directory, f"outbox-{processes}.db")
+            fill(path, args.notifications)
+            start = time.perf_counter()
+            with context.Pool(processes) as pool:
+                results = pool.starmap(drain, [(path, args.send_ms / 1000)] * processes)
+            elapsed = time.perf_counter() - start
+            sends = Counter(notification_id for sent in results for notification_id in sent)
+            duplicates = sum(count - 1 for count in sends.values())
+            assert len(sends) == args.notifications, f"{args.notifications - len(sends)} rows never sent"
+            print(f"{processes:>10}{elapsed:>9.2f}s{args.notifications / elapsed:>11.0f} msg/s{duplicates:>12}")
+
+        # Crash recovery: leased rows are invisible until the lease expires, then redelivered
+        path = os.path.join(directory, "outbox-crash.db")
+        fill(path, 200)
+        lease = 1.0
+        lost = claim_and_die(path, lease, 50)
+        first = drain(path, 0.0)
+        time.sleep(lease)
+        recovered = drain(path, 0.0)
+        counts = NotificationOutbox(path).counts()
+        print(
+            f"\ncrash: {lost} rows leased by a dead worker, {len(first)} sent at once, "
+            f"{len(recovered)} redelivered after the {lease:.0f}s lease; outbox {counts}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Notification storage benchmark
+
+Fills a NotificationManager with synthetic notifications spread over many
+recipients (a share of them sent, read or failed) and times the operations
+the notification routes use, against the previous storage: one list that
+every call filters, sorts or copies.
+
+Usage (notification modules use backend.* imports, so run from the repository root):
+
+python -m backend.benchmarks.bench_notification_store --notifications 100000 --recipients 2000
+"""
+
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+from backend.app.models.notifications import Notification, NotificationManager, NotificationStatus, NotificationType
+
+
+class ListNotificationStore:
+    """The list-backed NotificationManager operations, as they were"""
+
+    def __init__(self, notifications):
+        self.notifications = list(notifications)
+
+    def get_user_notifications(self, user_id, unread_only=False, limit=50):
+        notifications = [n for n in self.notifications if n.recipient_id == user_id]
+        if unread_only:
+            notifications = [n for n in notifications if n.status != NotificationStatus.READ]
+        notifications.sort(key=lambda n: n.created_at, reverse=True)
+        return notifications[:limit]
+
+    def get_notification(self, notification_id):
+        return next((n for n in self.notifications if n.id == notification_id), None)
+
+    def get_pending_notifications(self):
+        return [n for n in self.notifications if n.status == NotificationStatus.PENDING]
+
+    def get_failed_notifications(self):
+        return [n for n in self.notifications if n.can_retry()]
+
+    def cleanup_old_notifications(self, days=30):
+        cutoff_date = datetime.utcnow() - timedelta(days=days)
+        self.notifications = [
+            n for n in self.notifications
+            if n.created_at > cutoff_date or n.status == NotificationStatus.PENDING
+        ]
+
+
+def build_notifications(count: int, recipients: int, seed: int = 7):
+    """Notifications over the last 60 days, oldest first; ~2% pending, ~1% failed"""
+    rng = random.Random(seed)
+    start = datetime.utcnow() - timedelta(days=60)
+    notifications = []
+    for i in range(count):
+        notification = Notification(f"member-{rng.randrange(recipients)}", "Call update", f"Call CA{i} changed", NotificationType.CALL_ASSIGNED)
+        notification.created_at = start + timedelta(days=60 * i / count)
+        roll = rng.random()
+        if roll < 0.01:
+            notification.mark_failed("SMTP unavailable")
+        elif roll < 0.97:
+            notification.mark_sent()
+            if rng.random() < 0.6:
+                notification.mark_read()
+        notifications.append(notification)
+    return notifications
+
+
+def timed(function, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) / repeat * 1_000_000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark notification storage")
+    parser.add_argument("--notifications", type=int, default=100_000, help="Stored notifications")
+    parser.add_argument("--recipients", type=int, default=2000, help="Distinct recipients")
+    parser.add_argument("--repeat", type=int, default=20, help="Timed repetitions per operation")
+    args = parser.parse_args()
+
+    notifications = build_notifications(args.notifications, args.recipients)
+    legacy = ListNotificationStore(notifications)
+    manager = NotificationManager()
+    for notification in notifications:
+        manager.add(notification)
+    rng = random.Random(11)
+    users = [f"member-{rng.randrange(args.recipients)}" for _ in range(args.repeat)]
+    ids = [rng.choice(notifications).id for _ in range(args.repeat)]
+
+    operations = [
+        ("user inbox (50)", lambda store: [store.get_user_notifications(u) for u in users]),
+        ("user unread (50)", lambda store: [store.get_user_notifications(u, unread_only=True) for u in users]),
+        ("lookup by id", lambda store: [store.get_notification(i) for i in ids]),
+        ("pending list", lambda store: store.get_pending_notifications()),
+        ("failed list", lambda store: store.get_failed_notifications()),
+    ]
+    print(f"{args.notifications} notifications, {args.recipients} recipients\n")
+    print(f"{'operation':<20}{'list':>14}{'indexed':>14}{'speedup':>10}")
+    for name, operation in operations:
+        per_call = len(users) if name.startswith(("user", "lookup")) else 1
+        before = timed(lambda: operation(legacy), 1 if per_call > 1 else args.repeat) / per_call
+        after = timed(lambda: operation(manager), 1 if per_call > 1 else args.repeat) / per_call
+        print(f"{name:<20}{before:>12.1f}us{after:>12.1f}us{before / after:>9.0f}x")
+
+    # Retention: a periodic cleanup that expires one day, then a backlog of 29 days
+    for days in (59, 30):
+        start = time.perf_counter()
+        legacy.cleanup_old_notifications(days)
+        before = (time.perf_counter() - start) * 1_000_000
+        start = time.perf_counter()
+        removed = manager.cleanup_old_notifications(days)
+        after = (time.perf_counter() - start) * 1_000_000
+        print(f"{f'cleanup ({days} days)':<20}{before:>12.1f}us{after:>12.1f}us{before / after:>9.1f}x  ({removed} removed)")
+    assert len(legacy.notifications) == len(manager)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""
+Safety response bundle benchmark
+
+Times the per-call work of turning a classification into everything the
+ultra-fast routes send out: the result dict, its call_metadata JSON, the
+/voice/ultra-fast response body and the voice TwiML. The previous path
+built each of those from safety_responses on every call; the bundle path
+copies the precomputed result and splices the call's timings into
+pre-serialized JSON and pre-rendered TwiML. Checks both produce the same
+documents for every category and severity, then runs process() end to end
+against a scratch database: times the request path (call records are
+written on a storage thread, after process() returns) against the database
+write it no longer waits for, and checks the calls were stored.
+
+Usage:
+
+python -m benchmarks.bench_safety_bundles --repeat 20000
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+
+TRANSCRIPTS = [
+    "there is a massive fire in the building",
+    "my father is having a heart attack",
+    "someone broke in, there is a gun",
+    "car crash on the highway",
+    "I want to harm myself",
+    "I need help please",
+]
+
+SAFETY_KEYS = {}  # EmergencyType -> safety_responses key, filled in once the service is imported
+
+
+def legacy_documents(service, twilio, classification, processing_time: float, current_time: float):
+    """process, _store_conversation_async and the route as they were: build and serialize everything per call"""
+    safety = service.safety_responses[SAFETY_KEYS.get(classification['category'], 'Other')]
+    frontend_category = service._map_to_frontend_category(classification['category'])
+    result = {
+        'category': frontend_category,
+        'priority': classification['priority'],
+        'reasoning_byte': classification['reasoning'],
+        'processing_time_ms': processing_time,
+        'confidence': 0.95,
+        'what_to_say': safety['what_to_say'],
+        'immediate_actions': safety['immediate_actions'],
+        'safety_precautions': safety['safety_precautions'],
+        'priority_level': classification['severity'],
+        'response_type': 'hybrid_conversation',
+        'dispatched_service': safety['dispatched_service'],
+        'assigned_service': classification['service'].value,
+        'danger_question': safety['danger_question'],
+        'escalated_response': safety['escalated_response'],
+        'status': 'AWAITING_FOLLOWUP',
+        'timestamp': current_time,
+        'created_at': current_time,
+        'call_time': current_time,
+        'classification_method': 'rule_based',
+        'safety_method': 'predefined',
+        'post_accident_actions': safety.get('post_accident_actions', []),
+        'post_accident_precautions': safety.get('post_accident_precautions', [])
+    }
+    metadata = json.dumps({
+        'dispatched_service': result['dispatched_service'],
+        'priority_level': result['priority_level'],
+        'response_type': result['response_type'],
+        'classification_method': result['classification_method'],
+        'safety_method': result['safety_method'],
+        'timestamp': result['timestamp'],
+        'call_time': result['call_time'],
+        'immediate_actions': result['immediate_actions'],
+        'safety_precautions': result['safety_precautions'],
+        'what_to_say': result['what_to_say'],
+        'danger_question': result.get('danger_question', ''),
+        'escalated_response': result.get('escalated_response', ''),
+        'conversation_status': result['status'],
+        'frontend_category': frontend_category
+    })
+    response = json.dumps({
+        name: result[name] for name in (
+            'category', 'priority', 'reasoning_byte', 'processing_time_ms', 'what_to_say', 'immediate_actions',
+            'safety_precautions', 'priority_level', 'response_type', 'confidence', 'dispatched_service',
+            'assigned_service', 'timestamp', 'created_at', 'call_time', 'status', 'classification_method',
+            'safety_method', 'post_accident_actions', 'post_accident_precautions'
+        )
+    }).encode("utf-8")
+    twiml = twilio.generate_ultra_fast_voice_response(result['what_to_say'], True)
+    return result, metadata, response, twiml
+
+
+def bundle_documents(service, classification, processing_time: float, current_time: float):
+    """The same documents from the precomputed bundle"""
+    result = dict(service.bundles[(classification['category'], classification['severity'])].result)
+    result['processing_time_ms'] = processing_time
+    result['timestamp'] = result['created_at'] = result['call_time'] = current_time
+    return result, service._metadata_json(result), service.response_json(result), service.voice_twiml(result)
+
+
+def timed(function, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) / repeat * 1_000_000
+
+
+async def store_calls(service, calls: int):
+    """Mean process() time per turn, and mean storage time per turn once every write has finished"""
+    turns = 0
+    start = time.perf_counter()
+    for i in range(calls):
+        call_sid = f"CA{i:08d}"
+        await service.process(TRANSCRIPTS[i % len(TRANSCRIPTS)], call_sid, from_number="+15550100", to_number="+15550199")
+        await service.process("yes", call_sid, is_followup=True)
+        turns += 2
+    request_path = time.perf_counter() - start
+    await service.flush_storage()
+    total = time.perf_counter() - start
+    return request_path / turns * 1_000_000, total / turns * 1_000_000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark precomputed safety response bundles")
+    parser.add_argument("--repeat", type=int, default=20_000, help="Responses built per category")
+    parser.add_argument("--calls", type=int, default=200, help="Calls (initial + follow-up turn) run through process()")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(directory, 'calls.db')}"
+        os.environ["CONVERSATION_STORE_PATH"] = os.path.join(directory, "conversations.db")
+        from services import hybrid_triage_service as module
+        from services.database_service import database_service
+        from services.twilio_service import twilio_service
+
+        service = module.hybrid_triage_service
+        SAFETY_KEYS.update({config['category']: name for name, config in service.emergency_keywords.items()})
+        for (category, severity), bundle in service.bundles.items():
+            classification = {
+                'category': category,
+                'priority': module.SEVERITY_PRIORITIES[severity],
+                'severity': severity,
+                'service': next(
+                    (c['service'] for c in service.emergency_keywords.values() if c['category'] == category),
+                    module.EmergencyService.AMBULANCE
+                ),
+                'reasoning': 'General emergency'
+            }
+            legacy = legacy_documents(service, twilio_service, classification, 0.42, 1700000000.5)
+            bundled = bundle_documents(service, classification, 0.42, 1700000000.5)
+            assert json.loads(legacy[1]) == json.loads(bundled[1]), f"{bundle.key}: call_metadata differs"
+            assert json.loads(legacy[2]) == json.loads(bundled[2]), f"{bundle.key}: response body differs"
+            assert legacy[3] == bundled[3], f"{bundle.key}: TwiML differs"
+
+        print(f"{'category':<24}{'build':>12}{'bundle':>12}{'speedup':>10}")
+        for transcript in TRANSCRIPTS:
+            classification = service._classify_instant(transcript)
+            key = service.bundles[(classification['category'], classification['severity'])].key
+            before = timed(lambda: legacy_documents(service, twilio_service, classification, 0.42, time.time()), args.repeat)
+            after = timed(lambda: bundle_documents(service, classification, 0.42, time.time()), args.repeat)
+            print(f"{key:<24}{before:>10.2f}us{after:>10.2f}us{before / after:>9.1f}x")
+
+        request_path, with_storage = asyncio.run(store_calls(service, args.calls))
+        stored = [database_service.get_call_by_sid(f"CA{i:08d}") for i in range(args.calls)]
+        assert all(stored), "process() did not store its calls"
+        assert all(call.status.value == "ESCALATED" for call in stored), "follow-up turns were not applied in order"
+        print(f"\nprocess() per turn: {request_path:.0f}us on the request path, "
+              f"{with_storage:.0f}us including the call-record writes it hands off")
+        print(f"{len(stored)} call records ({', '.join(sorted({c.emergency_type.value for c in stored}))})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+SummaryEngine extraction benchmark
+
+Compares the precompiled extraction against the previous raw-pattern
+re.search loop (module cache lookup per call) and against a single
+combined lookahead alternation, over a synthetic transcript corpus, and
+checks that all variants produce identical output.
+
+Usage:
+
+python -m benchmarks.bench_summary_extraction --transcripts 5000 --repeat 5
+"""
+
+import argparse
+import random
+import re
+import time
+from services.summary_engine import summary_engine
+
+FRAGMENTS = [
+    "There's a fire at Main Street",
+    "my father collapsed on Oak Avenue",
+    "a 45 year old male is not breathing",
+    "it happened 10 minutes ago",
+    "near MG Road by the mall",
+    "we are in Jaya Nagar",
+    "there was a crash just now",
+    "a pregnant woman needs help",
+    "at 221 Baker Street this morning",
+    "someone is bleeding badly",
+    "please hurry, the child is unconscious",
+    "female, 32 fell down the stairs",
+    "the building on Lake Road is burning tonight",
+    "Help please",
+]
+
+
+def build_corpus(size: int, seed: int = 7):
+    """Build a repeatable corpus of transcripts from common fragments"""
+    rng = random.Random(seed)
+    return [
+        ". ".join(rng.sample(FRAGMENTS, rng.randint(1, 4)))
+        for _ in range(size)
+    ]
+
+
+def legacy_extract(patterns, transcript):
+    """Previous implementation: try each raw pattern in order"""
+    for pattern in patterns:
+        match = re.search(pattern, transcript, re.IGNORECASE)
+        if match:
+            return match.group(1).strip()
+    return None
+
+
+def combined_regex(patterns):
+    """Single-pass alternative: one lookahead alternation, lowest group wins"""
+    alternatives = [p.replace('(', f'(?P<g{i}>', 1) for i, p in enumerate(patterns)]
+    return re.compile('(?=' + '|'.join(alternatives) + ')', re.IGNORECASE)
+
+
+def combined_extract(regex, transcript):
+    best = None
+    for match in regex.finditer(transcript):
+        if best is None or match.lastindex < best.lastindex:
+            best = match
+            if match.lastindex == 1:
+                break
+    return best.group(best.lastindex).strip() if best else None
+
+
+COMBINED = [
+    combined_regex(summary_engine.location_patterns),
+    combined_regex(summary_engine.victim_patterns),
+    combined_regex(summary_engine.time_patterns),
+]
+
+
+def run_legacy(corpus):
+    engine = summary_engine
+    return [
+        (
+            legacy_extract(engine.location_patterns, t),
+            legacy_extract(engine.victim_patterns, t),
+            legacy_extract(engine.time_patterns, t),
+        )
+        for t in corpus
+    ]
+
+
+def run_compiled(corpus):
+    engine = summary_engine
+    return [
+        (
+            engine._extract_location(t),
+            engine._extract_victim_info(t),
+            engine._extract_time_info(t),
+        )
+        for t in corpus
+    ]
+
+
+def run_combined(corpus):
+    return [tuple(combined_extract(regex, t) for regex in COMBINED) for t in corpus]
+
+
+def best_of(fn, corpus, repeat):
+    """Best wall-clock time over several runs, in milliseconds"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(corpus)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark SummaryEngine field extraction")
+    parser.add_argument("--transcripts", type=int, default=5000, help="Corpus size")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per variant")
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.transcripts)
+
+    legacy_output = run_legacy(corpus)
+    compiled_output = run_compiled(corpus)
+    combined_output = run_combined(corpus)
+    mismatches = sum(1 for a, b in zip(legacy_output, compiled_output) if a != b)
+    combined_mismatches = sum(1 for a, b in zip(legacy_output, combined_output) if a != b)
+
+    legacy_ms = best_of(run_legacy, corpus, args.repeat)
+    compiled_ms = best_of(run_compiled, corpus, args.repeat)
+    combined_ms = best_of(run_combined, corpus, args.repeat)
+
+    print(f"Transcripts:        {len(corpus)}")
+    print(f"Output mismatches:  {mismatches} (precompiled), {combined_mismatches} (combined)")
+    print(f"Raw re.search:      {legacy_ms:.2f}ms ({legacy_ms * 1000 / len(corpus):.2f}us/transcript)")
+    print(f"Precompiled:        {compiled_ms:.2f}ms ({compiled_ms * 1000 / len(corpus):.2f}us/transcript)")
+    print(f"Combined lookahead: {combined_ms:.2f}ms ({combined_ms * 1000 / len(corpus):.2f}us/transcript)")
+    print(f"Speedup:            {legacy_ms / compiled_ms:.2f}x (precompiled vs raw)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+TeamService call assignment benchmark
+
+Builds a TeamService with synthetic members spread over the default teams
+(random skills, statuses and loads), then times best-member selection for a
+mix of emergency types and skill requirements through the assignment index,
+against the previous linear scan over every member. Both are checked to pick
+the same member for every query, and again after a churn of call starts,
+call ends and status changes.
+
+Usage (team modules use backend.* imports, so run from the repository root; backend.services
+also loads the top-level config and utils packages, so backend/ goes on PYTHONPATH):
+
+PYTHONPATH=backend python -m backend.benchmarks.bench_team_assignment --members 10000 --queries 2000
+"""
+
+import argparse
+import random
+import time
+from backend.app.models.team import TeamStatus
+from backend.services.assignment_index import UNTEAMED
+from backend.services.team_service import TeamService
+
+SKILLS = ["medical", "fire", "police", "hazmat", "translation", "mental_health", "water_rescue"]
+EMERGENCY_TYPES = ["medical", "fire", "police", "general", None]
+
+
+def build_service(members: int, seed: int = 7) -> TeamService:
+    """Repeatable service with `members` members, about 70% active"""
+    rng = random.Random(seed)
+    service = TeamService()
+    team_ids = [team.id for team in service.get_all_teams()] + [None]
+    for i in range(members):
+        member = service.create_team_member(
+            name=f"Member {i}",
+            email=f"member{i}@example.com",
+            phone=f"+1555{i:07d}",
+            team_id=rng.choice(team_ids)
+        )
+        member.max_concurrent_calls = rng.randint(1, 3)
+        for skill in rng.sample(SKILLS, rng.randint(0, 3)):
+            service.add_skill_to_member(member.id, skill)
+        status = TeamStatus.ACTIVE if rng.random() < 0.7 else rng.choice([TeamStatus.ON_BREAK, TeamStatus.OFFLINE])
+        service.update_team_member_status(member.id, status)
+        if rng.random() < 0.5:
+            service.start_call_for_team_member(member.id, f"CA-warmup-{i}")
+            service.end_call_for_team_member(member.id, f"CA-warmup-{i}", rng.randint(5, 120))
+        if rng.random() < 0.3:
+            service.start_call_for_team_member(member.id, f"CA-load-{i}")
+    return service
+
+
+def linear_scan(service: TeamService, emergency_type, required_skills):
+    """The pre-index selection: filter every member, then min by (load, response time)"""
+    suitable_members = []
+    for member in service.team_members.values():
+        if not member.is_available_for_call():
+            continue
+        if required_skills and not any(skill in member.skills for skill in required_skills):
+            continue
+        if emergency_type:
+            member_team = service.teams.get(member.team_id) if member.team_id else None
+            if member_team and member_team.specialization == emergency_type:
+                suitable_members.append(member)
+            elif not member_team:
+                suitable_members.append(member)
+        else:
+            suitable_members.append(member)
+    if not suitable_members:
+        return None
+    return min(suitable_members, key=lambda m: (m.current_calls, m.avg_response_time))
+
+
+def indexed(service: TeamService, emergency_type, required_skills):
+    pools = [emergency_type, UNTEAMED] if emergency_type else None
+    return service.assignment_index.best(pools, required_skills)
+
+
+def build_queries(count: int, seed: int = 11):
+    rng = random.Random(seed)
+    return [
+        (rng.choice(EMERGENCY_TYPES), rng.sample(SKILLS, rng.randint(0, 2)))
+        for _ in range(count)
+    ]
+
+
+def count_mismatches(service: TeamService, queries) -> int:
+    return sum(
+        1 for emergency_type, skills in queries
+        if linear_scan(service, emergency_type, skills) is not indexed(service, emergency_type, skills)
+    )
+
+
+def churn(service: TeamService, queries, seed: int = 13):
+    """Assign every query, then end half of the calls and flip some statuses"""
+    rng = random.Random(seed)
+    assigned = []
+    for i, (emergency_type, skills) in enumerate(queries):
+        member = service.assign_call_to_team_member(f"CA-churn-{i}", emergency_type, skills)
+        if member:
+            assigned.append((member.id, f"CA-churn-{i}"))
+    for member_id, call_sid in assigned[::2]:
+        service.end_call_for_team_member(member_id, call_sid, rng.randint(5, 120))
+    for member in rng.sample(list(service.team_members.values()), len(service.team_members) // 20):
+        service.update_team_member_status(member.id, rng.choice([TeamStatus.ACTIVE, TeamStatus.ON_BREAK]))
+
+
+def time_per_query(fn, service, queries):
+    """Mean wall-clock time per query, in microseconds"""
+    start = time.perf_counter()
+    for emergency_type, skills in queries:
+        fn(service, emergency_type, skills)
+    return (time.perf_counter() - start) / len(queries) * 1_000_000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark TeamService call assignment")
+    parser.add_argument("--members", type=int, default=10_000, help="Team members")
+    parser.add_argument("--queries", type=int, default=2_000, help="Timed assignment queries per variant")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    service = build_service(args.members)
+    build_s = time.perf_counter() - start
+    queries = build_queries(args.queries)
+
+    mismatches = count_mismatches(service, queries)
+    scan_us = time_per_query(linear_scan, service, queries)
+    index_us = time_per_query(indexed, service, queries)
+
+    start = time.perf_counter()
+    churn(service, queries[: len(queries) // 2])
+    churn_us = (time.perf_counter() - start) / (len(queries) // 2) * 1_000_000
+    churn_mismatches = count_mismatches(service, queries)
+
+    available = len(service.get_available_team_members())
+    print(f"Members:            {args.members} ({available} available, built in {build_s:.1f}s)")
+    print(f"Pick mismatches:    {mismatches} before churn, {churn_mismatches} after")
+    print(f"Linear scan:        {scan_us:.1f}us per pick")
+    print(f"Assignment index:   {index_us:.2f}us per pick ({scan_us / index_us:.0f}x)")
+    print(f"Assign + churn:     {churn_us:.1f}us per assigned call")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+TwiML rendering benchmark
+
+Times each fixed-shape TwilioService response through the compiled
+templates against the VoiceResponse builder path it replaced (object tree
+built and serialized on every webhook), and checks both produce identical
+bytes. Also renders the ultra-fast voice route with a hostile transcript to
+show slot values are escaped.
+
+Usage:
+
+python -m benchmarks.bench_twiml_render --repeat 20000
+"""
+
+import argparse
+import time
+from xml.etree import ElementTree
+from twilio.twiml.voice_response import Gather, VoiceResponse
+from config import settings
+from services.twilio_service import DEFAULT_ERROR_MESSAGE, twilio_service
+
+VOICE = settings.AI_ASSISTANT_VOICE
+
+
+def speech_gather(**extra) -> Gather:
+    return Gather(input='speech', timeout=settings.SPEECH_TIMEOUT, action='/api/voice/process', method='POST', language='en-US', **extra)
+
+
+def legacy_emergency_speech() -> str:
+    response = VoiceResponse()
+    gather = speech_gather(speech_timeout=5, speech_model='phone_call')
+    gather.say("Emergency services. Please describe your emergency clearly and calmly.", voice=VOICE, language='en-US')
+    response.append(gather)
+    response.say("I didn't catch that. Please state your emergency now.", voice=VOICE, language='en-US')
+    response.say("If you need immediate assistance, please call back. Goodbye.", voice=VOICE, language='en-US')
+    response.hangup()
+    return str(response)
+
+
+def legacy_emergency_retry() -> str:
+    response = VoiceResponse()
+    gather = speech_gather(speech_timeout=5, speech_model='phone_call')
+    gather.say("Please describe your emergency. What services do you need?", voice=VOICE, language='en-US')
+    response.append(gather)
+    response.say("Emergency recorded. Assistance is being dispatched.", voice=VOICE, language='en-US')
+    response.hangup()
+    return str(response)
+
+
+def legacy_welcome() -> str:
+    response = VoiceResponse()
+    gather = speech_gather()
+    gather.say(f"Hello! This is {settings.AI_ASSISTANT_NAME}, your AI assistant. How can I help you today?", voice=VOICE, language='en-US')
+    gather.say("I didn't catch that. How can I help you?", voice=VOICE, language='en-US')
+    response.append(gather)
+    response.say("Thank you for calling. Goodbye!", voice=VOICE, language='en-US')
+    response.hangup()
+    return str(response)
+
+
+def legacy_conversation(ai_response: str) -> str:
+    response = VoiceResponse()
+    gather = speech_gather()
+    gather.say(ai_response, voice=VOICE, language='en-US')
+    response.append(gather)
+    response.say("Thank you for calling. Goodbye!", voice=VOICE, language='en-US')
+    response.hangup()
+    return str(response)
+
+
+def legacy_error(error_message: str = DEFAULT_ERROR_MESSAGE) -> str:
+    response = VoiceResponse()
+    response.say(error_message, voice=VOICE, language='en-US')
+    response.say("Please try again later. Goodbye!", voice=VOICE, language='en-US')
+    response.hangup()
+    return str(response)
+
+
+def legacy_goodbye() -> str:
+    response = VoiceResponse()
+    response.say("Thank you for calling. Have a great day! Goodbye!", voice=VOICE, language='en-US')
+    response.hangup()
+    return str(response)
+
+
+def timed(function, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) / repeat * 1_000_000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark TwiML rendering")
+    parser.add_argument("--repeat", type=int, default=20_000, help="Renders per response")
+    args = parser.parse_args()
+
+    message = "Stay calm & keep pressure on the wound. Help is 5 minutes away."
+    cases = [
+        ("emergency speech", legacy_emergency_speech, twilio_service.generate_emergency_speech_response),
+        ("emergency retry", legacy_emergency_retry, twilio_service.generate_emergency_retry_response),
+        ("welcome", legacy_welcome, twilio_service.generate_welcome_response),
+        ("error", legacy_error, twilio_service.generate_error_response),
+        ("goodbye", legacy_goodbye, twilio_service.generate_goodbye_response),
+        ("conversation", lambda: legacy_conversation(message), lambda: twilio_service.generate_conversation_response(message)),
+        ("error (custom)", lambda: legacy_error(message), lambda: twilio_service.generate_error_response(message)),
+    ]
+    print(f"{'response':<18}{'builder':>12}{'template':>12}{'speedup':>10}")
+    for name, legacy, compiled in cases:
+        assert legacy().encode("utf-8") == compiled(), f"{name}: output differs from the builder"
+        before = timed(legacy, args.repeat)
+        after = timed(compiled, args.repeat)
+        print(f"{name:<18}{before:>10.2f}us{after:>10.2f}us{before / after:>9.0f}x")
+
+    hostile = 'Help</Say><Redirect>https://attacker.example/twiml</Redirect><Say>'
+    rendered = twilio_service.generate_ultra_fast_voice_response(hostile, awaiting_followup=True)
+    verbs = [child.tag for child in ElementTree.fromstring(rendered)]
+    assert "Redirect" not in verbs, "transcript injected a verb"
+    print(f"\nultra-fast voice with injected markup -> verbs {verbs}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+/metrics exposition check
+
+Loads the team, notification and emergency services (backend.* imports)
+next to main.py's app and checks GET /metrics on the app lists their
+series: team utilization, notification queue depth and deliveries, and the
+emergency escalation gauges. The services import the registry as
+backend.utils.metrics_registry and main.py as utils.metrics_registry; both
+names must resolve to the one module, or the services would fill a second
+registry and their series would be missing here.
+
+Usage (run from the repository root with backend/ on PYTHONPATH, like the
+other backend.services benchmarks; main.py imports the top-level packages):
+
+PYTHONPATH=backend python -m backend.benchmarks.check_metrics
+"""
+
+import os
+import sys
+import tempfile
+
+EXPECTED = [
+    "team_calls_in_progress",
+    "team_call_capacity",
+    "team_utilization_ratio",
+    "notification_queue_depth",
+    "notification_deliveries_total",
+    "notification_dispatch_queue_depth",
+    "emergency_escalation_timers",
+    "emergency_escalation_lateness_seconds",
+]
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        os.environ["EMERGENCY_ARCHIVE_PATH"] = os.path.join(directory, "emergency_archive.db")
+        os.environ["NOTIFICATION_OUTBOX_PATH"] = os.path.join(directory, "notification_outbox.db")
+        from backend.services.emergency_service import emergency_service
+        from backend.services.notification_service import notification_service  # noqa: F401 (registers its series)
+        from backend.services.team_service import team_service
+        from fastapi.testclient import TestClient
+        from main import app
+
+        assert sys.modules["utils.metrics_registry"] is sys.modules["backend.utils.metrics_registry"], "two metrics registries"
+        body = TestClient(app).get("/metrics").text
+        missing = [name for name in EXPECTED if f"# TYPE {name} " not in body]
+        for name in EXPECTED:
+            print(f"{'MISSING' if name in missing else 'ok':<9}{name}")
+        assert not missing, f"/metrics is missing {missing}"
+        print(f"\nall {len(EXPECTED)} series on /metrics ({len(team_service.team_members)} team members loaded)")
+        emergency_service.archive.close()
+
+
+if __name__ == "__main__":
+    main()
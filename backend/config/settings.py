@@ -1,10 +1,14 @@
 import os
+import sys
 from typing import Optional
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
+# Default data files live in backend/ whatever directory the app or a benchmark is started from
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
 
 class Settings:
     def __init__(self):
@@ -33,6 +37,7 @@ class Settings:
         self.SYSTEM_VERSION = os.getenv("SYSTEM_VERSION", "2.0.0")
         
         # Voice Configuration
+        self.AI_ASSISTANT_NAME = os.getenv("AI_ASSISTANT_NAME", "HackAura")
         self.AI_ASSISTANT_VOICE = os.getenv("AI_ASSISTANT_VOICE", "alice")
         
         # Emergency Processing Configuration
@@ -48,7 +53,7 @@ class Settings:
         
         # Debug Configuration
         self.DEBUG_MODE = os.getenv("DEBUG_MODE", "true").lower() == "true"
-        self.VERBOSE_LOGGING = os.getenv("VERBOSE_LOGGING", "true").lower() == "true"
+        self.VERBOSE_LOGGING = os.getenv("VERBOSE_LOGGING", "false").lower() == "true"
         self.LOG_REQUESTS = os.getenv("LOG_REQUESTS", "true").lower() == "true"
         self.LOG_RESPONSES = os.getenv("LOG_RESPONSES", "true").lower() == "true"
         self.LOG_TRIAGE_STEPS = os.getenv("LOG_TRIAGE_STEPS", "true").lower() == "true"
@@ -56,7 +61,41 @@ class Settings:
         # Database Configuration
         self.DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./hackaura.db")
         self.DEBUG = self.DEBUG_MODE
-        
+
+        # Conversation State Configuration ("sqlite" shares state across workers, "memory" is per-process)
+        self.CONVERSATION_STORE = os.getenv("CONVERSATION_STORE", "sqlite")
+        self.CONVERSATION_STORE_PATH = os.getenv("CONVERSATION_STORE_PATH", os.path.join(BACKEND_DIR, "conversations.db"))
+        self.CONVERSATION_TTL_SECONDS = int(os.getenv("CONVERSATION_TTL_SECONDS", "3600"))
+
+        # Routing Configuration (optional JSON file overriding the type x severity routing matrix)
+        self.ROUTING_MATRIX_PATH = os.getenv("ROUTING_MATRIX_PATH") or None
+
+        # Analytics Persistence (append-only event log + snapshots; empty dir keeps analytics in memory)
+        self.ANALYTICS_LOG_DIR = os.getenv("ANALYTICS_LOG_DIR", "./analytics_data")
+        self.ANALYTICS_LOG_FSYNC = os.getenv("ANALYTICS_LOG_FSYNC", "false").lower() == "true"
+        self.ANALYTICS_SNAPSHOT_EVERY = int(os.getenv("ANALYTICS_SNAPSHOT_EVERY", "10000"))
+
+        # Tracing Configuration ("none", "file" for NDJSON spans, "otlp" for an OTLP/HTTP JSON collector)
+        self.TRACING_EXPORTER = os.getenv("TRACING_EXPORTER", "none")
+        self.TRACING_FILE_PATH = os.getenv("TRACING_FILE_PATH", "./traces.ndjson")
+        self.TRACING_OTLP_ENDPOINT = os.getenv("TRACING_OTLP_ENDPOINT", "http://localhost:4318/v1/traces")
+
+        # Notification Dispatch (per-channel async workers; transport errors are retried with exponential backoff)
+        self.NOTIFICATION_MAX_ATTEMPTS = int(os.getenv("NOTIFICATION_MAX_ATTEMPTS", "4"))
+        self.NOTIFICATION_RETRY_BASE_SECONDS = float(os.getenv("NOTIFICATION_RETRY_BASE_SECONDS", "1.0"))
+        self.NOTIFICATION_EMAIL_RATE = float(os.getenv("NOTIFICATION_EMAIL_RATE", "10"))  # sends per second
+        self.NOTIFICATION_SMS_RATE = float(os.getenv("NOTIFICATION_SMS_RATE", "5"))
+        self.NOTIFICATION_WEBHOOK_RATE = float(os.getenv("NOTIFICATION_WEBHOOK_RATE", "50"))
+        self.NOTIFICATION_RETENTION_DAYS = int(os.getenv("NOTIFICATION_RETENTION_DAYS", "30"))  # Sent/read/failed ones are dropped after this
+        self.NOTIFICATION_OUTBOX_PATH = os.getenv("NOTIFICATION_OUTBOX_PATH", os.path.join(BACKEND_DIR, "notification_outbox.db"))  # Empty keeps the queue in memory only
+        self.NOTIFICATION_OUTBOX_LEASE_SECONDS = float(os.getenv("NOTIFICATION_OUTBOX_LEASE_SECONDS", "120"))
+        self.NOTIFICATION_OUTBOX_POLL_SECONDS = float(os.getenv("NOTIFICATION_OUTBOX_POLL_SECONDS", "5"))
+        self.NOTIFICATION_DIGEST_WINDOW_SECONDS = float(os.getenv("NOTIFICATION_DIGEST_WINDOW_SECONDS", "60"))  # Repeats of an alert within this go out as one digest; 0 disables
+
+        # Emergency History (a bounded in-memory tail of resolved emergencies; empty archive path keeps only the tail)
+        self.EMERGENCY_HISTORY_SIZE = int(os.getenv("EMERGENCY_HISTORY_SIZE", "1000"))
+        self.EMERGENCY_ARCHIVE_PATH = os.getenv("EMERGENCY_ARCHIVE_PATH", os.path.join(BACKEND_DIR, "emergency_archive.db"))
+
         # WebSocket Configuration
         self.WEBSOCKET_ENABLED = os.getenv("WEBSOCKET_ENABLED", "true").lower() == "true"
         self.WEBSOCKET_CORS_ALLOWED_ORIGINS = os.getenv("WEBSOCKET_CORS_ALLOWED_ORIGINS", "http://localhost:3000,http://127.0.0.1:3000").split(",")
@@ -74,3 +113,8 @@ class Settings:
 
 
 settings = Settings()
+
+# Loaded as config.settings by main.py (run from backend/) and as backend.config.settings by
+# the team, notification and emergency services; register both names so there is one Settings
+for _name in ("config.settings", "backend.config.settings"):
+    sys.modules.setdefault(_name, sys.modules[__name__])
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import List, Optional
 from datetime import datetime
 from enum import Enum
@@ -40,6 +40,9 @@ class SeverityResult(BaseModel):
 
 
 class RoutingResult(BaseModel):
+    # Frozen: RoutingEngine hands out shared instances from its decision matrix
+    model_config = ConfigDict(frozen=True)
+
     assigned_service: EmergencyService
     priority: int = Field(ge=1, le=10)
 
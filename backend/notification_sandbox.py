@@ -0,0 +1,233 @@
+"""
+Local stand-ins for the SMTP server and webhook receiver used by
+notification delivery, so email and webhook channels can be exercised
+offline. Received messages are logged (and optionally written as NDJSON);
+a failure rate can be injected to watch retries with backoff.
+
+Usage examples:
+
+# Accept email on :1025 and webhooks on :8025:
+python notification_sandbox.py
+
+# Point the backend at them:
+SMTP_SERVER=localhost SMTP_PORT=1025 SMTP_STARTTLS=false WEBHOOK_URL=http://localhost:8025/webhook
+
+# Reject a quarter of the messages with a transient error, 50ms per message:
+python notification_sandbox.py --fail-rate 0.25 --delay 0.05 --output received.ndjson
+
+Notes:
+- SMTP: EHLO/HELO, AUTH PLAIN/LOGIN (any credentials), MAIL, RCPT, DATA,
+  RSET, NOOP and QUIT; no STARTTLS. Failed messages get a 451 reply.
+- Webhooks: HTTP/1.1 keep-alive POSTs to any path; failures get a 503.
+"""
+
+import argparse
+import json
+import logging
+import random
+import socketserver
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger("notification_sandbox")
+
+
+class SandboxStats:
+    """Counters and the optional NDJSON sink shared by both servers"""
+
+    def __init__(self, output_path: str = None, fail_rate: float = 0.0, delay: float = 0.0):
+        self.output_path = output_path
+        self.fail_rate = fail_rate
+        self.delay = delay
+        self.connections = {"smtp": 0, "http": 0}
+        self.received = {"smtp": 0, "http": 0}
+        self.rejected = {"smtp": 0, "http": 0}
+        self._lock = threading.Lock()
+
+    def connected(self, kind: str):
+        with self._lock:
+            self.connections[kind] += 1
+
+    def accept(self, kind: str, record: dict) -> bool:
+        """Record a message, False when the injected failure rate rejects it"""
+        if self.delay:
+            time.sleep(self.delay)
+        with self._lock:
+            if self.fail_rate and random.random() < self.fail_rate:
+                self.rejected[kind] += 1
+                return False
+            self.received[kind] += 1
+            if self.output_path:
+                with open(self.output_path, "a") as f:
+                    f.write(json.dumps({"channel": kind, "received_at": time.time(), **record}) + "\n")
+        return True
+
+
+def make_smtp_handler(stats: SandboxStats):
+    class SmtpHandler(socketserver.StreamRequestHandler):
+        def reply(self, line: str):
+            self.wfile.write(line.encode() + b"\r\n")
+
+        def readline(self):
+            """Next line without its line ending, None once the client hung up"""
+            raw = self.rfile.readline(65537)
+            return raw.decode("utf-8", "replace").rstrip("\r\n") if raw else None
+
+        def handle(self):
+            stats.connected("smtp")
+            sender, recipients = None, []
+            self.reply("220 localhost notification sandbox ESMTP")
+            while True:
+                line = self.readline()
+                if line is None:
+                    return
+                command = line[:4].upper()
+                if command in ("EHLO", "HELO"):
+                    if command == "EHLO":
+                        self.reply("250-localhost")
+                        self.reply("250-AUTH PLAIN LOGIN")
+                        self.reply("250 8BITMIME")
+                    else:
+                        self.reply("250 localhost")
+                elif command == "AUTH":
+                    if line.split()[1:2] == ["LOGIN"]:
+                        self.reply("334 VXNlcm5hbWU6")
+                        self.readline()
+                        self.reply("334 UGFzc3dvcmQ6")
+                        self.readline()
+                    self.reply("235 Authentication successful")
+                elif command == "MAIL":
+                    sender, recipients = line.split(":", 1)[1].strip(), []
+                    self.reply("250 OK")
+                elif command == "RCPT":
+                    recipients.append(line.split(":", 1)[1].strip())
+                    self.reply("250 OK")
+                elif command == "DATA":
+                    self.reply("354 End data with <CR><LF>.<CR><LF>")
+                    body = []
+                    while True:
+                        data_line = self.readline()
+                        if data_line is None:
+                            return
+                        if data_line == ".":
+                            break
+                        body.append(data_line[1:] if data_line.startswith("..") else data_line)
+                    subject = next((l[9:] for l in body if l.lower().startswith("subject: ")), "")
+                    if stats.accept("smtp", {"from": sender, "to": recipients, "subject": subject}):
+                        logger.info(f"✉️  {sender} -> {', '.join(recipients)}: {subject}")
+                        self.reply("250 OK: queued")
+                    else:
+                        self.reply("451 Temporary failure, try again later")
+                    sender, recipients = None, []
+                elif command == "RSET":
+                    sender, recipients = None, []
+                    self.reply("250 OK")
+                elif command == "NOOP":
+                    self.reply("250 OK")
+                elif command == "QUIT":
+                    self.reply("221 Bye")
+                    return
+                else:
+                    self.reply("502 Command not implemented")
+
+    return SmtpHandler
+
+
+class SmtpSink(socketserver.ThreadingTCPServer):
+    """Minimal SMTP server accepting every message"""
+
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self, address, stats: SandboxStats):
+        super().__init__(address, make_smtp_handler(stats))
+
+
+def make_webhook_handler(stats: SandboxStats):
+    class WebhookHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # Keep-alive, so pooled clients reuse connections
+
+        def setup(self):
+            super().setup()
+            stats.connected("http")
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            try:
+                payload = json.loads(body or b"{}")
+            except ValueError:
+                self.respond(400, {"error": "invalid JSON"})
+                return
+            if stats.accept("http", {"path": self.path, "payload": payload}):
+                logger.info(f"🔔 {self.path}: {payload.get('title', '')} ({payload.get('priority', '-')})")
+                self.respond(200, {"ok": True})
+            else:
+                self.respond(503, {"error": "injected failure"})
+
+        def respond(self, status: int, body: dict):
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass
+
+    return WebhookHandler
+
+
+class WebhookSink(ThreadingHTTPServer):
+    """HTTP server accepting webhook POSTs on any path"""
+
+    daemon_threads = True
+
+    def __init__(self, address, stats: SandboxStats):
+        super().__init__(address, make_webhook_handler(stats))
+
+
+def start_sandbox(host: str = "127.0.0.1", smtp_port: int = 1025, http_port: int = 8025, stats: SandboxStats = None):
+    """
+    Serve both sinks on background threads
+
+    Returns:
+        (smtp server, webhook server, stats); pass port 0 to pick free ports
+    """
+    stats = stats or SandboxStats()
+    smtp = SmtpSink((host, smtp_port), stats)
+    webhook = WebhookSink((host, http_port), stats)
+    for server in (smtp, webhook):
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+    return smtp, webhook, stats
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    parser = argparse.ArgumentParser(description="Local SMTP and webhook stand-ins for notification delivery")
+    parser.add_argument("--host", default="127.0.0.1", help="Address to listen on")
+    parser.add_argument("--smtp-port", type=int, default=1025, help="SMTP port")
+    parser.add_argument("--http-port", type=int, default=8025, help="Webhook HTTP port")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="Fraction of messages rejected with a transient error")
+    parser.add_argument("--delay", type=float, default=0.0, help="Seconds to hold each message, like a slow provider")
+    parser.add_argument("--output", help="NDJSON file receiving accepted messages")
+    args = parser.parse_args()
+
+    stats = SandboxStats(args.output, args.fail_rate, args.delay)
+    smtp, webhook, stats = start_sandbox(args.host, args.smtp_port, args.http_port, stats)
+    logger.info(f"SMTP on {args.host}:{args.smtp_port}, webhooks on http://{args.host}:{args.http_port}/")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for server in (smtp, webhook):
+            server.shutdown()
+            server.server_close()
+        logger.info(f"Connections {stats.connections}, received {stats.received}, rejected {stats.rejected}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
 from fastapi import APIRouter, HTTPException, Query, Depends
+from fastapi.responses import StreamingResponse
 from typing import Optional
 from datetime import datetime, timedelta
 import logging
@@ -7,11 +8,15 @@ from sqlalchemy import text
 from models.database import CallRecord, EmergencyType, SeverityLevel, CallStatus
 from services.database_service import database_service
 from services.websocket_service import websocket_service
-# from services.analytics_service import analytics_service  # Temporarily disabled
+from services.analytics_service import analytics_service
+from services.export_service import export_service, ExportError
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+# Longest call duration / response time accepted (seconds)
+MAX_CALL_SECONDS = 24 * 3600
+
 def get_db():
     """Dependency to get database session"""
     return database_service.get_session()
@@ -189,30 +194,32 @@ async def get_analytics_dashboard():
 @router.post("/analytics/call")
 async def record_call_analytics(
     call_sid: str,
-    duration: int,
+    duration: int = Query(..., ge=0, le=MAX_CALL_SECONDS),
     is_emergency: bool = False,
     call_type: str = "standard",
     outcome: str = "completed",
-    response_time: Optional[int] = None,
+    response_time: Optional[int] = Query(None, ge=0, le=MAX_CALL_SECONDS),
     team_member_id: Optional[str] = None,
     caller_location: Optional[str] = None,
     quality_score: Optional[float] = None
 ):
     """Record call analytics"""
     try:
-        # analytics_service.record_call(
-        #     call_sid=call_sid,
-        #     duration=duration,
-        #     is_emergency=is_emergency,
-        #     call_type=call_type,
-        #     outcome=outcome,
-        #     response_time=response_time,
-        #     team_member_id=team_member_id,
-        #     caller_location=caller_location,
-        #     quality_score=quality_score
-        # )
+        analytics_service.record_call(
+            call_sid=call_sid,
+            duration=duration,
+            is_emergency=is_emergency,
+            call_type=call_type,
+            outcome=outcome,
+            response_time=response_time,
+            team_member_id=team_member_id,
+            caller_location=caller_location,
+            quality_score=quality_score
+        )
         
-        return {"success": True, "message": "Call analytics recording temporarily disabled"}
+        return {"success": True, "message": "Call analytics recorded"}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error recording call analytics: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
@@ -222,8 +229,7 @@ async def record_call_analytics(
 async def get_call_analytics(call_sid: str):
     """Get analytics for a specific call"""
     try:
-        # analytics = analytics_service.get_call_analytics(call_sid)
-        analytics = None
+        analytics = analytics_service.get_call_analytics(call_sid)
         if not analytics:
             raise HTTPException(status_code=404, detail="Call analytics not found")
             
@@ -239,8 +245,7 @@ async def get_call_analytics(call_sid: str):
 async def get_recent_calls(limit: int = Query(50, le=100)):
     """Get recent calls with analytics"""
     try:
-        # recent_calls = analytics_service.get_recent_calls(limit=limit)
-        recent_calls = []
+        recent_calls = analytics_service.get_recent_calls(limit=limit)
         return {"success": True, "calls": recent_calls, "count": len(recent_calls)}
     except Exception as e:
         logger.error(f"Error getting recent calls: {e}")
@@ -274,12 +279,45 @@ async def get_performance_report(
 
 
 @router.get("/analytics/export")
-async def export_analytics(format: str = Query("json", regex="^(json|csv)$")):
-    """Export analytics data"""
+async def export_analytics(
+    format: str = Query("json", regex="^(json|ndjson|csv|parquet)$"),
+    source: str = Query("calls", regex="^(calls|analytics)$"),
+    compression: str = Query("none", regex="^(none|gzip|zstd)$"),
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None
+):
+    """
+    Export analytics data
+    
+    format=json returns the dashboard + performance report document. ndjson,
+    csv and parquet stream every row of the chosen source (call_records or the
+    in-memory analytics call details) page by page, optionally compressed.
+    """
     try:
-        # export_data = analytics_service.export_analytics(format)
-        export_data = {"message": "Export temporarily disabled"}
-        return {"success": True, "data": export_data, "format": format}
+        if format == "json":
+            export_data = analytics_service.export_analytics()
+            return {"success": True, "data": export_data, "format": format}
+            
+        start_dt = datetime.fromisoformat(start_date.replace('Z', '+00:00')) if start_date else None
+        end_dt = datetime.fromisoformat(end_date.replace('Z', '+00:00')) if end_date else None
+        
+        chunks, media_type, filename = export_service.stream(
+            source=source,
+            format=format,
+            compression=compression,
+            date_from=start_dt,
+            date_to=end_dt,
+            analytics_service=analytics_service
+        )
+        return StreamingResponse(
+            chunks,
+            media_type=media_type,
+            headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+        )
+    except ExportError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid date format")
     except Exception as e:
         logger.error(f"Error exporting analytics: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
@@ -9,6 +9,18 @@ logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
+@router.on_event("startup")
+async def start_auto_escalation():
+    """Escalate unacknowledged emergencies when their deadline passes"""
+    await emergency_service.start()
+
+
+@router.on_event("shutdown")
+async def stop_auto_escalation():
+    """Stop the auto-escalation task"""
+    await emergency_service.shutdown()
+
+
 @router.post("/emergency")
 async def create_emergency_call(
     call_sid: str,
@@ -75,6 +87,29 @@ async def get_active_emergencies():
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
+# Registered before /emergency/{call_sid}, which would otherwise match these paths
+@router.get("/emergency/statistics")
+async def get_emergency_statistics():
+    """Get emergency statistics"""
+    try:
+        stats = emergency_service.get_emergency_statistics()
+        return {"success": True, "statistics": stats}
+    except Exception as e:
+        logger.error(f"Error getting emergency statistics: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
+@router.get("/emergency/history")
+async def get_emergency_history(limit: int = Query(50, ge=1, le=500), offset: int = Query(0, ge=0)):
+    """Get resolved emergency calls, newest first"""
+    try:
+        emergencies = emergency_service.get_resolved_emergencies(limit, offset)
+        return {"success": True, "emergencies": emergencies, "count": len(emergencies)}
+    except Exception as e:
+        logger.error(f"Error getting emergency history: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
 @router.get("/emergency/{call_sid}")
 async def get_emergency_by_call_sid(call_sid: str):
     """Get emergency call by SID"""
@@ -147,17 +182,6 @@ async def resolve_emergency(call_sid: str, resolution_notes: Optional[str] = Non
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
-@router.get("/emergency/statistics")
-async def get_emergency_statistics():
-    """Get emergency statistics"""
-    try:
-        stats = emergency_service.get_emergency_statistics()
-        return {"success": True, "statistics": stats}
-    except Exception as e:
-        logger.error(f"Error getting emergency statistics: {e}")
-        raise HTTPException(status_code=500, detail="Internal server error")
-
-
 @router.post("/emergency/detect")
 async def detect_emergency_in_call(call_sid: str, user_input: str):
     """Detect emergency keywords in call input"""
@@ -8,6 +8,18 @@ logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
+@router.on_event("startup")
+async def start_notification_delivery():
+    """Resume sending notifications left in the outbox by a previous run"""
+    await notification_service.start()
+
+
+@router.on_event("shutdown")
+async def stop_notification_delivery():
+    """Finish in-flight deliveries and close connections"""
+    await notification_service.shutdown()
+
+
 @router.post("/notifications")
 async def create_notification(
     recipient_id: str,
@@ -40,16 +52,11 @@ async def create_notification(
 async def send_notification(notification_id: str):
     """Send a notification"""
     try:
-        notification = None
-        for n in notification_service.notification_manager.notifications:
-            if n.id == notification_id:
-                notification = n
-                break
-                
+        notification = notification_service.notification_manager.get_notification(notification_id)
         if not notification:
             raise HTTPException(status_code=404, detail="Notification not found")
             
-        success = notification_service.send_notification(notification)
+        success = await notification_service.deliver(notification)
         
         return {"success": success, "notification": notification.to_dict()}
     except HTTPException:
@@ -182,15 +189,15 @@ async def create_emergency_notification(
 ):
     """Create emergency notification"""
     try:
-        notification = notification_service.notification_manager.create_emergency_notification(
+        # Queued immediately (urgent ones jump the channel queues); a repeat for the same call within the digest window is dropped
+        notification = notification_service.notify_emergency(
             emergency_call_id=emergency_call_id,
             recipient_id=recipient_id,
             emergency_type=emergency_type,
             priority=priority
         )
-        
-        # Send the notification immediately
-        notification_service.send_notification(notification)
+        if notification is None:
+            return {"success": True, "deduplicated": True, "notification": None}
         
         return {"success": True, "notification": notification.to_dict()}
     except Exception as e:
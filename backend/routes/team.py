@@ -1,12 +1,29 @@
 from fastapi import APIRouter, HTTPException, Query
 from typing import List, Optional
+from pydantic import BaseModel
 import logging
-from backend.services import team_service, notification_service
+from backend.services import team_service, notification_service, emergency_service
 from backend.app.models.team import TeamRole, TeamStatus
+from backend.app.models.emergency import EmergencyPriority, EmergencyStatus
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+# Emergency priorities on the routing scale used by batch assignment (1 = critical .. 10)
+EMERGENCY_PRIORITY_LEVELS = {
+    EmergencyPriority.CRITICAL: 1,
+    EmergencyPriority.HIGH: 3,
+    EmergencyPriority.MEDIUM: 5,
+    EmergencyPriority.LOW: 8,
+}
+
+
+class BatchCall(BaseModel):
+    call_sid: str
+    emergency_type: Optional[str] = None
+    required_skills: List[str] = []
+    priority: int = 5
+
 
 @router.post("/team/members")
 async def create_team_member(
@@ -97,7 +114,7 @@ async def assign_call_to_member(
         if not member.is_available_for_call():
             raise HTTPException(status_code=400, detail="Team member is not available")
             
-        if member.start_call():
+        if team_service.start_call_for_team_member(member_id, call_sid):
             # Send notification
             notification_service.create_notification(
                 recipient_id=member_id,
@@ -279,3 +296,52 @@ async def assign_call_to_best_member(
     except Exception as e:
         logger.error(f"Error assigning call: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
+
+
+@router.post("/team/assign-batch")
+async def assign_calls_batch(calls: Optional[List[BatchCall]] = None):
+    """
+    Assign a queue of calls to available team members in one optimal matching
+    
+    Without a body, the queue is every pending emergency that has no team
+    member yet.
+    """
+    try:
+        if calls:
+            queue = [call.model_dump() for call in calls]
+        else:
+            queue = [
+                {
+                    "call_sid": emergency.call_sid,
+                    "emergency_type": emergency.emergency_type.value,
+                    "priority": EMERGENCY_PRIORITY_LEVELS.get(emergency.priority, 5),
+                }
+                for emergency in emergency_service.get_active_emergencies()
+                if emergency.status == EmergencyStatus.PENDING and not emergency.assigned_team_member
+            ]
+            
+        result = team_service.assign_calls_batch(queue)
+        
+        for call_sid, member in result["assignments"]:
+            if emergency_service.get_emergency_by_call_sid(call_sid):
+                emergency_service.acknowledge_emergency(call_sid, member.id)
+            notification_service.create_notification(
+                recipient_id=member.id,
+                title="New Call Assigned",
+                message=f"Call {call_sid} has been assigned to you",
+                notification_type="call_assigned"
+            )
+            
+        return {
+            "success": True,
+            "assignments": [
+                {"call_sid": call_sid, "assigned_member": member.to_dict()}
+                for call_sid, member in result["assignments"]
+            ],
+            "unassigned": result["unassigned"],
+            "total_weight": result["total_weight"],
+            "solver": result["solver"]
+        }
+    except Exception as e:
+        logger.error(f"Error batch assigning calls: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
@@ -1,8 +1,7 @@
 from fastapi import APIRouter, Request, Form, HTTPException
-from fastapi.responses import Response
+from fastapi.responses import Response, PlainTextResponse
 from typing import Optional
 import logging
-import asyncio
 import time
 from services import twilio_service
 from services.triage_engine import triage_engine
@@ -13,37 +12,16 @@ from services.database_service import database_service
 from services.websocket_service import websocket_service
 from config import settings
 from models.database import CallStatus
+from utils.tracing import tracer
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
 
-async def store_result_async(result: dict, call_data: dict):
-    """Store result asynchronously"""
-    try:
-        # Store in database using database_service
-        call_record_data = {
-            'call_sid': call_data.get('call_sid'),
-            'from_number': call_data.get('from_number'),
-            'to_number': call_data.get('to_number'),
-            'transcript': call_data.get('transcript'),
-            'emergency_type': result.get('category', 'OTHER'),
-            'severity_level': 'LEVEL_3',
-            'severity_score': 50.0,
-            'assigned_service': 'AMBULANCE',
-            'priority': result.get('priority', 3),
-            'summary': result.get('reasoning_byte', ''),
-            'confidence': result.get('confidence', 0.8),
-            'status': 'PENDING',
-            'processing_time_ms': result.get('processing_time_ms', 0.0)
-        }
-        
-        database_service.create_call_record(call_record_data)
-        logger.debug(f"🗄️ Result stored for {call_data.get('call_sid', 'unknown')}")
-        
-    except Exception as e:
-        logger.error(f"❌ Async storage error: {e}")
-
+@router.on_event("shutdown")
+async def flush_call_records():
+    """Finish call-record writes the hybrid triage service scheduled"""
+    await hybrid_triage_service.flush_storage()
 
 @router.post("/voice")
 async def handle_incoming_call(request: Request):
@@ -58,23 +36,25 @@ async def handle_incoming_call(request: Request):
         direction = form_data.get('Direction', '')
         
         # Debug logging for incoming call
-        logger.debug(f"📞 INCOMING CALL WEBHOOK")
-        logger.debug(f"   Call SID: {call_sid}")
-        logger.debug(f"   From: {from_number}")
-        logger.debug(f"   To: {to_number}")
-        logger.debug(f"   Status: {call_status}")
-        logger.debug(f"   Direction: {direction}")
-        logger.debug(f"   All Form Data: {dict(form_data)}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("📞 INCOMING CALL WEBHOOK")
+            logger.debug("   Call SID: %s", call_sid)
+            logger.debug("   From: %s", from_number)
+            logger.debug("   To: %s", to_number)
+            logger.debug("   Status: %s", call_status)
+            logger.debug("   Direction: %s", direction)
+            logger.debug("   All Form Data: %s", dict(form_data))
         
-        logger.info(f"Incoming emergency call from {from_number}, Call SID: {call_sid}")
+        logger.info("Incoming emergency call from %s, Call SID: %s", from_number, call_sid)
         
         # Generate emergency triage response using Twilio speech recognition
         twiml_response = twilio_service.generate_emergency_speech_response()
         
         # Debug response
-        logger.debug(f"📤 GENERATED TWIML RESPONSE:")
-        logger.debug(f"   Response Length: {len(twiml_response)} characters")
-        logger.debug(f"   Response Preview: {twiml_response[:200]}...")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("📤 GENERATED TWIML RESPONSE:")
+            logger.debug("   Response Length: %s characters", len(twiml_response))
+            logger.debug("   Response Preview: %.200s...", twiml_response)
         
         return Response(content=twiml_response, media_type="application/xml")
         
@@ -89,6 +69,7 @@ async def handle_incoming_call(request: Request):
 
 
 @router.post("/voice/ultra-fast")
+@tracer.traced("voice.ultra_fast")
 async def ultra_fast_triage(
     request: Request,
     text: Optional[str] = Form(None)
@@ -96,10 +77,10 @@ async def ultra_fast_triage(
     """Emergency triage with Ollama AI and safety responses"""
     try:
         # Get input text
+        form_data = await request.form()
         if text:
             transcript = text
         else:
-            form_data = await request.form()
             transcript = form_data.get('SpeechResult') or form_data.get('UnstableSpeechResult') or ""
         
         if not transcript or len(transcript.strip()) < 3:
@@ -115,20 +96,20 @@ async def ultra_fast_triage(
                 "response_type": "minimal"
             }
         
-        # Use hybrid triage service for conversation flow
+        # Use hybrid triage service for conversation flow (it stores the call record)
         call_sid = form_data.get('CallSid', f"hybrid_{time.time()}")
-        result = await hybrid_triage_service.process(transcript, call_sid, is_followup=False)
-        
-        # Store result in database
-        call_data = {
-            'call_sid': form_data.get('CallSid', f"ollama_{time.time()}"),
-            'from_number': form_data.get('From', ''),
-            'to_number': form_data.get('To', ''),
-            'transcript': transcript
-        }
-        
-        # Store asynchronously (non-blocking)
-        asyncio.create_task(store_result_async(result, call_data))
+        result = await hybrid_triage_service.process(
+            transcript,
+            call_sid,
+            is_followup=False,
+            from_number=form_data.get('From', ''),
+            to_number=form_data.get('To', '')
+        )
+        
+        # Initial turns come straight from the precomputed bundle
+        body = hybrid_triage_service.response_json(result)
+        if body is not None:
+            return Response(content=body, media_type="application/json")
         
         # Return hybrid response with complete data
         return {
@@ -250,11 +231,28 @@ async def get_recent_calls(limit: int = 50):
 
 
 @router.get("/voice/ultra-fast/stats")
-async def get_triage_stats():
-    """Get triage processing statistics"""
+async def get_triage_stats(format: str = "json", window: Optional[int] = None):
+    """
+    Get triage processing statistics
+    
+    format=prometheus returns the latency histograms in Prometheus text format;
+    window (seconds) limits the percentiles to the most recent calls.
+    """
     try:
+        latency_families = (
+            ollama_triage_service.latency,
+            hybrid_triage_service.latency,
+            triage_engine.latency
+        )
+        
+        if format == "prometheus":
+            return PlainTextResponse(
+                "".join(family.render_prometheus() for family in latency_families),
+                media_type="text/plain; version=0.0.4"
+            )
+        
         # Get stats from Ollama service
-        stats = ollama_triage_service.get_stats()
+        stats = ollama_triage_service.get_stats(window)
         
         return {
             "success": True,
@@ -263,6 +261,8 @@ async def get_triage_stats():
                 'avg_processing_time_ms': stats['avg_ms'],
                 'min_ms': stats['min_ms'],
                 'max_ms': stats['max_ms'],
+                'percentiles': stats['percentiles'],
+                'latency': {family.name: family.snapshot(window) for family in latency_families},
                 'service_type': 'ollama_ai'
             }
         }
@@ -276,6 +276,7 @@ async def get_triage_stats():
 
 
 @router.post("/voice/ultra-fast/followup")
+@tracer.traced("voice.ultra_fast.followup")
 async def ultra_fast_followup(
     request: Request,
     SpeechResult: Optional[str] = Form(None),
@@ -285,9 +286,11 @@ async def ultra_fast_followup(
     """Handle follow-up responses in emergency conversation"""
     try:
         # Get transcript and call session
-        form_data = await request.form()
+        with tracer.span("webhook.parse"):
+            form_data = await request.form()
         transcript = SpeechResult or UnstableSpeechResult or ""
         call_sid = CallSid
+        tracer.current_span().set_attribute("call_sid", call_sid or '')
         
         if not transcript or len(transcript.strip()) < 2:
             return {
@@ -322,6 +325,7 @@ async def ultra_fast_followup(
 
 
 @router.post("/voice/ultra-fast/voice")
+@tracer.traced("voice.ultra_fast.voice")
 async def ultra_fast_voice_response(
     request: Request,
     SpeechResult: Optional[str] = Form(None),
@@ -331,51 +335,42 @@ async def ultra_fast_voice_response(
     """Generate voice response for emergency triage with conversation flow"""
     try:
         # Get transcript and call session
-        form_data = await request.form()
+        with tracer.span("webhook.parse"):
+            form_data = await request.form()
         transcript = SpeechResult or UnstableSpeechResult or ""
         call_sid = CallSid
+        tracer.current_span().set_attribute("call_sid", call_sid or '')
         
         if not transcript or len(transcript.strip()) < 2:
             # Default response for unclear input
-            voice_response = "I didn't catch that. Please describe your emergency clearly."
+            with tracer.span("twiml.render"):
+                twiml_response = twilio_service.generate_ultra_fast_voice_response(
+                    "I didn't catch that. Please describe your emergency clearly.", awaiting_followup=False
+                )
         else:
             # Process as initial call or follow-up
-            result = await hybrid_triage_service.process(transcript, call_sid, is_followup=False)
-            voice_response = result["what_to_say"]
-        
-        # Generate TwiML response with conversation flow
-        if result.get('status') == 'AWAITING_FOLLOWUP':
-            # Ask danger question
-            twiml_response = f"""<?xml version="1.0" encoding="UTF-8"?>
-<Response>
-    <Say voice="alice">{voice_response}</Say>
-    <Pause length="1"/>
-    <Gather input="speech" timeout="5" action="/voice/ultra-fast/followup" method="POST">
-        <Say voice="alice">Is the situation more dangerous? Please say yes or no.</Say>
-    </Gather>
-</Response>"""
-        else:
-            # End call or provide final instructions
-            twiml_response = f"""<?xml version="1.0" encoding="UTF-8"?>
-<Response>
-    <Say voice="alice">{voice_response}</Say>
-    <Pause length="2"/>
-    <Say voice="alice">Help is on the way. Stay safe and we will end the call when help arrives.</Say>
-</Response>"""
+            result = await hybrid_triage_service.process(
+                transcript,
+                call_sid,
+                is_followup=False,
+                from_number=form_data.get('From', ''),
+                to_number=form_data.get('To', '')
+            )
+            
+            # Generate TwiML response with conversation flow (pre-rendered for the danger question)
+            with tracer.span("twiml.render"):
+                twiml_response = hybrid_triage_service.voice_twiml(result)
         
         return Response(content=twiml_response, media_type="application/xml")
         
     except Exception as e:
         logger.error(f"❌ Voice response error: {e}")
         # Fallback response
-        twiml_response = """<?xml version="1.0" encoding="UTF-8"?>
-<Response>
-    <Say voice="alice">I'm having trouble understanding. Please stay on the line for assistance.</Say>
-</Response>"""
-        return Response(content=twiml_response, media_type="application/xml")
+        return Response(content=twilio_service.generate_ultra_fast_error_response(), media_type="application/xml")
 
 
 @router.post("/voice/process")
+@tracer.traced("voice.process")
 async def process_emergency_input(
     request: Request,
     SpeechResult: Optional[str] = Form(None),
@@ -385,20 +380,21 @@ async def process_emergency_input(
     """Process emergency input using Twilio's free speech recognition and run triage pipeline"""
     try:
         # Get all form data for debugging
-        form_data = await request.form()
+        with tracer.span("webhook.parse"):
+            form_data = await request.form()
         
         # Get call SID
         call_sid = CallSid or ''
+        tracer.current_span().set_attribute("call_sid", call_sid)
         
         # Use stable speech result if available, otherwise use unstable
         transcript = SpeechResult or UnstableSpeechResult or ""
         
         if not transcript or len(transcript.strip()) < 5:
-            logger.warning(f"⚠️ INSUFFICIENT INPUT - Attempting to keep caller engaged")
-            logger.debug(f"   Transcript Length: {len(transcript)}")
-            logger.debug(f"   Transcript Stripped: '{transcript.strip()}'")
+            logger.warning("⚠️ INSUFFICIENT INPUT - Attempting to keep caller engaged")
+            logger.debug("   Transcript: '%s' (%s characters)", transcript, len(transcript))
             twiml_response = twilio_service.generate_emergency_retry_response()
-            logger.debug(f"📤 GENERATED RETRY RESPONSE: {twiml_response[:200]}...")
+            logger.debug("📤 GENERATED RETRY RESPONSE: %.200s...", twiml_response)
             return Response(content=twiml_response, media_type="application/xml")
         
         # Run triage pipeline
@@ -430,7 +426,7 @@ async def process_emergency_input(
             }
             
             call_record = database_service.create_call_record(call_data)
-            logger.info(f"📞 Stored call record: {call_record.id}")
+            logger.info("📞 Stored call record: %s", call_record.id)
             
             # Broadcast new call to WebSocket clients
             if websocket_service.sio:
@@ -441,9 +437,9 @@ async def process_emergency_input(
             # Continue processing even if database storage fails
         
         # Simplified logging - only key information
-        logger.info(f"🎤 Voice Input: '{transcript}'")
-        logger.info(f"🏥 Classification: {triage_result.emergency_type.value}")
-        logger.info(f"🚨 Severity Level: {triage_result.severity_level.value}")
+        logger.info("🎤 Voice Input: '%s'", transcript)
+        logger.info("🏥 Classification: %s", triage_result.emergency_type.value)
+        logger.info("🚨 Severity Level: %s", triage_result.severity_level.value)
         
         # Generate response
         twiml_response = twilio_service.generate_emergency_safety_response(triage_result)
@@ -461,7 +457,7 @@ async def process_emergency_input(
         import traceback
         logger.error(f"   Traceback: {traceback.format_exc()}")
         error_response = twilio_service.generate_error_response()
-        logger.debug(f"📤 ERROR RESPONSE: {error_response}")
+        logger.debug("📤 ERROR RESPONSE: %s", error_response)
         return Response(content=error_response, media_type="application/xml")
 
 
@@ -474,11 +470,11 @@ async def handle_call_status(request: Request):
         call_status = form_data.get('CallStatus', '')
         call_duration = form_data.get('CallDuration', '0')
         
-        logger.info(f"Emergency call {call_sid} status: {call_status}")
+        logger.info("Emergency call %s status: %s", call_sid, call_status)
         
         # Log call completion for audit
         if call_status in ['completed', 'failed', 'busy', 'no-answer']:
-            logger.info(f"Emergency call {call_sid} ended with status: {call_status}")
+            logger.info("Emergency call %s ended with status: %s", call_sid, call_status)
         
         return Response(status_code=200)
         
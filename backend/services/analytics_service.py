@@ -1,16 +1,84 @@
 from typing import Dict, List, Any, Optional
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+import atexit
 import logging
+import math
+import threading
+import time
 from app.models.analytics import CallAnalytics
 from config import settings
+from utils.columnar_store import CallDetailStore
+from utils.event_log import CorruptRecordError, EventLog
+from utils.time_buckets import CallBucket, CallTimeBuckets
 
 logger = logging.getLogger(__name__)
 
 
+def _to_epoch(value: datetime) -> float:
+    """Epoch seconds for a naive-UTC (datetime.utcnow) or aware datetime"""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+_INT64_MAX = 2 ** 63 - 1  # CallDetailStore keeps durations in an int64 column
+
+
+def check_call_event(event: Dict[str, Any]):
+    """
+    Reject a call event apply_event could not fold in whole
+    
+    Run before the event is logged, so a bad call is refused instead of being
+    persisted and failing again on every replay.
+    
+    Raises:
+        ValueError: A field is missing, of the wrong type or out of range
+    """
+    try:
+        call_sid = event["call_sid"]
+        duration = event["duration"]
+        response_time = event["response_time"]
+        quality_score = event["quality_score"]
+        timestamp = event["timestamp"]
+        strings = (event["call_type"], event["outcome"])
+        optional_strings = (event["team_member_id"], event["caller_location"])
+        is_emergency = event["is_emergency"]
+    except KeyError as e:
+        raise ValueError(f"Call event is missing {e}") from None
+    if not isinstance(call_sid, str) or not all(isinstance(value, str) for value in strings):
+        raise ValueError("call_sid, call_type and outcome must be strings")
+    if not all(value is None or isinstance(value, str) for value in optional_strings):
+        raise ValueError("team_member_id and caller_location must be strings")
+    if not isinstance(is_emergency, bool):
+        raise ValueError("is_emergency must be a boolean")
+    if isinstance(duration, bool) or not isinstance(duration, int) or not 0 <= duration <= _INT64_MAX:
+        raise ValueError(f"duration must be a non-negative integer below 2**63, got {duration!r}")
+    for name, value in (("response_time", response_time), ("quality_score", quality_score)):
+        if value is not None and (isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value) or value < 0):
+            raise ValueError(f"{name} must be a finite non-negative number, got {value!r}")
+    if isinstance(timestamp, bool) or not isinstance(timestamp, (int, float)) or not math.isfinite(timestamp):
+        raise ValueError(f"timestamp must be finite epoch seconds, got {timestamp!r}")
+
+
 class AnalyticsService:
-    def __init__(self):
+    # Bump when the in-memory layout changes; older snapshots are then ignored
+    # and the state is rebuilt from the event log
+    STATE_VERSION = 1
+    
+    def __init__(self, event_log: Optional[EventLog] = None, snapshot_every: int = 10000):
+        self._reset_state()
+        self.event_log = event_log  # Persists every recorded call, None keeps analytics in memory only
+        self.snapshot_every = snapshot_every
+        self._events_since_snapshot = 0
+        self._snapshot_thread: Optional[threading.Thread] = None
+        
+    def _reset_state(self):
         self.analytics = CallAnalytics()
-        self.call_details = []  # Store detailed call information
+        self.call_details = CallDetailStore()  # Store detailed call information (columnar)
+        self.time_buckets = CallTimeBuckets()  # Per-minute / per-hour aggregates for trends
+        self.quality_distribution = {"excellent": 0, "good": 0, "average": 0, "poor": 0}
+        self.quality_total = 0.0
+        self.team_totals: Dict[str, CallBucket] = {}  # Running per-member aggregates
         
     def record_call(
         self,
@@ -24,20 +92,14 @@ class AnalyticsService:
         caller_location: Optional[str] = None,
         quality_score: Optional[float] = None
     ):
-        """Record a call with detailed analytics"""
-        # Record in main analytics
-        self.analytics.record_call(
-            call_sid=call_sid,
-            duration=duration,
-            is_emergency=is_emergency,
-            call_type=call_type,
-            outcome=outcome,
-            response_time=response_time,
-            team_member_id=team_member_id
-        )
-        
-        # Store detailed call information
-        call_detail = {
+        """
+        Record a call with detailed analytics
+        
+        Raises:
+            ValueError: The call has a field apply_event cannot store (nothing is logged)
+        """
+        event = {
+            "type": "call",
             "call_sid": call_sid,
             "duration": duration,
             "is_emergency": is_emergency,
@@ -47,11 +109,192 @@ class AnalyticsService:
             "team_member_id": team_member_id,
             "caller_location": caller_location,
             "quality_score": quality_score,
-            "timestamp": datetime.utcnow().isoformat()
+            "timestamp": _to_epoch(datetime.utcnow())
+        }
+        
+        check_call_event(event)
+        
+        # Write ahead, so a crash after this point is recovered by replay
+        if self.event_log is not None:
+            self.event_log.append(event)
+        self._fold_call(event)
+        logger.debug("Recorded call analytics: %s", call_sid)
+        
+        if self.event_log is not None:
+            self._events_since_snapshot += 1
+            if self._events_since_snapshot >= self.snapshot_every:
+                self.snapshot(background=True)
+        
+    def apply_event(self, event: Dict[str, Any]):
+        """
+        Fold one logged event into the in-memory aggregates (used on replay)
+        
+        Raises:
+            ValueError: The event fails check_call_event; nothing was applied
+        """
+        if event.get("type") != "call":
+            logger.warning("Ignoring unknown analytics event type: %s", event.get("type"))
+            return
+        check_call_event(event)
+        self._fold_call(event)
+        
+    def _fold_call(self, event: Dict[str, Any]):
+        """apply_event for a call event that already passed check_call_event"""
+        epoch = event["timestamp"]
+        duration = event["duration"]
+        is_emergency = event["is_emergency"]
+        outcome = event["outcome"]
+        response_time = event["response_time"]
+        team_member_id = event["team_member_id"]
+        quality_score = event["quality_score"]
+        
+        # Record in main analytics
+        self.analytics.record_call(
+            call_sid=event["call_sid"],
+            duration=duration,
+            is_emergency=is_emergency,
+            call_type=event["call_type"],
+            outcome=outcome,
+            response_time=response_time,
+            team_member_id=team_member_id,
+            timestamp=datetime.fromtimestamp(epoch, timezone.utc).replace(tzinfo=None)
+        )
+        
+        self.time_buckets.record(
+            epoch,
+            duration=duration,
+            is_emergency=is_emergency,
+            outcome=outcome,
+            response_time=response_time,
+            quality_score=quality_score
+        )
+        if quality_score is not None:
+            self.quality_total += quality_score
+            self.quality_distribution[self._quality_range(quality_score)] += 1
+        if team_member_id:
+            member_totals = self.team_totals.get(team_member_id)
+            if member_totals is None:
+                member_totals = self.team_totals[team_member_id] = CallBucket()
+            member_totals.add_call(duration, is_emergency, outcome, response_time, quality_score)
+
+        # Store detailed call information
+        self.call_details.append(
+            call_sid=event["call_sid"],
+            timestamp=epoch,
+            duration=duration,
+            is_emergency=is_emergency,
+            call_type=event["call_type"],
+            outcome=outcome,
+            response_time=response_time,
+            team_member_id=team_member_id,
+            caller_location=event["caller_location"],
+            quality_score=quality_score
+        )
+        
+    def to_state(self) -> Dict[str, Any]:
+        """Picklable copy of all aggregate state"""
+        return {
+            "version": self.STATE_VERSION,
+            "analytics": self.analytics.to_state(),
+            "call_details": self.call_details.to_state(),
+            "time_buckets": self.time_buckets.to_state(),
+            "quality_distribution": dict(self.quality_distribution),
+            "quality_total": self.quality_total,
+            "team_totals": {member: totals.to_state() for member, totals in self.team_totals.items()}
         }
         
-        self.call_details.append(call_detail)
-        logger.info(f"Recorded call analytics: {call_sid}")
+    def load_state(self, state: Dict[str, Any]):
+        """Replace all aggregate state with a to_state() copy"""
+        self._reset_state()
+        self.analytics = CallAnalytics.from_state(state["analytics"])
+        self.call_details = CallDetailStore.from_state(state["call_details"])
+        self.time_buckets.load_state(state["time_buckets"])
+        self.quality_distribution.update(state["quality_distribution"])
+        self.quality_total = state["quality_total"]
+        self.team_totals = {member: CallBucket.from_state(totals) for member, totals in state["team_totals"].items()}
+        
+    def restore(self) -> int:
+        """
+        Load the newest snapshot and replay the log tail after it
+        
+        Returns:
+            Number of events replayed from the log
+        """
+        if self.event_log is None:
+            return 0
+        started = time.perf_counter()
+        
+        seq, state = self.event_log.load_snapshot()
+        if state is not None and state.get("version") != self.STATE_VERSION:
+            logger.warning("⚠️ Analytics snapshot has state version %s (expected %s), replaying the full log",
+                           state.get("version"), self.STATE_VERSION)
+            seq, state = 0, None
+        if state is not None:
+            self.load_state(state)
+        else:
+            self._reset_state()
+            
+        replayed = 0
+        skipped = 0
+        try:
+            for event_seq, event in self.event_log.read(after_seq=seq):
+                try:
+                    self.apply_event(event)
+                except Exception as e:
+                    # Logged before events were checked up front; one bad call must not stop startup
+                    skipped += 1
+                    logger.error(f"❌ Skipping analytics event {event_seq} that cannot be applied: {e}")
+                    continue
+                replayed += 1
+        except CorruptRecordError as e:
+            logger.error(f"❌ Analytics event log damaged, later events were not replayed: {e}")
+        self._events_since_snapshot = replayed + skipped
+        
+        logger.info("♻️ Analytics restored: %d calls (snapshot @%d + %d replayed events) in %.2fs",
+                    len(self.call_details), seq, replayed, time.perf_counter() - started)
+        return replayed
+        
+    def snapshot(self, background: bool = False) -> Optional[str]:
+        """
+        Persist the current state so restarts only replay newer events
+        
+        Args:
+            background: Pickle and write in a thread; the state is still copied
+                        synchronously, so it matches the current log position
+        """
+        if self.event_log is None:
+            return None
+        if background and self._snapshot_thread is not None and self._snapshot_thread.is_alive():
+            return None  # Previous snapshot still being written, try again later
+            
+        seq = self.event_log.last_seq
+        state = self.to_state()
+        self._events_since_snapshot = 0
+        
+        def write():
+            try:
+                path = self.event_log.write_snapshot(seq, state)
+                logger.info("📸 Analytics snapshot written at event %d: %s", seq, path)
+                return path
+            except Exception as e:
+                logger.error(f"❌ Failed to write analytics snapshot: {e}")
+                return None
+                
+        if background:
+            self._snapshot_thread = threading.Thread(target=write, name="AnalyticsSnapshot", daemon=True)
+            self._snapshot_thread.start()
+            return None
+        return write()
+        
+    def close(self):
+        """Write a final snapshot and close the event log"""
+        if self.event_log is None:
+            return
+        if self._snapshot_thread is not None:
+            self._snapshot_thread.join()
+        if self._events_since_snapshot:
+            self.snapshot()
+        self.event_log.close()
         
     def get_dashboard_data(self) -> Dict[str, Any]:
         """Get comprehensive dashboard data"""
@@ -85,45 +328,45 @@ class AnalyticsService:
         
     def _calculate_call_volume_trend(self) -> Dict[str, Any]:
         """Calculate call volume trends"""
-        now = datetime.utcnow()
+        now = _to_epoch(datetime.utcnow())
         periods = {
-            "last_hour": now - timedelta(hours=1),
-            "last_24h": now - timedelta(hours=24),
-            "last_7d": now - timedelta(days=7),
-            "last_30d": now - timedelta(days=30)
+            "last_hour": timedelta(hours=1),
+            "last_24h": timedelta(hours=24),
+            "last_7d": timedelta(days=7),
+            "last_30d": timedelta(days=30)
         }
         
-        trends = {}
-        for period_name, start_time in periods.items():
-            calls_in_period = [
-                call for call in self.call_details
-                if datetime.fromisoformat(call["timestamp"]) >= start_time
-            ]
-            trends[period_name] = len(calls_in_period)
-            
-        return trends
+        return {
+            period_name: self.time_buckets.aggregate(now - length.total_seconds(), now, now=now).calls
+            for period_name, length in periods.items()
+        }
         
     def _calculate_response_time_trend(self) -> Dict[str, Any]:
-        """Calculate response time trends"""
-        recent_calls = [
-            call for call in self.call_details
-            if call["response_time"] is not None and
-            datetime.fromisoformat(call["timestamp"]) >= datetime.utcnow() - timedelta(days=7)
-        ]
-        
-        if not recent_calls:
+        """
+        Calculate response time trends
+
+        The trend compares the first and second 3.5 days of the last week,
+        read from the time buckets. It used to split the week's calls into
+        two halves by count, so with uneven traffic (e.g. a busy last day)
+        the result can differ from before.
+        """
+        now = _to_epoch(datetime.utcnow())
+        start = now - timedelta(days=7).total_seconds()
+        mid_point = (start + now) / 2
+        
+        # Compare the older and newer half of the week
+        first_half = self.time_buckets.aggregate(start, mid_point, now=now)
+        second_half = self.time_buckets.aggregate(mid_point, now, now=now)
+        sample_size = first_half.response_count + second_half.response_count
+        
+        if not sample_size:
             return {"average": 0, "trend": "stable"}
             
-        avg_response_time = sum(call["response_time"] for call in recent_calls) / len(recent_calls)
+        avg_response_time = (first_half.response_total + second_half.response_total) / sample_size
         
-        # Calculate trend (simple comparison with previous period)
-        mid_point = len(recent_calls) // 2
-        first_half = recent_calls[:mid_point]
-        second_half = recent_calls[mid_point:]
-        
-        if first_half and second_half:
-            first_avg = sum(call["response_time"] for call in first_half) / len(first_half)
-            second_avg = sum(call["response_time"] for call in second_half) / len(second_half)
+        if first_half.response_count and second_half.response_count:
+            first_avg = first_half.avg_response_time
+            second_avg = second_half.avg_response_time
             
             if second_avg > first_avg * 1.1:
                 trend = "increasing"
@@ -137,7 +380,7 @@ class AnalyticsService:
         return {
             "average": avg_response_time,
             "trend": trend,
-            "sample_size": len(recent_calls)
+            "sample_size": sample_size
         }
         
     def _get_team_performance_metrics(self) -> Dict[str, Any]:
@@ -146,74 +389,51 @@ class AnalyticsService:
         
         # Calculate additional metrics
         for member_id, stats in team_stats.items():
-            # Get calls for this team member
-            member_calls = [
-                call for call in self.call_details
-                if call["team_member_id"] == member_id
-            ]
+            totals = self.team_totals.get(member_id) or CallBucket()
             
             # Calculate success rate
-            completed_calls = len([c for c in member_calls if c["outcome"] == "completed"])
-            stats["success_rate"] = (completed_calls / len(member_calls) * 100) if member_calls else 0
+            completed_calls = totals.outcomes.get("completed", 0)
+            stats["success_rate"] = (completed_calls / totals.calls * 100) if totals.calls else 0
             
             # Calculate average call duration
-            total_duration = sum(c["duration"] for c in member_calls)
-            stats["avg_call_duration"] = total_duration / len(member_calls) if member_calls else 0
+            stats["avg_call_duration"] = totals.avg_duration
+            
+            # Average over the calls that reported a response time
+            stats["avg_response_time"] = totals.avg_response_time
             
         return team_stats
         
+    @staticmethod
+    def _quality_range(score: float) -> str:
+        if score >= 4.5:
+            return "excellent"  # 4.5-5.0
+        if score >= 3.5:
+            return "good"       # 3.5-4.5
+        if score >= 2.5:
+            return "average"    # 2.5-3.5
+        return "poor"           # <2.5
+        
     def _calculate_quality_metrics(self) -> Dict[str, Any]:
         """Calculate quality metrics"""
-        calls_with_quality = [
-            call for call in self.call_details
-            if call["quality_score"] is not None
-        ]
+        total_rated_calls = sum(self.quality_distribution.values())
         
-        if not calls_with_quality:
+        if not total_rated_calls:
             return {"average_quality": 0, "total_rated_calls": 0}
             
-        avg_quality = sum(call["quality_score"] for call in calls_with_quality) / len(calls_with_quality)
-        
-        # Quality distribution
-        quality_ranges = {
-            "excellent": 0,  # 4.5-5.0
-            "good": 0,        # 3.5-4.5
-            "average": 0,     # 2.5-3.5
-            "poor": 0         # <2.5
-        }
-        
-        for call in calls_with_quality:
-            score = call["quality_score"]
-            if score >= 4.5:
-                quality_ranges["excellent"] += 1
-            elif score >= 3.5:
-                quality_ranges["good"] += 1
-            elif score >= 2.5:
-                quality_ranges["average"] += 1
-            else:
-                quality_ranges["poor"] += 1
-                
         return {
-            "average_quality": avg_quality,
-            "total_rated_calls": len(calls_with_quality),
-            "quality_distribution": quality_ranges
+            "average_quality": self.quality_total / total_rated_calls,
+            "total_rated_calls": total_rated_calls,
+            "quality_distribution": dict(self.quality_distribution)
         }
         
     def get_recent_calls(self, limit: int = 50) -> List[Dict[str, Any]]:
         """Get recent calls"""
-        recent_calls = sorted(
-            self.call_details,
-            key=lambda x: datetime.fromisoformat(x["timestamp"]),
-            reverse=True
-        )
-        return recent_calls[:limit]
+        return self.call_details.rows(self.call_details.recent(limit))
         
     def get_call_analytics(self, call_sid: str) -> Optional[Dict[str, Any]]:
         """Get detailed analytics for a specific call"""
-        for call in self.call_details:
-            if call["call_sid"] == call_sid:
-                return call
-        return None
+        row = self.call_details.find(call_sid)
+        return self.call_details.row(row) if row is not None else None
         
     def get_performance_report(
         self,
@@ -226,27 +446,28 @@ class AnalyticsService:
         if not end_date:
             end_date = datetime.utcnow()
             
-        # Filter calls by date range
-        filtered_calls = [
-            call for call in self.call_details
-            if start_date <= datetime.fromisoformat(call["timestamp"]) <= end_date
-        ]
-        
-        # Calculate metrics
-        total_calls = len(filtered_calls)
-        emergency_calls = len([c for c in filtered_calls if c["is_emergency"]])
-        total_duration = sum(c["duration"] for c in filtered_calls)
-        avg_duration = total_duration / total_calls if total_calls > 0 else 0
-        
-        # Response times
-        response_times = [c["response_time"] for c in filtered_calls if c["response_time"] is not None]
-        avg_response_time = sum(response_times) / len(response_times) if response_times else 0
-        
-        # Outcomes
-        outcomes = {}
-        for call in filtered_calls:
-            outcome = call["outcome"]
-            outcomes[outcome] = outcomes.get(outcome, 0) + 1
+        start, end = _to_epoch(start_date), _to_epoch(end_date)
+        
+        # Filter calls by date range (rows are stored in arrival order)
+        lo, hi = self.call_details.time_range(start, end)
+        
+        # Calculate metrics from the time buckets while the range is retained
+        if self.time_buckets.covers(start):
+            totals = self.time_buckets.aggregate(start, end)
+            total_calls = totals.calls
+            emergency_calls = totals.emergencies
+            avg_duration = totals.avg_duration
+            avg_response_time = totals.avg_response_time
+            outcomes = dict(totals.outcomes)
+        else:
+            totals = self.call_details.aggregate(lo, hi)
+            total_calls = totals["calls"]
+            emergency_calls = totals["emergencies"]
+            avg_duration = totals["duration_total"] / total_calls if total_calls > 0 else 0
+            avg_response_time = (
+                totals["response_total"] / totals["response_count"] if totals["response_count"] else 0
+            )
+            outcomes = totals["outcomes"]
             
         return {
             "period": {
@@ -261,29 +482,36 @@ class AnalyticsService:
                 "avg_response_time_seconds": avg_response_time
             },
             "outcomes": outcomes,
-            "detailed_calls": filtered_calls
+            "detailed_calls": self.call_details.rows(range(lo, hi))
         }
         
-    def export_analytics(self, format: str = "json") -> Dict[str, Any]:
-        """Export analytics data"""
-        data = {
+    def export_analytics(self) -> Dict[str, Any]:
+        """Export dashboard and performance report as one JSON document
+        
+        Row-level CSV / NDJSON / Parquet exports are streamed by export_service.
+        """
+        return {
             "dashboard_data": self.get_dashboard_data(),
             "performance_report": self.get_performance_report(),
             "export_timestamp": datetime.utcnow().isoformat()
         }
-        
-        if format.lower() == "csv":
-            # Convert to CSV-friendly format
-            return self._convert_to_csv(data)
-        
-        return data
-        
-    def _convert_to_csv(self, data: Dict[str, Any]) -> Dict[str, Any]:
-        """Convert analytics data to CSV format"""
-        # This would implement CSV conversion logic
-        # For now, return the data as-is
-        return data
+
+
+def create_analytics_service() -> AnalyticsService:
+    """Build the service, persisted to ANALYTICS_LOG_DIR unless it is empty"""
+    if not settings.ANALYTICS_LOG_DIR:
+        return AnalyticsService()
+    try:
+        event_log = EventLog(settings.ANALYTICS_LOG_DIR, fsync=settings.ANALYTICS_LOG_FSYNC)
+    except OSError as e:
+        logger.error(f"❌ Cannot open analytics event log in {settings.ANALYTICS_LOG_DIR}, keeping analytics in memory: {e}")
+        return AnalyticsService()
+        
+    service = AnalyticsService(event_log, snapshot_every=settings.ANALYTICS_SNAPSHOT_EVERY)
+    service.restore()
+    atexit.register(service.close)
+    return service
 
 
 # Global instance
-analytics_service = AnalyticsService()
+analytics_service = create_analytics_service()
@@ -0,0 +1,131 @@
+"""
+Team Assignment Index
+Priority heaps of available team members per (team specialization, skill),
+keyed by (current_calls, avg_response_time), so picking the best responder
+for a call costs O(log n) instead of a scan over every member. Entries are
+invalidated lazily: each member carries a version, and heap entries with an
+old version are discarded when they surface.
+"""
+
+import heapq
+import itertools
+from typing import Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+ANY_SKILL = "__any__"  # Heap holding every available member of a pool
+UNTEAMED = "__unteamed__"  # Pool of members without a team (eligible for every emergency type)
+
+
+class AssignmentIndex:
+    """
+    Available-member heaps for TeamService
+
+    Pools are team specializations (members without a team share the
+    UNTEAMED pool). Each member sits in its pool's ANY_SKILL heap and in one
+    heap per skill while available; the service calls update() whenever a
+    member's availability, load, response time, skills or team change.
+    """
+
+    def __init__(self):
+        self._heaps: Dict[Tuple[Hashable, str], List[tuple]] = {}
+        self._pools: Set[Hashable] = set()
+        self._versions: Dict[str, int] = {}
+        self._order: Dict[str, int] = {}  # Insertion order, the tie-breaker of the old linear scan
+        self._members: Dict[str, object] = {}
+        self._available_by_skill: Dict[str, Set[str]] = {ANY_SKILL: set()}
+        self._indexed_skills: Dict[str, Tuple[Hashable, Tuple[str, ...]]] = {}
+        self._counter = itertools.count()
+        self._live_entries = 0
+        self._stale_entries = 0
+
+    def add(self, member, pool: Hashable):
+        """Register a new member (call once, before any update)"""
+        self._order[member.id] = next(self._counter)
+        self._members[member.id] = member
+        self._versions[member.id] = 0
+        self.update(member, pool)
+
+    def remove(self, member_id: str):
+        self._invalidate(member_id)
+        self._versions.pop(member_id, None)
+        self._order.pop(member_id, None)
+        self._members.pop(member_id, None)
+
+    def update(self, member, pool: Hashable):
+        """Re-index a member after any change that affects assignment"""
+        self._invalidate(member.id)
+        if not member.is_available_for_call():
+            return
+
+        version = self._versions[member.id]
+        entry = (member.current_calls, member.avg_response_time, self._order[member.id], version, member.id)
+        skills = tuple(member.skills)
+        for skill in (ANY_SKILL,) + skills:
+            heapq.heappush(self._heaps.setdefault((pool, skill), []), entry)
+            self._available_by_skill.setdefault(skill, set()).add(member.id)
+        self._pools.add(pool)
+        self._indexed_skills[member.id] = (pool, skills)
+        self._live_entries += 1 + len(skills)
+
+    def _invalidate(self, member_id: str):
+        if member_id not in self._versions:
+            return
+        self._versions[member_id] += 1
+        indexed = self._indexed_skills.pop(member_id, None)
+        if indexed is None:
+            return
+        _, skills = indexed
+        for skill in (ANY_SKILL,) + skills:
+            self._available_by_skill[skill].discard(member_id)
+        self._live_entries -= 1 + len(skills)
+        self._stale_entries += 1 + len(skills)
+        if self._stale_entries > 2 * self._live_entries + 64:
+            self._compact()
+
+    def _is_live(self, entry: tuple) -> bool:
+        return self._versions.get(entry[4]) == entry[3]
+
+    def _compact(self):
+        # Drop every stale entry at once; amortized O(1) per invalidation
+        for key, heap in list(self._heaps.items()):
+            live = [entry for entry in heap if self._is_live(entry)]
+            if live:
+                heapq.heapify(live)
+                self._heaps[key] = live
+            else:
+                del self._heaps[key]
+        self._stale_entries = 0
+
+    def _peek(self, key: Tuple[Hashable, str]) -> Optional[tuple]:
+        heap = self._heaps.get(key)
+        while heap and not self._is_live(heap[0]):
+            heapq.heappop(heap)
+            self._stale_entries -= 1
+        return heap[0] if heap else None
+
+    def best(self, pools: Optional[Iterable[Hashable]] = None, skills: Optional[List[str]] = None):
+        """
+        Least-loaded available member (then fastest responder, then oldest)
+
+        Args:
+            pools: Candidate pools, None for all
+            skills: Member needs at least one of these skills, None/empty for any
+
+        Returns:
+            The TeamMember, or None if nobody qualifies
+        """
+        pools = self._pools if pools is None else pools
+        best_entry = None
+        for pool in pools:
+            for skill in skills or (ANY_SKILL,):
+                entry = self._peek((pool, skill))
+                if entry is not None and (best_entry is None or entry < best_entry):
+                    best_entry = entry
+        return self._members[best_entry[4]] if best_entry else None
+
+    def available(self, skills: Optional[List[str]] = None) -> List:
+        """Available members having any of `skills` (all if None), in creation order"""
+        if skills:
+            member_ids = set().union(*(self._available_by_skill.get(skill, ()) for skill in skills))
+        else:
+            member_ids = self._available_by_skill[ANY_SKILL]
+        return [self._members[member_id] for member_id in sorted(member_ids, key=self._order.__getitem__)]
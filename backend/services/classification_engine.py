@@ -53,13 +53,10 @@ class ClassificationEngine:
         Returns:
             ClassificationResult with emergency type and confidence
         """
-        logger.debug(f"🔍 CLASSIFICATION ENGINE STARTING")
-        logger.debug(f"   Input Transcript: '{transcript}'")
-        logger.debug(f"   Transcript Length: {len(transcript)} characters")
-        logger.debug(f"   Transcript Lower: '{transcript.lower()}'")
-        
-        # DEBUG: Print to console for immediate visibility
-        print(f"🔍 CLASSIFICATION DEBUG: '{transcript.lower()}'")
+        debug = logger.isEnabledFor(logging.DEBUG)
+        if debug:
+            logger.debug("🔍 CLASSIFICATION ENGINE STARTING")
+            logger.debug("   Input Transcript: '%s' (%d characters)", transcript, len(transcript))
         
         transcript_lower = transcript.lower()
         scores = {}
@@ -69,8 +66,6 @@ class ClassificationEngine:
             score = 0
             matched_keywords = []
             
-            logger.debug(f"   🏷️  Checking {emergency_type.upper()}:")
-            
             for keyword in keywords:
                 if keyword in transcript_lower:
                     # Count occurrences for weighted scoring
@@ -78,15 +73,13 @@ class ClassificationEngine:
                     keyword_score = len(keyword) * occurrences  # Weight by keyword length
                     score += keyword_score
                     matched_keywords.append(keyword)
-                    logger.debug(f"      ✅ Found '{keyword}' (x{occurrences}) - Score: {keyword_score}")
-                    print(f"✅ FOUND KEYWORD: '{keyword}' in '{transcript_lower}'")
-                else:
-                    logger.debug(f"      ❌ Missing '{keyword}'")
+                    if debug:
+                        logger.debug("      ✅ Found '%s' (x%d) - Score: %d", keyword, occurrences, keyword_score)
             
             scores[emergency_type] = score
-            logger.debug(f"   📊 {emergency_type.upper()} Total Score: {score}")
-            logger.debug(f"   🎯 Matched Keywords: {matched_keywords}")
-            print(f"📊 {emergency_type.upper()} SCORE: {score}")
+            if debug:
+                logger.debug("   📊 %s Total Score: %d, Matched Keywords: %s",
+                             emergency_type.upper(), score, matched_keywords)
         
         # Find the emergency type with highest score
         best_type = max(scores, key=scores.get)
@@ -96,21 +89,18 @@ class ClassificationEngine:
         max_possible_score = sum(len(k) for k in self.emergency_keywords[best_type])
         confidence = min(best_score / max_possible_score, 1.0) if max_possible_score > 0 else 0.0
         
-        logger.debug(f"🏆 CLASSIFICATION RESULTS:")
-        logger.debug(f"   🥇 Best Type: {best_type}")
-        logger.debug(f"   📈 Best Score: {best_score}")
-        logger.debug(f"   🎯 Max Possible Score: {max_possible_score}")
-        logger.debug(f"   📊 Normalized Confidence: {confidence:.3f}")
-        logger.debug(f"   📋 All Scores: {scores}")
-        
-        print(f"🏆 FINAL RESULT: {best_type} (confidence: {confidence:.2f})")
+        if debug:
+            logger.debug("🏆 CLASSIFICATION RESULTS:")
+            logger.debug("   🥇 Best Type: %s (score %d of %d)", best_type, best_score, max_possible_score)
+            logger.debug("   📊 Normalized Confidence: %.3f", confidence)
+            logger.debug("   📋 All Scores: %s", scores)
         
         result = ClassificationResult(
             emergency_type=EmergencyType(best_type),
             confidence=confidence
         )
         
-        logger.info(f"✅ CLASSIFICATION COMPLETE: {best_type} (confidence: {confidence:.2f})")
+        logger.info("✅ CLASSIFICATION COMPLETE: %s (confidence: %.2f)", best_type, confidence)
         return result
 
 
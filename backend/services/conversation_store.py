@@ -0,0 +1,152 @@
+"""
+Conversation State Store
+Keeps hybrid triage conversation state outside the worker process so that
+follow-up turns survive restarts and can land on any uvicorn worker
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, Optional
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ConversationStore(ABC):
+    """Key-value interface for conversation state keyed by call SID"""
+
+    @abstractmethod
+    def get(self, call_sid: str) -> Optional[Dict]:
+        """Return the stored conversation for a call, or None"""
+
+    @abstractmethod
+    def set(self, call_sid: str, conversation: Dict) -> None:
+        """Create or replace the conversation for a call"""
+
+    @abstractmethod
+    def delete(self, call_sid: str) -> bool:
+        """Remove a conversation, returning True if it existed"""
+
+    @abstractmethod
+    def purge_expired(self, max_age_seconds: float) -> int:
+        """Remove conversations not updated within max_age_seconds"""
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """Number of stored conversations"""
+
+    def __contains__(self, call_sid: str) -> bool:
+        return self.get(call_sid) is not None
+
+
+class InMemoryConversationStore(ConversationStore):
+    """Process-local store, suitable for a single worker or tests"""
+
+    def __init__(self):
+        self._conversations: Dict[str, Dict] = {}
+        self._updated_at: Dict[str, float] = {}
+
+    def get(self, call_sid: str) -> Optional[Dict]:
+        return self._conversations.get(call_sid)
+
+    def set(self, call_sid: str, conversation: Dict) -> None:
+        self._conversations[call_sid] = conversation
+        self._updated_at[call_sid] = time.time()
+
+    def delete(self, call_sid: str) -> bool:
+        self._updated_at.pop(call_sid, None)
+        return self._conversations.pop(call_sid, None) is not None
+
+    def purge_expired(self, max_age_seconds: float) -> int:
+        cutoff = time.time() - max_age_seconds
+        expired = [sid for sid, updated in self._updated_at.items() if updated < cutoff]
+        for call_sid in expired:
+            self.delete(call_sid)
+        return len(expired)
+
+    def __len__(self) -> int:
+        return len(self._conversations)
+
+
+class SQLiteConversationStore(ConversationStore):
+    """
+    File-backed store shared by every worker on the host.
+
+    Rows are keyed by call SID (primary key lookup), values are JSON documents.
+    WAL mode lets concurrent workers read while another one writes.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=5.0, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS conversations ("
+            " call_sid TEXT PRIMARY KEY,"
+            " state TEXT NOT NULL,"
+            " updated_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS ix_conversations_updated_at ON conversations (updated_at)"
+        )
+
+    def get(self, call_sid: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT state FROM conversations WHERE call_sid = ?", (call_sid,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set(self, call_sid: str, conversation: Dict) -> None:
+        state = json.dumps(conversation, default=str)
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO conversations (call_sid, state, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(call_sid) DO UPDATE SET state = excluded.state, updated_at = excluded.updated_at",
+                (call_sid, state, time.time())
+            )
+
+    def delete(self, call_sid: str) -> bool:
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM conversations WHERE call_sid = ?", (call_sid,))
+        return cursor.rowcount > 0
+
+    def purge_expired(self, max_age_seconds: float) -> int:
+        cutoff = time.time() - max_age_seconds
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM conversations WHERE updated_at < ?", (cutoff,))
+        return cursor.rowcount
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM conversations").fetchone()[0]
+
+    def close(self):
+        """Close the underlying connection"""
+        with self._lock:
+            self._conn.close()
+
+
+def create_conversation_store() -> ConversationStore:
+    """Build the conversation store selected by CONVERSATION_STORE"""
+    backend = settings.CONVERSATION_STORE.lower()
+
+    if backend == "memory":
+        logger.info("💬 Conversation store: in-memory")
+        return InMemoryConversationStore()
+
+    if backend != "sqlite":
+        logger.warning(f"Unknown CONVERSATION_STORE '{backend}', falling back to sqlite")
+
+    logger.info(f"💬 Conversation store: sqlite ({settings.CONVERSATION_STORE_PATH})")
+    return SQLiteConversationStore(settings.CONVERSATION_STORE_PATH)
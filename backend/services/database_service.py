@@ -1,4 +1,5 @@
 import logging
+import time
 from sqlalchemy import create_engine, desc, and_, or_, func
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.exc import SQLAlchemyError
@@ -7,6 +8,8 @@ from typing import List, Optional, Dict, Any
 from models.database import Base, CallRecord, CallNote, Analytics, EmergencyType, SeverityLevel, CallStatus, EmergencyService
 from config import settings
 from utils.enum_utils import normalize_emergency_type, normalize_severity_level, normalize_call_status, normalize_emergency_service
+from utils.tracing import tracer
+from utils.metrics_registry import metrics
 
 logger = logging.getLogger(__name__)
 
@@ -18,6 +21,11 @@ class DatabaseService:
             connect_args={"check_same_thread": False} if "sqlite" in settings.DATABASE_URL else {}
         )
         self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+        self.commit_latency = metrics.histogram(
+            "db_commit_latency_ms",
+            "Database commit latency in milliseconds by operation",
+            ("operation",)
+        )
         self.create_tables()
     
     def create_tables(self):
@@ -33,6 +41,14 @@ class DatabaseService:
         """Get database session"""
         return self.SessionLocal()
     
+    def _commit(self, session: Session, operation: str):
+        """Commit and record the commit latency for the given operation"""
+        start = time.perf_counter()
+        try:
+            session.commit()
+        finally:
+            self.commit_latency.labels(operation=operation).record((time.perf_counter() - start) * 1000)
+    
     def create_call_record(self, call_data: Dict[str, Any]) -> CallRecord:
         """Create a new call record with robust enum handling"""
         session = self.get_session()
@@ -65,9 +81,10 @@ class DatabaseService:
                 call_metadata=call_data.get('metadata', {})
             )
             
-            session.add(call_record)
-            session.commit()
-            session.refresh(call_record)
+            with tracer.span("db.commit", table="call_records"):
+                session.add(call_record)
+                self._commit(session, "create_call_record")
+                session.refresh(call_record)
             
             logger.info(f"Created call record: {call_record.id} - {call_record.emergency_type.value}")
             return call_record
@@ -139,7 +156,7 @@ class DatabaseService:
                 if assigned_unit:
                     call_record.assigned_unit = assigned_unit
                 call_record.updated_at = datetime.utcnow()
-                session.commit()
+                self._commit(session, "update_call_status")
                 session.refresh(call_record)
                 logger.info(f"Updated call {call_id} status to {status}")
                 return call_record
@@ -162,7 +179,7 @@ class DatabaseService:
             )
             
             session.add(call_note)
-            session.commit()
+            self._commit(session, "add_call_note")
             session.refresh(call_note)
             
             logger.info(f"Added note to call {call_id}")
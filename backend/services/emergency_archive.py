@@ -0,0 +1,116 @@
+"""
+Emergency Archive
+Resolved emergencies, persisted so EmergencyService only keeps a bounded
+tail of recent history in memory. A SQLite table (WAL mode, like the
+conversation store and the notification outbox) holding each emergency's
+to_dict() payload plus the columns statistics are rebuilt from at startup.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from backend.app.models.emergency import EmergencyCall
+
+logger = logging.getLogger(__name__)
+
+
+class EmergencyArchive:
+    """
+    SQLite-backed store of resolved emergencies
+
+    Args:
+        path: Database file
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=5.0, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS emergency_archive ("
+            " seq INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " id TEXT NOT NULL UNIQUE,"
+            " call_sid TEXT NOT NULL,"
+            " emergency_type TEXT NOT NULL,"
+            " priority TEXT NOT NULL,"
+            " status TEXT NOT NULL,"
+            " resolution_seconds REAL NOT NULL,"
+            " archived_at TEXT NOT NULL,"
+            " payload TEXT NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_emergency_archive_call_sid ON emergency_archive (call_sid)")
+
+    def append(self, emergency: EmergencyCall):
+        """Archive a finished emergency (ids already archived are left alone)"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO emergency_archive"
+                " (id, call_sid, emergency_type, priority, status, resolution_seconds, archived_at, payload)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    emergency.id,
+                    emergency.call_sid,
+                    emergency.emergency_type.value,
+                    emergency.priority.value,
+                    emergency.status.value,
+                    (emergency.updated_at - emergency.created_at).total_seconds(),
+                    datetime.utcnow().isoformat(),
+                    json.dumps(emergency.to_dict(), default=str)
+                )
+            )
+
+    def get(self, call_sid: str) -> Optional[Dict[str, Any]]:
+        """The latest archived emergency for a call SID, as to_dict() output"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload FROM emergency_archive WHERE call_sid = ? ORDER BY seq DESC LIMIT 1", (call_sid,)
+            ).fetchone()
+        return json.loads(row["payload"]) if row else None
+
+    def recent(self, limit: int = 50, offset: int = 0) -> List[Dict[str, Any]]:
+        """Archived emergencies, newest first"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT payload FROM emergency_archive ORDER BY seq DESC LIMIT ? OFFSET ?", (limit, offset)
+            ).fetchall()
+        return [json.loads(row["payload"]) for row in rows]
+
+    def aggregate(self) -> Dict[str, Any]:
+        """
+        Totals over the whole archive, to seed the service's counters at startup
+
+        Returns:
+            {"total", "resolved", "resolution_seconds", "type", "priority", "status"}
+            where the last three map each value to its count
+        """
+        totals: Dict[str, Any] = {"total": 0, "resolved": 0, "resolution_seconds": 0.0}
+        with self._lock:
+            for column in ("emergency_type", "priority", "status"):
+                rows = self._conn.execute(f"SELECT {column} AS value, COUNT(*) AS n FROM emergency_archive GROUP BY {column}").fetchall()
+                totals[column.replace("emergency_", "")] = {row["value"]: row["n"] for row in rows}
+            row = self._conn.execute(
+                "SELECT COUNT(*) AS n, COALESCE(SUM(resolution_seconds), 0) AS seconds"
+                " FROM emergency_archive WHERE status = 'resolved'"
+            ).fetchone()
+            totals["resolved"] = row["n"]
+            totals["resolution_seconds"] = row["seconds"]
+        totals["total"] = sum(totals["status"].values())
+        return totals
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM emergency_archive").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -1,10 +1,15 @@
-from typing import Dict, List, Optional, Any
+from typing import Deque, Dict, List, Optional, Any
+from collections import Counter, deque
 from datetime import datetime, timedelta
+from itertools import islice
+import asyncio
 import logging
 from backend.app.models.emergency import EmergencyCall, EmergencyType, EmergencyPriority, EmergencyStatus
 from backend.app.models.team import TeamMember, Team
 from backend.app.models.notifications import NotificationManager, NotificationPriority
 from backend.config import settings
+from backend.services.emergency_archive import EmergencyArchive
+from backend.services.escalation_scheduler import EscalationScheduler
 
 logger = logging.getLogger(__name__)
 
@@ -12,9 +17,35 @@ logger = logging.getLogger(__name__)
 class EmergencyService:
     def __init__(self):
         self.active_emergencies: Dict[str, EmergencyCall] = {}
-        self.emergency_history: List[EmergencyCall] = []
+        # Recent resolved emergencies; older ones live only in the archive (when enabled)
+        self.emergency_history: Deque[EmergencyCall] = deque(maxlen=settings.EMERGENCY_HISTORY_SIZE)
+        self.archive: Optional[EmergencyArchive] = None
+        if settings.EMERGENCY_ARCHIVE_PATH:
+            self.archive = EmergencyArchive(settings.EMERGENCY_ARCHIVE_PATH)
+        # Statistics, kept current as emergencies are created, escalated, acknowledged and resolved
+        self.total_emergencies = 0
+        self.type_counts: Counter = Counter()
+        self.priority_counts: Counter = Counter()
+        self.status_counts: Counter = Counter()
+        self.resolved_count = 0
+        self.total_resolution_seconds = 0.0
+        self._load_archived_statistics()
         self.notification_manager = NotificationManager()
         self.escalation_rules = self._initialize_escalation_rules()
+        # Unacknowledged emergencies escalate when their auto_escalate_time passes (and again each interval, up to level 3)
+        self.escalation_scheduler = EscalationScheduler(self._auto_escalate)
+        
+    def _load_archived_statistics(self):
+        """Seed the counters with everything archived by previous runs"""
+        if self.archive is None:
+            return
+        totals = self.archive.aggregate()
+        self.total_emergencies = totals["total"]
+        self.type_counts.update({EmergencyType(value): n for value, n in totals["type"].items()})
+        self.priority_counts.update({EmergencyPriority(value): n for value, n in totals["priority"].items()})
+        self.status_counts.update({EmergencyStatus(value): n for value, n in totals["status"].items()})
+        self.resolved_count = totals["resolved"]
+        self.total_resolution_seconds = totals["resolution_seconds"]
         
     def _initialize_escalation_rules(self) -> Dict[str, Dict]:
         """Initialize escalation rules for different emergency types"""
@@ -49,10 +80,20 @@ class EmergencyService:
         caller_phone: Optional[str] = None,
         description: Optional[str] = None
     ) -> EmergencyCall:
-        """Create a new emergency call"""
+        """
+        Create a new emergency call
+
+        A call_sid that is already active (e.g. a retried webhook) returns the
+        existing emergency unchanged, so it is counted, scheduled and notified once.
+        """
         try:
             emergency_type_enum = EmergencyType(emergency_type.lower())
             
+            existing = self.active_emergencies.get(call_sid)
+            if existing is not None:
+                logger.info(f"Emergency call {call_sid} already active: {existing.id}")
+                return existing
+            
             # Determine priority based on type
             priority = EmergencyPriority.MEDIUM
             if emergency_type_enum in [EmergencyType.FIRE, EmergencyType.POLICE]:
@@ -70,6 +111,11 @@ class EmergencyService:
             )
             
             self.active_emergencies[call_sid] = emergency
+            self.total_emergencies += 1
+            self.type_counts[emergency.emergency_type] += 1
+            self.priority_counts[emergency.priority] += 1
+            self.status_counts[emergency.status] += 1
+            self._schedule_auto_escalation(emergency)
             logger.info(f"Created emergency call: {emergency.id} - Type: {emergency_type}")
             
             # Trigger notifications
@@ -99,7 +145,10 @@ class EmergencyService:
         if not emergency:
             return False
             
+        self.status_counts[emergency.status] -= 1
         emergency.acknowledge(team_member_id)
+        self.status_counts[emergency.status] += 1
+        self.escalation_scheduler.cancel(call_sid)
         logger.info(f"Emergency {emergency.id} acknowledged by {team_member_id}")
         return True
         
@@ -109,7 +158,9 @@ class EmergencyService:
         if not emergency:
             return False
             
+        self.priority_counts[emergency.priority] -= 1
         emergency.escalate()
+        self.priority_counts[emergency.priority] += 1
         logger.warning(f"Emergency {emergency.id} escalated to {emergency.priority.value}")
         
         # Trigger escalation notifications
@@ -135,10 +186,17 @@ class EmergencyService:
         if not emergency:
             return False
             
+        self.status_counts[emergency.status] -= 1
         emergency.resolve(resolution_notes)
+        self.status_counts[emergency.status] += 1
+        self.resolved_count += 1
+        self.total_resolution_seconds += (emergency.updated_at - emergency.created_at).total_seconds()
+        self.escalation_scheduler.cancel(call_sid)
         
-        # Move to history
+        # Move to history (the oldest falls off the in-memory tail once it is full)
         self.emergency_history.append(emergency)
+        if self.archive is not None:
+            self.archive.append(emergency)
         del self.active_emergencies[call_sid]
         
         logger.info(f"Emergency {emergency.id} resolved")
@@ -152,65 +210,74 @@ class EmergencyService:
         """Get emergency call by SID"""
         return self.active_emergencies.get(call_sid)
         
-    def get_emergency_statistics(self) -> Dict[str, Any]:
-        """Get emergency statistics"""
-        total_emergencies = len(self.emergency_history) + len(self.active_emergencies)
-        
-        # Count by type
-        type_counts = {}
-        priority_counts = {}
-        status_counts = {}
-        
-        all_emergencies = list(self.active_emergencies.values()) + self.emergency_history
+    def get_resolved_emergencies(self, limit: int = 50, offset: int = 0) -> List[Dict[str, Any]]:
+        """Resolved emergencies, newest first (served from memory when the tail covers the page)"""
+        if self.archive is None or offset + limit <= len(self.emergency_history):
+            return [emergency.to_dict() for emergency in islice(reversed(self.emergency_history), offset, offset + limit)]
+        return self.archive.recent(limit, offset)
         
-        for emergency in all_emergencies:
-            # Type counts
-            emergency_type = emergency.emergency_type.value
-            type_counts[emergency_type] = type_counts.get(emergency_type, 0) + 1
-            
-            # Priority counts
-            priority = emergency.priority.value
-            priority_counts[priority] = priority_counts.get(priority, 0) + 1
-            
-            # Status counts
-            status = emergency.status.value
-            status_counts[status] = status_counts.get(status, 0) + 1
-            
-        # Calculate average resolution time
-        resolved_emergencies = [e for e in self.emergency_history if e.status == EmergencyStatus.RESOLVED]
+    def get_emergency_statistics(self) -> Dict[str, Any]:
+        """Get emergency statistics (O(1): counters are kept current, archived emergencies included)"""
         avg_resolution_time = 0
-        
-        if resolved_emergencies:
-            total_time = sum(
-                (e.updated_at - e.created_at).total_seconds() 
-                for e in resolved_emergencies
-            )
-            avg_resolution_time = total_time / len(resolved_emergencies)
+        if self.resolved_count:
+            avg_resolution_time = self.total_resolution_seconds / self.resolved_count
             
         return {
-            "total_emergencies": total_emergencies,
+            "total_emergencies": self.total_emergencies,
             "active_emergencies": len(self.active_emergencies),
-            "resolved_emergencies": len(resolved_emergencies),
-            "type_distribution": type_counts,
-            "priority_distribution": priority_counts,
-            "status_distribution": status_counts,
+            "resolved_emergencies": self.resolved_count,
+            "type_distribution": {emergency_type.value: n for emergency_type, n in self.type_counts.items() if n},
+            "priority_distribution": {priority.value: n for priority, n in self.priority_counts.items() if n},
+            "status_distribution": {status.value: n for status, n in self.status_counts.items() if n},
             "average_resolution_time_seconds": avg_resolution_time
         }
         
-    def check_auto_escalation(self):
-        """Check for emergencies that need auto-escalation"""
-        current_time = datetime.utcnow()
+    def _auto_escalate_seconds(self, emergency: EmergencyCall) -> float:
+        rules = self.escalation_rules.get(emergency.emergency_type.value, {})
+        return rules.get("auto_escalate_time", 60)
+        
+    def _schedule_auto_escalation(self, emergency: EmergencyCall):
+        self.escalation_scheduler.schedule(emergency.call_sid, self._auto_escalate_seconds(emergency))
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return  # No loop: check_auto_escalation() fires the deadlines
+        self.escalation_scheduler.start()
+        
+    def _auto_escalate(self, call_sid: str):
+        """Escalation deadline passed: escalate if still unacknowledged and re-arm"""
+        emergency = self.active_emergencies.get(call_sid)
+        if not emergency or emergency.status != EmergencyStatus.PENDING:
+            return
+        self.escalate_emergency(call_sid)
+        time_elapsed = (datetime.utcnow() - emergency.created_at).total_seconds()
+        logger.warning(f"Auto-escalated emergency {emergency.id} after {time_elapsed:.0f}s")
+        if emergency.escalation_level < 3:
+            self.escalation_scheduler.schedule(call_sid, self._auto_escalate_seconds(emergency))
+        
+    def check_auto_escalation(self) -> int:
+        """
+        Escalate emergencies whose deadline has passed
+
+        Inside the event loop the escalation scheduler already fires them on
+        time; this is for callers without one. Costs O(k log n) for k due
+        emergencies rather than a scan of every active one.
+
+        Returns:
+            Number of deadlines fired
+        """
+        return self.escalation_scheduler.run_due()
+        
+    async def start(self):
+        """Fire auto-escalations on the running event loop (call at startup)"""
+        self.escalation_scheduler.start()
+        
+    async def shutdown(self):
+        """Stop the auto-escalation task (deadlines are kept) and close the archive"""
+        await self.escalation_scheduler.stop()
+        if self.archive is not None:
+            self.archive.close()
         
-        for emergency in self.active_emergencies.values():
-            if emergency.status == EmergencyStatus.PENDING:
-                time_elapsed = (current_time - emergency.created_at).total_seconds()
-                rules = self.escalation_rules.get(emergency.emergency_type.value, {})
-                auto_escalate_time = rules.get("auto_escalate_time", 60)
-                
-                if time_elapsed > auto_escalate_time:
-                    self.escalate_emergency(emergency.call_sid)
-                    logger.warning(f"Auto-escalated emergency {emergency.id} after {time_elapsed}s")
-                    
     def detect_emergency_keywords(self, user_input: str) -> Optional[str]:
         """Detect emergency keywords in user input"""
         emergency_keywords = {
@@ -0,0 +1,173 @@
+"""
+Escalation Scheduler
+One deadline per key (an emergency's call SID) in a min-heap, fired by a
+single task on the event loop that sleeps until the earliest deadline.
+Scheduling costs O(log n), cancelling O(1) and firing O(log n), instead of
+a periodic sweep over every active emergency. Cancelled and rescheduled
+entries are invalidated lazily (a version per key) and dropped when they
+surface, with a compaction when stale entries pile up.
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import threading
+import time
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+from backend.utils.metrics_registry import metrics
+
+logger = logging.getLogger(__name__)
+
+escalation_timers = metrics.gauge("emergency_escalation_timers", "Emergencies with an auto-escalation deadline pending")
+escalation_lateness = metrics.gauge("emergency_escalation_lateness_seconds", "How late the last auto-escalation fired")
+
+
+class EscalationScheduler:
+    """
+    Deadline heap for auto-escalation
+
+    Args:
+        on_due: Called with the key of each deadline that passes (outside
+            the scheduler's lock; it may schedule the key again)
+        clock: Monotonic time source (injectable for benchmarks)
+    """
+
+    def __init__(self, on_due: Callable[[Hashable], None], clock: Callable[[], float] = time.monotonic):
+        self.on_due = on_due
+        self.clock = clock
+        self._heap: List[Tuple[float, int, Hashable]] = []  # (deadline, version, key); versions are unique, so keys are never compared
+        self._versions: Dict[Hashable, int] = {}  # Keys with a live deadline -> its version
+        self._deadlines: Dict[Hashable, float] = {}
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    def __len__(self) -> int:
+        return len(self._deadlines)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._deadlines
+
+    def deadline(self, key: Hashable) -> Optional[float]:
+        """Clock time the key fires at, None when nothing is scheduled"""
+        return self._deadlines.get(key)
+
+    def schedule(self, key: Hashable, delay: float):
+        """Fire on_due(key) after delay seconds, replacing any deadline the key had"""
+        deadline = self.clock() + delay
+        with self._lock:
+            version = next(self._counter)
+            self._versions[key] = version
+            self._deadlines[key] = deadline
+            earliest = not self._heap or deadline < self._heap[0][0]
+            heapq.heappush(self._heap, (deadline, version, key))
+            escalation_timers.set(len(self._deadlines))
+        if earliest:
+            self._wake()
+
+    def cancel(self, key: Hashable) -> bool:
+        """Drop the key's deadline; returns False if it had none"""
+        with self._lock:
+            if self._versions.pop(key, None) is None:
+                return False
+            del self._deadlines[key]
+            escalation_timers.set(len(self._deadlines))
+            if len(self._heap) > 2 * len(self._versions) + 64:
+                self._compact()
+        return True
+
+    def _compact(self):
+        # Drop every stale entry at once; amortized O(1) per cancellation
+        self._heap = [entry for entry in self._heap if self._versions.get(entry[2]) == entry[1]]
+        heapq.heapify(self._heap)
+
+    def _pop_due(self, now: float) -> List[Tuple[Hashable, float]]:
+        due = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                deadline, version, key = heapq.heappop(self._heap)
+                if self._versions.get(key) != version:
+                    continue  # Cancelled or rescheduled
+                del self._versions[key]
+                del self._deadlines[key]
+                due.append((key, deadline))
+            escalation_timers.set(len(self._deadlines))
+        return due
+
+    def run_due(self) -> int:
+        """
+        Fire every deadline that has passed
+
+        The loop task calls this on time; callers without a running event
+        loop can call it periodically instead.
+
+        Returns:
+            Number of keys fired
+        """
+        now = self.clock()
+        due = self._pop_due(now)
+        for key, deadline in due:
+            escalation_lateness.set(now - deadline)
+            try:
+                self.on_due(key)
+            except Exception as e:
+                logger.error(f"❌ Error auto-escalating {key}: {e}")
+        return len(due)
+
+    def _next_delay(self) -> Optional[float]:
+        with self._lock:
+            while self._heap and self._versions.get(self._heap[0][2]) != self._heap[0][1]:
+                heapq.heappop(self._heap)
+            if not self._heap:
+                return None
+            return max(0.0, self._heap[0][0] - self.clock())
+
+    def start(self):
+        """Start firing deadlines on the running event loop"""
+        if self.running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._task = self._loop.create_task(self._run())
+        logger.info("⏰ Escalation scheduler started")
+
+    async def stop(self):
+        """Stop the loop task (pending deadlines are kept)"""
+        if not self.running:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        self._wakeup = None
+        self._loop = None
+
+    def _wake(self):
+        """An earlier deadline arrived: let the task recompute its sleep"""
+        loop, wakeup = self._loop, self._wakeup
+        if wakeup is None:
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            wakeup.set()
+        else:
+            loop.call_soon_threadsafe(wakeup.set)
+
+    async def _run(self):
+        while True:
+            self.run_due()
+            delay = self._next_delay()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
@@ -0,0 +1,333 @@
+"""
+Streaming Export Service
+Exports call history (call_records) and in-memory analytics call details as
+NDJSON, CSV or Parquet, optionally gzip/zstd compressed, as a generator of
+byte chunks suitable for a StreamingResponse. Rows are read one keyset page
+at a time, so memory stays flat no matter how large the export is.
+"""
+
+import csv
+import enum
+import io
+import json
+import logging
+import zlib
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from sqlalchemy import select
+from models.database import CallRecord
+from services.database_service import database_service
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+try:
+    import zstandard
+    HAS_ZSTD = True
+except ImportError:
+    HAS_ZSTD = False
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FORMATS = ("ndjson", "csv", "parquet")
+EXPORT_COMPRESSIONS = ("none", "gzip", "zstd")
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+}
+FILE_SUFFIXES = {"none": "", "gzip": ".gz", "zstd": ".zst"}
+
+# Column name -> kind, in export order ("json" columns are nested values)
+CALL_RECORD_COLUMNS: Dict[str, str] = {
+    "id": "int",
+    "call_sid": "string",
+    "from_number": "string",
+    "to_number": "string",
+    "transcript": "string",
+    "emergency_type": "string",
+    "severity_level": "string",
+    "severity_score": "float",
+    "location_address": "string",
+    "location_latitude": "float",
+    "location_longitude": "float",
+    "confidence": "float",
+    "risk_indicators": "json",
+    "assigned_service": "string",
+    "priority": "int",
+    "summary": "string",
+    "status": "string",
+    "assigned_unit": "string",
+    "created_at": "timestamp",
+    "updated_at": "timestamp",
+    "processing_time_ms": "float",
+    "call_metadata": "json",
+}
+
+ANALYTICS_DETAIL_COLUMNS: Dict[str, str] = {
+    "call_sid": "string",
+    "duration": "int",
+    "is_emergency": "bool",
+    "call_type": "string",
+    "outcome": "string",
+    "response_time": "float",
+    "team_member_id": "string",
+    "caller_location": "string",
+    "quality_score": "float",
+    "timestamp": "timestamp",
+}
+
+
+class ExportError(ValueError):
+    """Raised for unsupported export formats or missing optional packages"""
+    pass
+
+
+def _plain_value(value: Any) -> Any:
+    # Enums -> value, aware datetimes -> naive UTC so every row uses one layout
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, datetime) and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _text_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+class ExportService:
+    def __init__(self, page_size: int = 1000):
+        self.page_size = page_size
+
+    # Row sources
+
+    def iter_call_records(
+        self,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+        page_size: Optional[int] = None
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Pages of call_records rows in id order, via keyset pagination
+
+        Each page is a fresh `WHERE id > last_id ORDER BY id LIMIT n` query
+        over plain columns (no ORM identity map), so neither the database nor
+        this process ever holds more than one page. created_at is stored as
+        naive UTC, so aware bounds are converted to that before the query.
+        """
+        page_size = page_size or self.page_size
+        date_from, date_to = _plain_value(date_from), _plain_value(date_to)
+        columns = [getattr(CallRecord, name) for name in CALL_RECORD_COLUMNS]
+        last_id = 0
+        session = database_service.get_session()
+        try:
+            while True:
+                query = select(*columns).where(CallRecord.id > last_id)
+                if date_from:
+                    query = query.where(CallRecord.created_at >= date_from)
+                if date_to:
+                    query = query.where(CallRecord.created_at <= date_to)
+                rows = session.execute(query.order_by(CallRecord.id).limit(page_size)).all()
+                if not rows:
+                    return
+                yield [
+                    {name: _plain_value(value) for name, value in zip(CALL_RECORD_COLUMNS, row)}
+                    for row in rows
+                ]
+                last_id = rows[-1][0]
+        finally:
+            session.close()
+
+    def iter_analytics_details(
+        self,
+        analytics_service,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+        page_size: Optional[int] = None
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """Pages of in-memory analytics call details (the columnar store) in arrival order"""
+        page_size = page_size or self.page_size
+        store = analytics_service.call_details
+        lo, hi = 0, len(store)
+        if date_from or date_to:
+            start = _plain_value(date_from).replace(tzinfo=timezone.utc).timestamp() if date_from else float("-inf")
+            end = _plain_value(date_to).replace(tzinfo=timezone.utc).timestamp() if date_to else float("inf")
+            lo, hi = store.time_range(start, end)
+        for page_start in range(lo, hi, page_size):
+            rows = store.rows(range(page_start, min(page_start + page_size, hi)))
+            for row in rows:
+                row["timestamp"] = datetime.fromisoformat(row["timestamp"])
+            yield rows
+
+    # Encoders: pages of row dicts -> byte chunks
+
+    def encode_ndjson(self, pages: Iterable[List[Dict[str, Any]]], columns: Dict[str, str]) -> Iterator[bytes]:
+        for page in pages:
+            yield "".join(
+                json.dumps({name: _text_value(row[name]) for name in columns}, default=str) + "\n"
+                for row in page
+            ).encode("utf-8")
+
+    def encode_csv(self, pages: Iterable[List[Dict[str, Any]]], columns: Dict[str, str]) -> Iterator[bytes]:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(columns)
+        json_columns = {name for name, kind in columns.items() if kind == "json"}
+        for page in pages:
+            for row in page:
+                writer.writerow([
+                    json.dumps(row[name], default=str) if name in json_columns and row[name] is not None
+                    else _text_value(row[name])
+                    for name in columns
+                ])
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue().encode("utf-8")
+
+    def encode_parquet(self, pages: Iterable[List[Dict[str, Any]]], columns: Dict[str, str]) -> Iterator[bytes]:
+        """One Parquet row group per page, flushed to the client as it is written"""
+        if not HAS_PYARROW:
+            raise ExportError("Parquet export requires the optional 'pyarrow' package")
+
+        arrow_types = {
+            "int": pa.int64(), "float": pa.float64(), "bool": pa.bool_(),
+            "string": pa.string(), "json": pa.string(), "timestamp": pa.timestamp("us"),
+        }
+        schema = pa.schema([(name, arrow_types[kind]) for name, kind in columns.items()])
+        json_columns = [name for name, kind in columns.items() if kind == "json"]
+        sink = _ChunkSink()
+        writer = pq.ParquetWriter(sink, schema, compression="snappy")
+        try:
+            for page in pages:
+                data = {name: [row[name] for row in page] for name in columns}
+                for name in json_columns:
+                    data[name] = [json.dumps(v, default=str) if v is not None else None for v in data[name]]
+                writer.write_table(pa.Table.from_pydict(data, schema=schema))
+                yield from sink.drain()
+        finally:
+            writer.close()
+        yield from sink.drain()
+
+    # Compression
+
+    def compress(self, chunks: Iterable[bytes], compression: str) -> Iterator[bytes]:
+        if compression == "none":
+            yield from chunks
+            return
+        if compression == "gzip":
+            compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits 31 = gzip container
+            flush = compressor.flush
+        elif compression == "zstd":
+            if not HAS_ZSTD:
+                raise ExportError("zstd compression requires the optional 'zstandard' package")
+            compressor = zstandard.ZstdCompressor(level=3).compressobj()
+            flush = compressor.flush
+        else:
+            raise ExportError(f"Unsupported compression '{compression}'")
+
+        for chunk in chunks:
+            compressed = compressor.compress(chunk)
+            if compressed:
+                yield compressed
+        yield flush()
+
+    # Entry point
+
+    def stream(
+        self,
+        source: str = "calls",
+        format: str = "ndjson",
+        compression: str = "none",
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+        analytics_service=None
+    ) -> Tuple[Iterator[bytes], str, str]:
+        """
+        Build a streaming export
+
+        Args:
+            source: "calls" (call_records table) or "analytics" (in-memory call details)
+            format: ndjson, csv or parquet
+            compression: none, gzip or zstd
+            date_from: Only rows created at or after this time
+            date_to: Only rows created at or before this time
+            analytics_service: Required for source="analytics"
+
+        Returns:
+            (byte chunk iterator, media type, download filename)
+
+        Raises:
+            ExportError: Unknown format/compression or missing optional package
+        """
+        if format not in EXPORT_FORMATS:
+            raise ExportError(f"Unsupported export format '{format}'")
+        if compression not in EXPORT_COMPRESSIONS:
+            raise ExportError(f"Unsupported compression '{compression}'")
+        # Fail before the response starts rather than halfway through the body
+        if format == "parquet" and not HAS_PYARROW:
+            raise ExportError("Parquet export requires the optional 'pyarrow' package")
+        if compression == "zstd" and not HAS_ZSTD:
+            raise ExportError("zstd compression requires the optional 'zstandard' package")
+
+        if source == "calls":
+            pages = self.iter_call_records(date_from, date_to)
+            columns = CALL_RECORD_COLUMNS
+        elif source == "analytics":
+            pages = self.iter_analytics_details(analytics_service, date_from, date_to)
+            columns = ANALYTICS_DETAIL_COLUMNS
+        else:
+            raise ExportError(f"Unsupported export source '{source}'")
+
+        encoders: Dict[str, Callable] = {
+            "ndjson": self.encode_ndjson,
+            "csv": self.encode_csv,
+            "parquet": self.encode_parquet,
+        }
+        chunks = self.compress(encoders[format](pages, columns), compression)
+        media_type = MEDIA_TYPES[format] if compression == "none" else (
+            "application/gzip" if compression == "gzip" else "application/zstd"
+        )
+        filename = f"{source}-{datetime.utcnow():%Y%m%dT%H%M%S}.{format}{FILE_SUFFIXES[compression]}"
+        logger.info(f"📦 Streaming {source} export as {filename}")
+        return chunks, media_type, filename
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object collecting what ParquetWriter emits between drains"""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> Iterator[bytes]:
+        if self._chunks:
+            chunk = b"".join(self._chunks)
+            self._chunks.clear()
+            yield chunk
+
+
+# Global instance
+export_service = ExportService()
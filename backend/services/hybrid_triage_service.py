@@ -3,14 +3,62 @@ Hybrid Emergency Triage Service
 Combines instant rule-based classification with AI safety responses
 """
 
+import asyncio
+import json
 import logging
 import time
-from typing import Dict, List
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional, Set, Tuple
 from services.database_service import database_service
+from services.conversation_store import create_conversation_store
+from services.twilio_service import twilio_service
+from config import settings
+from utils.enum_utils import normalize_call_status
+from utils.tracing import tracer
+from utils.metrics_registry import metrics
 from models.database import EmergencyType, SeverityLevel, EmergencyService, CallRecord
 
 logger = logging.getLogger(__name__)
 
+# Classification severities and the priority each maps to
+SEVERITY_PRIORITIES = {'CRITICAL': 1, 'HIGH': 2, 'MODERATE': 3}
+
+# call_metadata fields that change between turns of a conversation; the rest come from the bundle
+METADATA_DYNAMIC_FIELDS = ('priority_level', 'timestamp', 'call_time', 'what_to_say', 'conversation_status')
+
+# /voice/ultra-fast response fields filled in per call; the rest come from the bundle
+RESPONSE_DYNAMIC_FIELDS = ('processing_time_ms', 'timestamp', 'created_at', 'call_time')
+
+
+@dataclass(frozen=True)
+class SafetyBundle:
+    """Everything in a triage response that depends only on category and severity, built once"""
+    key: str  # "<safety category>:<severity>", kept in the result as 'bundle'
+    result: Mapping[str, Any]  # Static result fields, read-only (lists are tuples)
+    metadata_json: str  # call_metadata JSON for the static fields, left open for the dynamic ones
+    initial_metadata_json: str  # The same plus the first turn's what_to_say, priority_level and status
+    response_json: str  # /voice/ultra-fast response body for the static fields, left open likewise
+    twiml: bytes  # Ultra-fast voice TwiML speaking what_to_say, then asking the danger question
+
+
+_json_encoder = json.JSONEncoder(default=str)
+
+
+def _splice_json(fragment: str, values: Dict[str, Any]) -> str:
+    """Close an open JSON object fragment with the given fields"""
+    parts = [fragment]
+    encoded: Dict[int, str] = {}  # The same timestamp fills several fields; encode it once
+    for name, value in values.items():
+        text = encoded.get(id(value))
+        if text is None:
+            # Timestamps and timings are finite floats, whose JSON form is their repr
+            text = encoded[id(value)] = float.__repr__(value) if type(value) is float else _json_encoder.encode(value)
+        parts.append(f', "{name}": {text}')
+    parts.append("}")
+    return "".join(parts)
+
 
 class HybridTriageService:
     """Hybrid service: Instant classification + AI safety responses"""
@@ -50,8 +98,14 @@ class HybridTriageService:
             }
         }
         
-        # Conversation state management
-        self.active_conversations = {}  # Track ongoing conversations
+        # Conversation state management (shared across workers, survives restarts)
+        self.conversation_store = create_conversation_store()
+        self._last_conversation_purge = 0.0
+        # Refreshed on each (throttled) purge so scrapes never touch the store
+        self.conversation_store_size = metrics.gauge(
+            "conversation_store_size",
+            "Conversations held in the conversation store (refreshed at most once a minute)"
+        )
         
         # Safety responses for each category
         self.safety_responses = {
@@ -63,6 +117,12 @@ class HybridTriageService:
                     'Close doors behind you',
                     'Move to designated assembly point'
                 ],
+                'safety_precautions': [
+                    'Stay low to avoid smoke inhalation',
+                    'Feel doors before opening',
+                    'Use stairs only for evacuation',
+                    'Help others evacuate if safe to do so'
+                ],
                 'dispatched_service': 'Fire Department',
                 'danger_question': 'Is the fire spreading or are people trapped?',
                 'escalated_response': 'Help is on the way! Priority increased to critical. Stay on the line and we will end the call when help arrives.'
@@ -178,6 +238,21 @@ class HybridTriageService:
             }
         }
         
+        # Every category x severity response, precomputed so a call only splices in its timestamps
+        self.bundles = self._build_bundles()
+        self._bundles_by_key = {bundle.key: bundle for bundle in self.bundles.values()}
+        
+        # Call records are written off the request path, one at a time so a call's turns land in order
+        self._storage_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="hybrid-storage")
+        self._storage_tasks: Set[asyncio.Task] = set()
+        
+        # Fixed-memory latency histograms for initial and follow-up turns
+        self.latency = metrics.histogram(
+            "hybrid_triage_latency_ms",
+            "Hybrid triage latency in milliseconds by conversation stage",
+            ("stage",)
+        )
+        
         logger.info("🚀 Hybrid Triage Service initialized")
         logger.info("   Strategy: Instant classification + AI safety responses")
     
@@ -207,7 +282,147 @@ class HybridTriageService:
         else:
             return 'LEVEL_3'
     
-    async def process(self, transcript: str, call_sid: str = None, is_followup: bool = False) -> Dict:
+    def _build_bundles(self) -> Dict[Tuple[EmergencyType, str], SafetyBundle]:
+        """Precompute the response bundle for every emergency type and severity _classify_instant can return"""
+        safety_keys = {config['category']: name for name, config in self.emergency_keywords.items()}
+        services = {config['category']: config['service'] for config in self.emergency_keywords.values()}
+        bundles = {}
+        for emergency_type in [*safety_keys, EmergencyType.OTHER]:
+            safety_key = safety_keys.get(emergency_type, 'Other')
+            safety = self.safety_responses[safety_key]
+            service = services.get(emergency_type, EmergencyService.AMBULANCE)
+            for severity, priority in SEVERITY_PRIORITIES.items():
+                key = f"{safety_key}:{severity}"
+                result = {
+                    # Classification results
+                    'category': self._map_to_frontend_category(emergency_type),
+                    'emergency_type': emergency_type.value,  # DB enum value, for storage
+                    'priority': priority,
+                    'reasoning_byte': 'General emergency',
+                    'confidence': 0.95,  # High confidence for rule-based
+                    
+                    # Safety responses
+                    'what_to_say': safety['what_to_say'],
+                    'immediate_actions': tuple(safety['immediate_actions']),
+                    'safety_precautions': tuple(safety['safety_precautions']),
+                    'priority_level': severity,
+                    'response_type': 'hybrid_conversation',
+                    
+                    # Dispatch information
+                    'dispatched_service': safety['dispatched_service'],
+                    'assigned_service': service.value,
+                    
+                    # Conversation state
+                    'danger_question': safety['danger_question'],
+                    'escalated_response': safety['escalated_response'],
+                    'status': 'AWAITING_FOLLOWUP',
+                    'bundle': key,
+                    
+                    # Metadata
+                    'classification_method': 'rule_based',
+                    'safety_method': 'predefined',
+                    
+                    # Post-accident specific actions (if available)
+                    'post_accident_actions': tuple(safety.get('post_accident_actions', ())),
+                    'post_accident_precautions': tuple(safety.get('post_accident_precautions', ()))
+                }
+                metadata = {
+                    'dispatched_service': result['dispatched_service'],
+                    'response_type': result['response_type'],
+                    'classification_method': result['classification_method'],
+                    'safety_method': result['safety_method'],
+                    'immediate_actions': result['immediate_actions'],
+                    'safety_precautions': result['safety_precautions'],
+                    'danger_question': result['danger_question'],
+                    'escalated_response': result['escalated_response'],
+                    'frontend_category': result['category']  # Store frontend category for API responses
+                }
+                response = {
+                    name: result[name] for name in (
+                        'category', 'priority', 'reasoning_byte', 'what_to_say', 'immediate_actions',
+                        'safety_precautions', 'priority_level', 'response_type', 'confidence',
+                        'dispatched_service', 'assigned_service', 'status', 'classification_method',
+                        'safety_method', 'post_accident_actions', 'post_accident_precautions'
+                    )
+                }
+                bundles[(emergency_type, severity)] = SafetyBundle(
+                    key=key,
+                    result=MappingProxyType(result),
+                    metadata_json=json.dumps(metadata)[:-1],
+                    initial_metadata_json=json.dumps({
+                        **metadata,
+                        'what_to_say': result['what_to_say'],
+                        'priority_level': severity,
+                        'conversation_status': result['status']
+                    })[:-1],
+                    response_json=json.dumps(response)[:-1],
+                    twiml=twilio_service.generate_ultra_fast_voice_response(result['what_to_say'], awaiting_followup=True)
+                )
+        return bundles
+    
+    def _bundle_for(self, result: Dict) -> Optional[SafetyBundle]:
+        """The bundle an initial-turn result still matches, or None once the conversation has moved on"""
+        bundle = self._bundles_by_key.get(result.get('bundle'))
+        if bundle is None or result.get('status') != 'AWAITING_FOLLOWUP' or result.get('what_to_say') != bundle.result['what_to_say']:
+            return None
+        return bundle
+    
+    def voice_twiml(self, result: Dict) -> bytes:
+        """Ultra-fast voice TwiML for a triage result (pre-rendered for initial turns)"""
+        bundle = self._bundle_for(result)
+        if bundle is not None:
+            return bundle.twiml
+        return twilio_service.generate_ultra_fast_voice_response(result['what_to_say'], result.get('status') == 'AWAITING_FOLLOWUP')
+    
+    def response_json(self, result: Dict) -> Optional[bytes]:
+        """
+        The /voice/ultra-fast response body for an initial-turn result, spliced from its bundle
+        
+        Returns:
+            UTF-8 JSON, or None when the result has no bundle (the route builds it instead)
+        """
+        bundle = self._bundle_for(result)
+        if bundle is None:
+            return None
+        return _splice_json(bundle.response_json, {name: result[name] for name in RESPONSE_DYNAMIC_FIELDS}).encode("utf-8")
+    
+    def _metadata_json(self, result: Dict) -> str:
+        """call_metadata JSON for a conversation turn, spliced onto the bundle's static fields when there is one"""
+        bundle = self._bundle_for(result)
+        if bundle is not None and result['priority_level'] == bundle.result['priority_level']:
+            return _splice_json(bundle.initial_metadata_json, {'timestamp': result['timestamp'], 'call_time': result['call_time']})
+        dynamic = {
+            'priority_level': result['priority_level'],
+            'timestamp': result['timestamp'],
+            'call_time': result['call_time'],
+            'what_to_say': result['what_to_say'],
+            'conversation_status': result['status']
+        }
+        bundle = self._bundles_by_key.get(result.get('bundle'))
+        if bundle is not None:
+            return _splice_json(bundle.metadata_json, dynamic)
+        return json.dumps({
+            'dispatched_service': result['dispatched_service'],
+            'response_type': result['response_type'],
+            'classification_method': result['classification_method'],
+            'safety_method': result['safety_method'],
+            'immediate_actions': result['immediate_actions'],
+            'safety_precautions': result['safety_precautions'],
+            'danger_question': result.get('danger_question', ''),
+            'escalated_response': result.get('escalated_response', ''),
+            'frontend_category': result['category'],
+            **dynamic
+        }, default=str)
+    
+    @tracer.traced("hybrid.process")
+    async def process(
+        self,
+        transcript: str,
+        call_sid: str = None,
+        is_followup: bool = False,
+        from_number: str = '',
+        to_number: str = ''
+    ) -> Dict:
         """
         Process emergency with conversation flow
         
@@ -215,6 +430,8 @@ class HybridTriageService:
             transcript: Emergency call transcript
             call_sid: Call session ID for conversation tracking
             is_followup: Whether this is a follow-up response
+            from_number: Caller number, for the call record
+            to_number: Called number, for the call record
             
         Returns:
             Complete emergency response with safety guidance
@@ -222,109 +439,74 @@ class HybridTriageService:
         start_time = time.time()
         
         try:
-            logger.info(f"⚡ Hybrid processing started for: {transcript[:50]}...")
+            logger.info("⚡ Hybrid processing started for: %.50s...", transcript)
             
             # Check if this is a follow-up response to danger question
-            if is_followup and call_sid in self.active_conversations:
-                conversation = self.active_conversations[call_sid]
-                
+            conversation = self.conversation_store.get(call_sid) if is_followup and call_sid else None
+            if conversation is not None:
                 # Check for YES/NO response to danger question
                 transcript_lower = transcript.lower()
                 if 'yes' in transcript_lower or 'true' in transcript_lower or 'correct' in transcript_lower:
                     # Escalate severity
                     conversation['priority'] = 1
-                    conversation['severity'] = 'CRITICAL'
+                    conversation['priority_level'] = 'CRITICAL'
                     conversation['what_to_say'] = conversation['escalated_response']
                     conversation['status'] = 'ESCALATED'
                     
-                    logger.info(f"🔥 Severity escalated to CRITICAL for {call_sid}")
+                    logger.info("🔥 Severity escalated to CRITICAL for %s", call_sid)
                     
                 elif 'no' in transcript_lower or 'false' in transcript_lower or 'fine' in transcript_lower:
                     # Keep current severity, end conversation
                     conversation['what_to_say'] = 'Understood. Help is on the way. We will end the call now. Stay safe.'
                     conversation['status'] = 'COMPLETED'
                     
-                    logger.info(f"✅ Conversation completed for {call_sid}")
+                    logger.info("✅ Conversation completed for %s", call_sid)
                     
                 else:
                     # Unclear response, ask again
                     conversation['what_to_say'] = conversation['danger_question']
                     
-                    logger.info(f"❓ Unclear response, asking again for {call_sid}")
+                    logger.info("❓ Unclear response, asking again for %s", call_sid)
                 
                 # Update conversation state
-                self.active_conversations[call_sid] = conversation
-                
-                # Store and broadcast update
-                self._store_conversation_async(conversation, transcript)
+                self.conversation_store.set(call_sid, conversation)
                 
                 processing_time = (time.time() - start_time) * 1000
                 conversation['processing_time_ms'] = processing_time
                 
+                # Store and broadcast update
+                self._store_conversation_async(conversation, transcript, call_sid, from_number, to_number)
+                self.latency.labels(stage="followup").record(processing_time)
+                
                 return conversation
             
             # Initial call processing
             # Step 1: Instant rule-based classification
-            classification = self._classify_instant(transcript)
+            with tracer.span("hybrid.classify"):
+                classification = self._classify_instant(transcript)
             
-            # Step 2: Get safety responses
-            safety = self.safety_responses.get(classification['category'], self.safety_responses['Other'])
-            
-            # Step 3: Build complete response with proper timestamps
+            # Step 2: Copy the precomputed response and splice in this call's timings
+            bundle = self.bundles[(classification['category'], classification['severity'])]
             processing_time = (time.time() - start_time) * 1000
             current_time = time.time()
+            self.latency.labels(stage="initial").record(processing_time)
             
-            # Map category for frontend compatibility
-            frontend_category = self._map_to_frontend_category(classification['category'])
-            
-            result = {
-                # Classification results
-                'category': frontend_category,
-                'priority': classification['priority'],
-                'reasoning_byte': classification['reasoning'],
-                'processing_time_ms': processing_time,
-                'confidence': 0.95,  # High confidence for rule-based
-                
-                # Safety responses
-                'what_to_say': safety['what_to_say'],
-                'immediate_actions': safety['immediate_actions'],
-                'safety_precautions': safety['safety_precautions'],
-                'priority_level': classification['severity'],
-                'response_type': 'hybrid_conversation',
-                
-                # Dispatch information
-                'dispatched_service': safety['dispatched_service'],
-                'assigned_service': classification['service'].value,
-                
-                # Conversation state
-                'danger_question': safety['danger_question'],
-                'escalated_response': safety['escalated_response'],
-                'status': 'AWAITING_FOLLOWUP',
-                
-                # Proper timestamps
-                'timestamp': current_time,
-                'created_at': current_time,
-                'call_time': current_time,
-                
-                # Metadata
-                'classification_method': 'rule_based',
-                'safety_method': 'predefined',
-                
-                # Post-accident specific actions (if available)
-                'post_accident_actions': safety.get('post_accident_actions', []),
-                'post_accident_precautions': safety.get('post_accident_precautions', [])
-            }
+            result = dict(bundle.result)
+            result['processing_time_ms'] = processing_time
+            result['timestamp'] = result['created_at'] = result['call_time'] = current_time
             
             # Store conversation state for follow-up
             call_sid = call_sid or f"hybrid_{time.time()}"
-            self.active_conversations[call_sid] = result
+            with tracer.span("conversation_store.set"):
+                self.conversation_store.set(call_sid, result)
+                self._purge_expired_conversations()
             
             # Store in database
-            self._store_conversation_async(result, transcript)
+            self._store_conversation_async(result, transcript, call_sid, from_number, to_number)
             
-            logger.info(f"⚡ Hybrid processing completed in {processing_time:.2f}ms")
-            logger.info(f"   Category: {result['category']} (P{result['priority']})")
-            logger.info(f"   Safety: {len(result['immediate_actions'])} actions, {len(result['safety_precautions'])} precautions")
+            logger.info("⚡ Hybrid processing completed in %.2fms", processing_time)
+            logger.info("   Category: %s (P%s)", result['category'], result['priority'])
+            logger.info("   Safety: %s actions, %s precautions", len(result['immediate_actions']), len(result['safety_precautions']))
             
             return result
             
@@ -332,6 +514,21 @@ class HybridTriageService:
             logger.error(f"❌ Hybrid processing failed: {e}")
             return self._get_error_result(start_time)
     
+    def _purge_expired_conversations(self):
+        """Drop abandoned conversations, at most once a minute"""
+        now = time.time()
+        if now - self._last_conversation_purge < 60:
+            return
+        self._last_conversation_purge = now
+        
+        try:
+            purged = self.conversation_store.purge_expired(settings.CONVERSATION_TTL_SECONDS)
+            if purged:
+                logger.info("🧹 Purged %s expired conversations", purged)
+            self.conversation_store_size.set(len(self.conversation_store))
+        except Exception as e:
+            logger.warning("⚠️ Conversation purge failed: %s", e)
+    
     def _classify_instant(self, transcript: str) -> Dict:
         """Instant rule-based classification"""
         transcript_lower = transcript.lower()
@@ -365,81 +562,67 @@ class HybridTriageService:
             'reasoning': reasoning
         }
     
-    def _store_conversation_async(self, result: Dict, transcript: str):
-        """Store conversation result in database asynchronously"""
+    def _store_conversation_async(self, result: Dict, transcript: str, call_sid: str, from_number: str = '', to_number: str = ''):
+        """Schedule storing this turn's call record; the database work runs on the storage thread, not the event loop"""
+        task = asyncio.get_running_loop().create_task(
+            self._store_conversation(dict(result), transcript, call_sid, from_number, to_number)  # Later turns mutate result
+        )
+        self._storage_tasks.add(task)
+        task.add_done_callback(self._storage_tasks.discard)
+    
+    async def _store_conversation(self, result: Dict, transcript: str, call_sid: str, from_number: str, to_number: str):
+        """Store the conversation's call record and announce it over WebSocket"""
+        loop = asyncio.get_running_loop()
         try:
-            from datetime import datetime
-            import json
-            
-            call_record_data = {
-                'call_sid': f"hybrid_{time.time()}",
-                'from_number': '',
-                'to_number': '',
-                'transcript': transcript,
-                'emergency_type': classification['category'].value,  # Use enum value for database
-                'severity_level': self._map_severity_to_level(classification['priority']),  # Proper LEVEL_X format
-                'severity_score': max(0, min(100, (6 - classification['priority']) * 20)),  # Convert priority to score
-                'assigned_service': result['assigned_service'],
-                'priority': result['priority'],
-                'summary': result['reasoning_byte'],
-                'confidence': result['confidence'],
-                'status': result['status'],  # Use conversation status
-                'processing_time_ms': result['processing_time_ms'],
-                'call_metadata': json.dumps({
-                    'dispatched_service': result['dispatched_service'],
-                    'priority_level': result['priority_level'],
-                    'response_type': result['response_type'],
-                    'classification_method': result['classification_method'],
-                    'safety_method': result['safety_method'],
-                    'timestamp': result['timestamp'],
-                    'call_time': result['call_time'],
-                    'immediate_actions': result['immediate_actions'],
-                    'safety_precautions': result['safety_precautions'],
-                    'what_to_say': result['what_to_say'],
-                    'danger_question': result.get('danger_question', ''),
-                    'escalated_response': result.get('escalated_response', ''),
-                    'conversation_status': result['status'],
-                    'frontend_category': frontend_category  # Store frontend category for API responses
-                })
-            }
-            
-            database_service.create_call_record(call_record_data)
-            
-            # Send to frontend via WebSocket
-            try:
-                from services.websocket_service import websocket_service
-                asyncio.create_task(websocket_service.broadcast_call_update({
-                    'type': 'emergency_conversation',
-                    'data': {
-                        'call_sid': call_record_data['call_sid'],
-                        'category': frontend_category,  # Use frontend category
-                        'emergency_type': classification['category'].value,  # Keep DB enum
-                        'priority': result['priority'],
-                        'severity': result['priority_level'],
-                        'dispatched_service': result['dispatched_service'],
-                        'assigned_service': result['assigned_service'],
-                        'transcript': transcript,
-                        'what_to_say': result['what_to_say'],
-                        'immediate_actions': result['immediate_actions'],
-                        'safety_precautions': result['safety_precautions'],
-                        'timestamp': result['timestamp'],
-                        'created_at': result['created_at'],
-                        'processing_time_ms': result['processing_time_ms'],
-                        'confidence': result['confidence'],
-                        'status': result['status'],
-                        'danger_question': result.get('danger_question', ''),
-                        'escalated_response': result.get('escalated_response', ''),
-                        'conversation_status': result['status']
-                    }
-                }))
-                logger.debug("📡 Conversation data sent to frontend via WebSocket")
-            except Exception as ws_error:
-                logger.warning(f"⚠️ WebSocket broadcast failed: {ws_error}")
-            
-            logger.debug(f"🗄️ Conversation result stored and sent to frontend")
-            
+            created, call_record = await loop.run_in_executor(
+                self._storage_executor, self._write_call_record, result, transcript, call_sid, from_number, to_number
+            )
         except Exception as e:
             logger.error(f"❌ Storage error: {e}")
+            return
+        
+        # Send to frontend via WebSocket
+        try:
+            from services.websocket_service import websocket_service
+            if created:
+                await websocket_service.broadcast_new_call(call_record)
+            elif call_record is not None:
+                await websocket_service.broadcast_call_update(call_record)
+            logger.debug("📡 Conversation %s sent to frontend via WebSocket", call_sid)
+        except Exception as ws_error:
+            logger.warning("⚠️ WebSocket broadcast failed: %s", ws_error)
+    
+    def _write_call_record(self, result: Dict, transcript: str, call_sid: str, from_number: str, to_number: str) -> Tuple[bool, Optional[CallRecord]]:
+        """
+        Create the call record on the first turn, update its status after (runs on the storage thread)
+        
+        Returns:
+            (created, call record)
+        """
+        existing = database_service.get_call_by_sid(call_sid)
+        if existing is not None:
+            return False, database_service.update_call_status(existing.id, normalize_call_status(result['status']))
+        return True, database_service.create_call_record({
+            'call_sid': call_sid,
+            'from_number': from_number,
+            'to_number': to_number,
+            'transcript': transcript,
+            'emergency_type': result.get('emergency_type', 'OTHER'),  # Use enum value for database
+            'severity_level': self._map_severity_to_level(result['priority']),  # Proper LEVEL_X format
+            'severity_score': max(0, min(100, (6 - result['priority']) * 20)),  # Convert priority to score
+            'assigned_service': result['assigned_service'],
+            'priority': result['priority'],
+            'summary': result['reasoning_byte'],
+            'confidence': result['confidence'],
+            'status': result['status'],  # Use conversation status
+            'processing_time_ms': result['processing_time_ms'],
+            'metadata': self._metadata_json(result)
+        })
+    
+    async def flush_storage(self):
+        """Wait for every scheduled call-record write (e.g. before shutdown)"""
+        while self._storage_tasks:
+            await asyncio.gather(*list(self._storage_tasks), return_exceptions=True)
     
     def _get_error_result(self, start_time: float) -> Dict:
         """Get error result"""
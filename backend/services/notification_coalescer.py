@@ -0,0 +1,234 @@
+"""
+Notification Coalescer
+Collapses alert storms into digests. Notifications for the same recipient,
+template and key fields (e.g. the same emergency call) arriving within a
+window go out once: the first is sent immediately, later non-urgent ones
+are held back and summarised in one digest when the window closes, so a
+burst of N alerts costs two sends per channel instead of N.
+
+Urgent notifications are never delayed: they are sent at once even inside
+an open window. Only an exact repeat (an urgent alert whose data matches
+one already sent in the same window) is dropped as a duplicate; keys are
+coarse for some templates, so a different urgent alert under the same key
+still goes out.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Deque, Dict, List, Optional, Set, Tuple
+from backend.app.models.notifications import NotificationChannel, NotificationPriority, NotificationType
+from backend.services.notification_dispatcher import PRIORITY_RANK
+from backend.utils.metrics_registry import metrics
+
+logger = logging.getLogger(__name__)
+
+# Template -> data fields that make two notifications "the same alert"
+# (templates not listed here key on all of their data)
+DIGEST_KEY_FIELDS: Dict[str, Tuple[str, ...]] = {
+    "emergency_assigned": ("emergency_call_id",),
+    "call_completed": ("call_sid",),
+    "team_member_offline": ("member_name",),
+    "high_call_volume": (),
+    "performance_alert": (),
+}
+
+coalesced = metrics.counter(
+    "notification_coalesced_total",
+    "Notifications offered to the coalescer by outcome (sent, suppressed, deduplicated, digest)",
+    ("outcome",)
+)
+
+
+def _data_values(data: Dict[str, Any]) -> Tuple:
+    return tuple(sorted((name, str(value)) for name, value in data.items()))
+
+
+@dataclass
+class Digest:
+    """Summary of the notifications held back during one window"""
+    recipient_id: str
+    template_key: str
+    data: Dict[str, Any]
+    priority: NotificationPriority
+    channels: List[NotificationChannel]
+    notification_type: NotificationType
+    count: int
+    first_at: datetime
+    last_at: datetime
+
+
+@dataclass
+class _Window:
+    key: Tuple
+    deadline: float
+    urgent_sent: Set[Tuple] = field(default_factory=set)  # Data of the urgent alerts sent in this window
+    suppressed: int = 0
+    latest: Optional[Dict[str, Any]] = None
+    priority: NotificationPriority = NotificationPriority.LOW
+    channels: List[NotificationChannel] = field(default_factory=list)
+    notification_type: NotificationType = NotificationType.SYSTEM_ALERT
+    first_at: Optional[datetime] = None
+    last_at: Optional[datetime] = None
+
+
+class NotificationCoalescer:
+    """
+    Per-key digest windows in front of the dispatcher
+
+    Args:
+        window_seconds: How long a key stays open after its first notification
+        on_digest: Called with a Digest for every window that held
+            notifications back (outside the coalescer's lock)
+        clock: Monotonic time source (injectable for benchmarks)
+    """
+
+    def __init__(self, window_seconds: float, on_digest: Callable[[Digest], Any], clock: Callable[[], float] = time.monotonic):
+        self.window_seconds = window_seconds
+        self.on_digest = on_digest
+        self.clock = clock
+        self._windows: Dict[Tuple, _Window] = {}
+        self._deadlines: Deque[_Window] = deque()  # Windows in deadline order (fixed length, so FIFO)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def digest_key(recipient_id: str, template_key: str, data: Dict[str, Any]) -> Tuple:
+        fields = DIGEST_KEY_FIELDS.get(template_key)
+        if fields is None:
+            values = _data_values(data)
+        else:
+            values = tuple(str(data.get(name)) for name in fields)
+        return (recipient_id, template_key, values)
+
+    def offer(
+        self,
+        recipient_id: str,
+        template_key: str,
+        data: Dict[str, Any],
+        priority: NotificationPriority,
+        channels: List[NotificationChannel],
+        notification_type: NotificationType
+    ) -> bool:
+        """
+        Decide whether a notification goes out now
+
+        Returns:
+            True to send it now, False when it was folded into the open
+            window (a digest follows when the window closes) or dropped as
+            a repeat of an urgent alert with the same data
+        """
+        key = self.digest_key(recipient_id, template_key, data)
+        urgent = priority == NotificationPriority.URGENT
+        now = self.clock()
+        with self._lock:
+            expired = self._pop_expired(now)
+            window = self._windows.get(key)
+            opened = window is None
+            alert = _data_values(data) if urgent else None
+            if opened:
+                window = _Window(key, now + self.window_seconds)
+                if urgent:
+                    window.urgent_sent.add(alert)
+                self._windows[key] = window
+                self._deadlines.append(window)
+                outcome = "sent"
+            elif urgent and alert not in window.urgent_sent:
+                window.urgent_sent.add(alert)
+                outcome = "sent"
+            elif urgent:
+                outcome = "deduplicated"
+            else:
+                self._absorb(window, data, priority, channels, notification_type)
+                outcome = "suppressed"
+        self._emit(expired)
+        coalesced.inc(outcome=outcome)
+        if opened:
+            self._schedule_close(window)
+        return outcome == "sent"
+
+    def _absorb(self, window: _Window, data, priority, channels, notification_type):
+        stamp = datetime.utcnow()
+        if window.suppressed == 0:
+            window.first_at = stamp
+        window.suppressed += 1
+        window.last_at = stamp
+        window.latest = data
+        window.notification_type = notification_type
+        if PRIORITY_RANK[priority] < PRIORITY_RANK[window.priority]:
+            window.priority = priority
+        for channel in channels:
+            if channel not in window.channels:
+                window.channels.append(channel)
+
+    def _schedule_close(self, window: _Window):
+        """Close the window on time when an event loop is running, else lazily on the next offer/flush"""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        loop.call_later(self.window_seconds, self._close, window)
+
+    def _close(self, window: _Window):
+        with self._lock:
+            if self._windows.get(window.key) is not window:
+                return  # Already expired lazily (and maybe reopened)
+            del self._windows[window.key]
+            # The deque entry is skipped by the identity check in _pop_expired
+        self._emit([window])
+
+    def _pop_expired(self, now: float) -> List[_Window]:
+        expired = []
+        while self._deadlines and self._deadlines[0].deadline <= now:
+            window = self._deadlines.popleft()
+            if self._windows.get(window.key) is window:
+                del self._windows[window.key]
+                expired.append(window)
+        return expired
+
+    def flush(self, force: bool = False) -> int:
+        """
+        Close due windows (every open window with force, e.g. at shutdown)
+
+        Returns:
+            Number of digests emitted
+        """
+        with self._lock:
+            if force:
+                expired = list(self._windows.values())
+                self._windows.clear()
+                self._deadlines.clear()
+            else:
+                expired = self._pop_expired(self.clock())
+        return self._emit(expired)
+
+    def _emit(self, windows: List[_Window]) -> int:
+        emitted = 0
+        for window in windows:
+            if not window.suppressed:
+                continue
+            recipient_id, template_key, _ = window.key
+            digest = Digest(
+                recipient_id=recipient_id,
+                template_key=template_key,
+                data=window.latest,
+                priority=window.priority,
+                channels=window.channels,
+                notification_type=window.notification_type,
+                count=window.suppressed,
+                first_at=window.first_at,
+                last_at=window.last_at
+            )
+            coalesced.inc(outcome="digest")
+            emitted += 1
+            try:
+                self.on_digest(digest)
+            except Exception as e:
+                logger.error(f"❌ Error sending digest for {recipient_id}/{template_key}: {e}")
+        return emitted
+
+    def __len__(self) -> int:
+        return len(self._windows)
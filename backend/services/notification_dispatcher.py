@@ -0,0 +1,371 @@
+"""
+Notification Dispatcher
+Asynchronous delivery of notifications: one priority queue and worker pool
+per channel, token-bucket rate limits, and retries with exponential backoff
+and jitter. Urgent notifications are taken before lower priorities on every
+channel. Blocking transports (smtplib, Twilio, requests) run in worker
+threads and keep their connections open between messages (SmtpPool for
+email, a shared client or HTTP session for the others).
+
+A sender returning False is a permanent failure (no address, no webhook
+configured) and is not retried; an exception is treated as transient.
+"""
+
+import asyncio
+import itertools
+import logging
+import random
+import smtplib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+from backend.app.models.notifications import Notification, NotificationChannel, NotificationPriority
+from backend.utils.metrics_registry import metrics
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_RANK = {
+    NotificationPriority.URGENT: 0,
+    NotificationPriority.HIGH: 1,
+    NotificationPriority.MEDIUM: 2,
+    NotificationPriority.LOW: 3,
+}
+
+# Channel -> (concurrent workers, sends per second)
+DEFAULT_CHANNEL_LIMITS = {
+    NotificationChannel.EMAIL: (4, 10.0),
+    NotificationChannel.SMS: (4, 5.0),
+    NotificationChannel.WEBHOOK: (8, 50.0),
+    NotificationChannel.IN_APP: (1, 1000.0),
+}
+
+dispatch_queue_depth = metrics.gauge("notification_dispatch_queue_depth", "Channel deliveries queued or waiting to retry")
+dispatch_retries = metrics.counter("notification_dispatch_retries_total", "Channel deliveries rescheduled after an error", ("channel",))
+
+
+class SmtpPool:
+    """
+    Thread-safe pool of connected (and logged in) SMTP sessions
+
+    A session is checked out for one message and returned afterwards, so
+    concurrent email workers never share a connection. A pooled session the
+    server has since dropped is replaced by a fresh one transparently.
+    """
+
+    def __init__(self, host: str, port: int, username: str = "", password: str = "", starttls: bool = True, max_idle: int = 4, timeout: float = 10.0):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.max_idle = max_idle
+        self.timeout = timeout
+        self.connections_opened = 0
+        self._idle: List[smtplib.SMTP] = []
+        self._lock = threading.Lock()
+
+    def _connect(self) -> smtplib.SMTP:
+        server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            if self.starttls:
+                server.starttls()
+            if self.username:
+                server.login(self.username, self.password)
+        except Exception:
+            server.close()
+            raise
+        with self._lock:
+            self.connections_opened += 1
+        return server
+
+    def _checkout(self) -> Optional[smtplib.SMTP]:
+        with self._lock:
+            return self._idle.pop() if self._idle else None
+
+    def _release(self, server: smtplib.SMTP):
+        with self._lock:
+            if len(self._idle) < self.max_idle:
+                self._idle.append(server)
+                return
+        self._quit(server)
+
+    @staticmethod
+    def _quit(server: smtplib.SMTP):
+        try:
+            server.quit()
+        except (smtplib.SMTPException, OSError):
+            server.close()
+
+    def send(self, from_addr: str, to_addrs, message: str):
+        """
+        Send one message on a pooled session
+
+        Raises:
+            smtplib.SMTPException, OSError: The message could not be handed to the server
+        """
+        server = self._checkout()
+        if server is not None:
+            try:
+                server.sendmail(from_addr, to_addrs, message)
+                self._release(server)
+                return
+            except (smtplib.SMTPServerDisconnected, ConnectionError):
+                server.close()  # Dropped while idle, retry once on a new session
+            except smtplib.SMTPResponseException:
+                self._release(server)  # Refused by the server, the session itself is still usable
+                raise
+            except Exception:
+                server.close()
+                raise
+        server = self._connect()
+        try:
+            server.sendmail(from_addr, to_addrs, message)
+        except smtplib.SMTPResponseException:
+            self._release(server)
+            raise
+        except Exception:
+            server.close()
+            raise
+        self._release(server)
+
+    def close(self):
+        """Quit every idle session"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for server in idle:
+            self._quit(server)
+
+
+class TokenBucket:
+    """Async rate limiter allowing `rate` acquisitions per second with bursts of `burst`"""
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        self.rate = rate
+        self.capacity = burst or max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    async def acquire(self):
+        while True:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+@dataclass
+class _Delivery:
+    """Outstanding channels of one notification"""
+    notification: Notification
+    remaining: int
+    future: asyncio.Future
+    failed: List[str] = field(default_factory=list)
+    on_channel: Optional[Callable[[NotificationChannel, bool], None]] = None
+
+
+@dataclass(order=True)
+class _Job:
+    rank: int
+    seq: int
+    delivery: _Delivery = field(compare=False)
+    channel: NotificationChannel = field(compare=False)
+    attempt: int = field(default=1, compare=False)
+
+
+class NotificationDispatcher:
+    """
+    Per-channel priority queues and worker pools
+
+    Args:
+        senders: Channel -> blocking send(notification) -> bool
+        limits: Channel -> (workers, sends per second)
+        max_attempts: Attempts per channel before the delivery fails
+        backoff_base: Delay before the first retry, doubled for each further one
+        backoff_max: Upper bound on a retry delay
+    """
+
+    def __init__(
+        self,
+        senders: Dict[NotificationChannel, Callable[[Notification], bool]],
+        limits: Optional[Dict[NotificationChannel, tuple]] = None,
+        max_attempts: int = 4,
+        backoff_base: float = 1.0,
+        backoff_max: float = 60.0
+    ):
+        self.senders = senders
+        self.limits = {**DEFAULT_CHANNEL_LIMITS, **(limits or {})}
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queues: Dict[NotificationChannel, asyncio.PriorityQueue] = {}
+        self._buckets: Dict[NotificationChannel, TokenBucket] = {}
+        self._workers: List[asyncio.Task] = []
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._retry_handles: Dict[asyncio.TimerHandle, _Job] = {}
+        self._seq = itertools.count()
+        self.deliveries = metrics.counter(
+            "notification_deliveries_total",
+            "Notification delivery attempts by channel and outcome",
+            ("channel", "outcome")
+        )
+
+    @property
+    def running(self) -> bool:
+        return bool(self._workers)
+
+    def start(self):
+        """Start the worker pools on the running event loop"""
+        if self.running:
+            return
+        self.loop = asyncio.get_running_loop()
+        # One thread per blocking worker, so a slow channel cannot starve the loop's default executor
+        threads = sum(self.limits[channel][0] for channel in self.senders if channel != NotificationChannel.IN_APP)
+        self._executor = ThreadPoolExecutor(max_workers=max(1, threads), thread_name_prefix="notify")
+        for channel in self.senders:
+            workers, rate = self.limits[channel]
+            self._queues[channel] = asyncio.PriorityQueue()
+            self._buckets[channel] = TokenBucket(rate)
+            for _ in range(workers):
+                self._workers.append(self.loop.create_task(self._work(channel)))
+        logger.info(f"📨 Notification dispatcher started ({len(self._workers)} workers)")
+
+    async def stop(self, drain: bool = True):
+        """
+        Stop the workers, after finishing queued deliveries when `drain` is set
+
+        Channels still waiting out a retry backoff (and, without `drain`,
+        channels still queued or mid-send) count as failed, so every
+        submitted future resolves and its notification is marked failed.
+        """
+        if not self.running:
+            return
+        if drain:
+            for queue in self._queues.values():
+                await queue.join()
+        abandoned = []
+        for handle, job in self._retry_handles.items():
+            handle.cancel()
+            dispatch_queue_depth.dec()
+            abandoned.append(job)
+        self._retry_handles.clear()
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers.clear()
+        for queue in self._queues.values():
+            while not queue.empty():
+                dispatch_queue_depth.dec()
+                abandoned.append(queue.get_nowait())
+        for job in abandoned:
+            logger.warning(f"⚠️ Dispatcher stopped before {job.channel.value} delivery of {job.delivery.notification.id} was sent")
+            self._finish(job, False)
+        self._executor.shutdown(wait=False)
+        self._executor = None
+        logger.info("📨 Notification dispatcher stopped")
+
+    def submit(
+        self,
+        notification: Notification,
+        channels: Optional[List[NotificationChannel]] = None,
+        on_channel: Optional[Callable[[NotificationChannel, bool], None]] = None
+    ) -> asyncio.Future:
+        """
+        Queue channels of a notification (call from the event loop)
+
+        Args:
+            notification: Notification to send
+            channels: Subset of its channels to send (default all)
+            on_channel: Called with (channel, sent) as each channel finishes
+
+        Returns:
+            Future resolving to True once all channels succeeded, False if any failed
+        """
+        self.start()
+        channels = [channel for channel in (channels or notification.channels) if channel in self.senders]
+        future = self.loop.create_future()
+        if not channels:
+            notification.mark_sent()
+            future.set_result(True)
+            return future
+        delivery = _Delivery(notification, len(channels), future, on_channel=on_channel)
+        rank = PRIORITY_RANK.get(notification.priority, len(PRIORITY_RANK))
+        for channel in channels:
+            self._enqueue(_Job(rank, next(self._seq), delivery, channel))
+        return future
+
+    def _enqueue(self, job: _Job):
+        dispatch_queue_depth.inc()
+        self._queues[job.channel].put_nowait(job)
+
+    def _backoff(self, attempt: int) -> float:
+        delay = min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1))
+        return delay * random.uniform(0.5, 1.0)  # Jitter spreads out retries after a shared outage
+
+    async def _work(self, channel: NotificationChannel):
+        queue = self._queues[channel]
+        bucket = self._buckets[channel]
+        send = self.senders[channel]
+        while True:
+            job = await queue.get()
+            dispatch_queue_depth.dec()
+            try:
+                await bucket.acquire()
+                if channel == NotificationChannel.IN_APP:
+                    sent = send(job.delivery.notification)
+                else:
+                    sent = await self.loop.run_in_executor(self._executor, send, job.delivery.notification)
+                self.deliveries.inc(channel=channel.value, outcome="sent" if sent else "failed")
+                self._finish(job, sent)
+            except asyncio.CancelledError:
+                # stop() without drain: the send's outcome is unknown, report it as failed
+                self._finish(job, False)
+                raise
+            except Exception as e:
+                self.deliveries.inc(channel=channel.value, outcome="error")
+                if job.attempt < self.max_attempts:
+                    delay = self._backoff(job.attempt)
+                    logger.warning(
+                        "⚠️ %s delivery of %s failed (attempt %d), retrying in %.1fs: %s",
+                        channel.value, job.delivery.notification.id, job.attempt, delay, e
+                    )
+                    dispatch_retries.inc(channel=channel.value)
+                    self._schedule_retry(job, delay)
+                else:
+                    logger.error(f"Failed to send notification via {channel.value} after {job.attempt} attempts: {e}")
+                    self._finish(job, False)
+            finally:
+                queue.task_done()
+
+    def _schedule_retry(self, job: _Job, delay: float):
+        retry = _Job(job.rank, next(self._seq), job.delivery, job.channel, job.attempt + 1)
+        dispatch_queue_depth.inc()
+
+        def requeue():
+            self._retry_handles.pop(handle, None)
+            dispatch_queue_depth.dec()
+            self._enqueue(retry)
+
+        handle = self.loop.call_later(delay, requeue)
+        self._retry_handles[handle] = retry
+
+    def _finish(self, job: _Job, sent: bool):
+        delivery = job.delivery
+        if not sent:
+            delivery.failed.append(job.channel.value)
+        if delivery.on_channel is not None:
+            delivery.on_channel(job.channel, sent)
+        delivery.remaining -= 1
+        if delivery.remaining:
+            return
+        if delivery.failed:
+            delivery.notification.mark_failed(f"Failed to send via {', '.join(delivery.failed)}")
+        else:
+            delivery.notification.mark_sent()
+        if not delivery.future.done():
+            delivery.future.set_result(not delivery.failed)
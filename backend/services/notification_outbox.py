@@ -0,0 +1,396 @@
+"""
+Notification Outbox
+Durable queue of notifications to send, so pending and failed deliveries
+(an URGENT emergency SMS above all) survive restarts and can be picked up
+by any worker process.
+
+NotificationOutbox is a SQLite table (WAL mode, like the conversation
+store). Workers claim batches under a lease taken inside BEGIN IMMEDIATE,
+SQLite's equivalent of SELECT ... FOR UPDATE SKIP LOCKED: a claimed row is
+invisible to other workers until it is completed, failed, or its lease
+expires because the worker died. Delivery is therefore at-least-once, and
+inserts are idempotent (keyed by notification id).
+
+OutboxRelay feeds claimed rows to the NotificationDispatcher. New
+notifications take a fast path: they are written already leased to this
+process and sent right away, so the relay's polling loop only handles
+scheduled retries and rows left behind by a crashed or restarted worker.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Dict, Iterable, List, Optional, Sequence
+from backend.app.models.notifications import Notification, NotificationChannel, NotificationManager
+from backend.services.notification_dispatcher import PRIORITY_RANK, NotificationDispatcher
+from backend.utils.metrics_registry import metrics
+
+logger = logging.getLogger(__name__)
+
+# Row states; pending and failed rows are claimable once due and not leased
+PENDING, SENT, FAILED, DEAD = "pending", "sent", "failed", "dead"
+
+outbox_claimed = metrics.counter("notification_outbox_claimed_total", "Outbox rows claimed by a relay (including fast-path sends)")
+outbox_redelivered = metrics.counter("notification_outbox_redelivered_total", "Outbox rows claimed again after a failure or an expired lease")
+
+
+class NotificationOutbox:
+    """
+    SQLite-backed notification outbox shared by every worker on the host
+
+    Args:
+        path: Database file
+        lease_seconds: How long a claim stays exclusive; must cover a full
+            dispatch including its in-process retries
+    """
+
+    def __init__(self, path: str, lease_seconds: float = 120.0):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=5.0, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS notification_outbox ("
+            " id TEXT PRIMARY KEY,"
+            " payload TEXT NOT NULL,"
+            " channels TEXT NOT NULL,"
+            " priority_rank INTEGER NOT NULL,"
+            " status TEXT NOT NULL,"
+            " attempts INTEGER NOT NULL DEFAULT 0,"
+            " available_at REAL NOT NULL,"
+            " lease_owner TEXT,"
+            " lease_expires REAL,"
+            " last_error TEXT,"
+            " created_at REAL NOT NULL,"
+            " updated_at REAL NOT NULL)"
+        )
+        # Claim order; partial so sent rows never bloat it
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS ix_notification_outbox_due ON notification_outbox"
+            " (priority_rank, available_at) WHERE status IN ('pending', 'failed')"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS ix_notification_outbox_updated ON notification_outbox (status, updated_at)"
+        )
+
+    def enqueue(self, notifications: Sequence[Notification], owner: Optional[str] = None) -> List[str]:
+        """
+        Store notifications, in one transaction; ids already present are left alone
+
+        Args:
+            notifications: Notifications to send
+            owner: Lease the new rows to this relay (it sends them itself)
+
+        Returns:
+            Ids of the rows inserted (and, with an owner, now leased to it)
+        """
+        now = time.time()
+        lease_expires = now + self.lease_seconds if owner else None
+        inserted = []
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                for notification in notifications:
+                    cursor = self._conn.execute(
+                        "INSERT OR IGNORE INTO notification_outbox"
+                        " (id, payload, channels, priority_rank, status, attempts, available_at,"
+                        "  lease_owner, lease_expires, created_at, updated_at)"
+                        " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        (
+                            notification.id,
+                            json.dumps(notification.to_dict(), default=str),
+                            json.dumps([channel.value for channel in notification.channels]),
+                            PRIORITY_RANK.get(notification.priority, len(PRIORITY_RANK)),
+                            PENDING, 1 if owner else 0, now, owner, lease_expires, now, now
+                        )
+                    )
+                    if cursor.rowcount:
+                        inserted.append(notification.id)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return inserted
+
+    def claim(self, owner: str, limit: int = 100) -> List[Dict]:
+        """
+        Lease up to `limit` due rows to `owner`, most urgent first
+
+        Returns:
+            Rows as dicts (id, payload, channels, attempts)
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")  # Takes the write lock: no other worker can claim the same rows
+            try:
+                rows = self._conn.execute(
+                    "SELECT id, payload, channels, attempts FROM notification_outbox"
+                    " WHERE status IN ('pending', 'failed') AND available_at <= ?"
+                    " AND (lease_expires IS NULL OR lease_expires < ?)"
+                    " ORDER BY priority_rank, available_at LIMIT ?",
+                    (now, now, limit)
+                ).fetchall()
+                self._conn.executemany(
+                    "UPDATE notification_outbox SET lease_owner = ?, lease_expires = ?, attempts = attempts + 1,"
+                    " updated_at = ? WHERE id = ?",
+                    [(owner, now + self.lease_seconds, now, row[0]) for row in rows]
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return [
+            {"id": row[0], "payload": json.loads(row[1]), "channels": json.loads(row[2]), "attempts": row[3] + 1}
+            for row in rows
+        ]
+
+    def complete(self, ids: Iterable[str], owner: str) -> int:
+        """Mark rows leased to `owner` as sent, in one transaction"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                cursor = self._conn.executemany(
+                    "UPDATE notification_outbox SET status = 'sent', lease_owner = NULL, lease_expires = NULL,"
+                    " last_error = NULL, updated_at = ? WHERE id = ? AND lease_owner = ?",
+                    [(now, notification_id, owner) for notification_id in ids]
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return cursor.rowcount
+
+    def fail(self, notification_id: str, owner: str, channels: Sequence[str], error: str, retry_at: Optional[float]) -> bool:
+        """
+        Record a failed delivery of a row leased to `owner`
+
+        Args:
+            channels: Channels still to send (those that succeeded are not resent)
+            retry_at: Epoch time of the next attempt, None to give up (dead)
+        """
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE notification_outbox SET status = ?, channels = ?, last_error = ?, available_at = ?,"
+                " lease_owner = NULL, lease_expires = NULL, updated_at = ? WHERE id = ? AND lease_owner = ?",
+                (
+                    FAILED if retry_at is not None else DEAD, json.dumps(list(channels)), error,
+                    retry_at if retry_at is not None else time.time(), time.time(), notification_id, owner
+                )
+            )
+        return cursor.rowcount > 0
+
+    def requeue(self, statuses: Sequence[str] = (PENDING, FAILED)) -> int:
+        """Make every unleased row in `statuses` due now (dead rows get a fresh start)"""
+        now = time.time()
+        placeholders = ", ".join("?" for _ in statuses)
+        with self._lock:
+            cursor = self._conn.execute(
+                f"UPDATE notification_outbox SET available_at = ?, updated_at = ?,"
+                f" status = CASE status WHEN 'dead' THEN 'failed' ELSE status END, attempts = CASE status WHEN 'dead' THEN 0 ELSE attempts END"
+                f" WHERE status IN ({placeholders}) AND (lease_expires IS NULL OR lease_expires < ?)",
+                (now, now, *statuses, now)
+            )
+        return cursor.rowcount
+
+    def counts(self) -> Dict[str, int]:
+        """Rows per status"""
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM notification_outbox GROUP BY status").fetchall()
+        return dict(rows)
+
+    def purge(self, max_age_seconds: float) -> int:
+        """Delete sent and dead rows not updated within max_age_seconds"""
+        cutoff = time.time() - max_age_seconds
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM notification_outbox WHERE status IN ('sent', 'dead') AND updated_at < ?", (cutoff,)
+            )
+        return cursor.rowcount
+
+    def close(self):
+        """Close the underlying connection"""
+        with self._lock:
+            self._conn.close()
+
+
+class OutboxRelay:
+    """
+    Moves outbox rows through the dispatcher
+
+    Args:
+        outbox: Durable store
+        dispatcher: Sends the channels of each notification
+        manager: In-memory store; rows written by an earlier process are
+            loaded into it when claimed
+        batch_size: Rows claimed per round
+        poll_interval: Seconds between polls when nothing wakes the relay
+        max_attempts: Claims per row before it is marked dead
+        retry_base: Delay before the first outbox retry, doubled per attempt (max 1 hour)
+        retention_seconds: Sent and dead rows older than this are purged (hourly), None keeps them
+    """
+
+    PURGE_EVERY_SECONDS = 3600
+
+    def __init__(
+        self,
+        outbox: NotificationOutbox,
+        dispatcher: NotificationDispatcher,
+        manager: NotificationManager,
+        batch_size: int = 100,
+        poll_interval: float = 5.0,
+        max_attempts: int = 5,
+        retry_base: float = 30.0,
+        retention_seconds: Optional[float] = None
+    ):
+        self.outbox = outbox
+        self.dispatcher = dispatcher
+        self.manager = manager
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.retry_base = retry_base
+        self.retention_seconds = retention_seconds
+        self._next_purge = 0.0
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._inflight = set()
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    def start(self):
+        """Start polling on the running event loop"""
+        if self.running:
+            return
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.get_running_loop().create_task(self._poll())
+        logger.info(f"📮 Notification outbox relay {self.owner} started ({self.outbox.path})")
+
+    async def stop(self):
+        """Stop polling and wait for in-flight deliveries"""
+        if not self.running:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        if self._inflight:
+            await asyncio.gather(*self._inflight, return_exceptions=True)
+
+    def notify(self):
+        """Wake the relay to claim due rows now"""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def submit(self, notifications: Sequence[Notification]) -> List[asyncio.Future]:
+        """
+        Persist notifications leased to this relay, then send them (call from the event loop)
+
+        The outbox write (one short transaction) happens before this returns,
+        so the notifications survive a crash from then on.
+
+        Returns:
+            One future per notification, resolving to the delivery result
+        """
+        self.start()
+        loop = asyncio.get_running_loop()
+        leased = set(self.outbox.enqueue(notifications, owner=self.owner))
+        outbox_claimed.inc(len(leased))
+        futures = []
+        for notification in notifications:
+            if notification.id in leased:
+                futures.append(self._track(self._deliver(notification, notification.channels, attempts=1)))
+            else:
+                # Already in the outbox: it is sent (or being sent) from there
+                future = loop.create_future()
+                future.set_result(True)
+                futures.append(future)
+        return futures
+
+    def _track(self, coroutine) -> asyncio.Task:
+        task = asyncio.get_running_loop().create_task(coroutine)
+        self._inflight.add(task)
+        task.add_done_callback(self._inflight.discard)
+        return task
+
+    async def run_once(self) -> int:
+        """Claim and send one batch of due rows, returning how many were claimed"""
+        rows = await asyncio.to_thread(self.outbox.claim, self.owner, self.batch_size)
+        if not rows:
+            return 0
+        outbox_claimed.inc(len(rows))
+        deliveries = []
+        for row in rows:
+            if row["attempts"] > 1:
+                outbox_redelivered.inc()
+            notification = self.manager.get_notification(row["id"])
+            if notification is None:
+                notification = self.manager.add(Notification.from_dict(row["payload"]))
+            channels = [NotificationChannel(channel) for channel in row["channels"]]
+            deliveries.append(self._deliver(notification, channels, row["attempts"], batched=True))
+        results = await asyncio.gather(*deliveries)
+        sent = [row["id"] for row, ok in zip(rows, results) if ok]
+        if sent:
+            await asyncio.to_thread(self.outbox.complete, sent, self.owner)
+        return len(rows)
+
+    async def _deliver(self, notification: Notification, channels: List[NotificationChannel], attempts: int, batched: bool = False) -> bool:
+        """Send the given channels of a leased row and record the outcome"""
+        remaining = set(channel.value for channel in channels)
+
+        def on_channel(channel: NotificationChannel, sent: bool):
+            if sent:
+                remaining.discard(channel.value)
+
+        ok = await self.dispatcher.submit(notification, channels, on_channel=on_channel)
+        if ok:
+            if not batched:  # Batches complete their sent rows in one transaction
+                await asyncio.to_thread(self.outbox.complete, [notification.id], self.owner)
+            return True
+        retry_at = None
+        if attempts < self.max_attempts:
+            retry_at = time.time() + min(3600.0, self.retry_base * 2 ** (attempts - 1))
+        await asyncio.to_thread(
+            self.outbox.fail, notification.id, self.owner,
+            [channel.value for channel in channels if channel.value in remaining],
+            notification.error_message or "delivery failed", retry_at
+        )
+        if retry_at is None:
+            logger.error(f"❌ Notification {notification.id} dead after {attempts} outbox attempts")
+        return False
+
+    async def _poll(self):
+        while True:
+            try:
+                while await self.run_once() >= self.batch_size:
+                    pass  # A full batch: there may be more due right now
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Notification outbox relay error: {e}")
+            if self.retention_seconds is not None and time.monotonic() >= self._next_purge:
+                self._next_purge = time.monotonic() + self.PURGE_EVERY_SECONDS
+                try:
+                    purged = await asyncio.to_thread(self.outbox.purge, self.retention_seconds)
+                    if purged:
+                        logger.info(f"📮 Purged {purged} delivered or dead outbox rows")
+                except sqlite3.Error as e:
+                    logger.error(f"Notification outbox purge failed: {e}")
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
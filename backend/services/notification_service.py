@@ -1,26 +1,80 @@
 from typing import Dict, List, Any, Optional
 from datetime import datetime, timedelta
+import asyncio
 import logging
-import smtplib
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from backend.app.models.notifications import Notification, NotificationManager, NotificationType, NotificationPriority, NotificationChannel, NotificationStatus
 from backend.config import settings
+from backend.services.notification_coalescer import Digest, NotificationCoalescer
+from backend.services.notification_dispatcher import DEFAULT_CHANNEL_LIMITS, NotificationDispatcher, SmtpPool
+from backend.services.notification_outbox import FAILED, PENDING, NotificationOutbox, OutboxRelay
+from backend.utils.metrics_registry import metrics
 
 logger = logging.getLogger(__name__)
 
 
 class NotificationService:
     def __init__(self):
-        self.notification_manager = NotificationManager()
+        self.notification_manager = NotificationManager(retention_days=settings.NOTIFICATION_RETENTION_DAYS)
         self.email_config = self._get_email_config()
         self.sms_config = self._get_sms_config()
+        self.deliveries = metrics.counter(
+            "notification_deliveries_total",
+            "Notification delivery attempts by channel and outcome",
+            ("channel", "outcome")
+        )
+        self.smtp_pool = SmtpPool(
+            self.email_config["smtp_server"],
+            self.email_config["smtp_port"],
+            self.email_config["smtp_username"],
+            self.email_config["smtp_password"],
+            starttls=self.email_config["smtp_starttls"],
+            max_idle=DEFAULT_CHANNEL_LIMITS[NotificationChannel.EMAIL][0]
+        )
+        self._twilio_client = None
+        self._http_session = None
+        self._client_lock = threading.Lock()
+        self.dispatcher = NotificationDispatcher(
+            {
+                NotificationChannel.EMAIL: self._send_email_notification,
+                NotificationChannel.SMS: self._send_sms_notification,
+                NotificationChannel.IN_APP: self._send_in_app_notification,
+                NotificationChannel.WEBHOOK: self._send_webhook_notification,
+            },
+            limits={
+                NotificationChannel.EMAIL: (DEFAULT_CHANNEL_LIMITS[NotificationChannel.EMAIL][0], settings.NOTIFICATION_EMAIL_RATE),
+                NotificationChannel.SMS: (DEFAULT_CHANNEL_LIMITS[NotificationChannel.SMS][0], settings.NOTIFICATION_SMS_RATE),
+                NotificationChannel.WEBHOOK: (DEFAULT_CHANNEL_LIMITS[NotificationChannel.WEBHOOK][0], settings.NOTIFICATION_WEBHOOK_RATE),
+            },
+            max_attempts=settings.NOTIFICATION_MAX_ATTEMPTS,
+            backoff_base=settings.NOTIFICATION_RETRY_BASE_SECONDS
+        )
+        # Durable queue: dispatched notifications survive restarts (None keeps them in memory only)
+        self.outbox: Optional[NotificationOutbox] = None
+        self.outbox_relay: Optional[OutboxRelay] = None
+        if settings.NOTIFICATION_OUTBOX_PATH:
+            self.outbox = NotificationOutbox(settings.NOTIFICATION_OUTBOX_PATH, settings.NOTIFICATION_OUTBOX_LEASE_SECONDS)
+            self.outbox_relay = OutboxRelay(
+                self.outbox,
+                self.dispatcher,
+                self.notification_manager,
+                poll_interval=settings.NOTIFICATION_OUTBOX_POLL_SECONDS,
+                retention_seconds=settings.NOTIFICATION_RETENTION_DAYS * 86400
+            )
+        # Alert storms: repeats of the same alert within the window go out as one digest (None disables)
+        self.coalescer: Optional[NotificationCoalescer] = None
+        if settings.NOTIFICATION_DIGEST_WINDOW_SECONDS > 0:
+            self.coalescer = NotificationCoalescer(settings.NOTIFICATION_DIGEST_WINDOW_SECONDS, self._send_digest)
         
     def _get_email_config(self) -> Dict[str, Any]:
         """Get email configuration"""
         return {
             "smtp_server": os.getenv("SMTP_SERVER", "smtp.gmail.com"),
             "smtp_port": int(os.getenv("SMTP_PORT", "587")),
+            "smtp_starttls": os.getenv("SMTP_STARTTLS", "true").lower() == "true",
             "smtp_username": os.getenv("SMTP_USERNAME", ""),
             "smtp_password": os.getenv("SMTP_PASSWORD", ""),
             "from_email": os.getenv("FROM_EMAIL", "noreply@hackaura.com")
@@ -55,27 +109,139 @@ class NotificationService:
             data=data
         )
         
-        self.notification_manager.notifications.append(notification)
+        self.notification_manager.add(notification)
         logger.info(f"Created notification: {notification.id} for {recipient_id}")
         return notification
         
+    def notify(
+        self,
+        recipient_id: str,
+        template_key: str,
+        data: Optional[Dict[str, Any]] = None,
+        priority: NotificationPriority = NotificationPriority.MEDIUM,
+        channels: List[NotificationChannel] = None,
+        notification_type: NotificationType = NotificationType.SYSTEM_ALERT
+    ) -> Optional[Notification]:
+        """
+        Create a notification from a template and dispatch it, coalescing bursts
+
+        Returns:
+            The dispatched notification, or None when it was folded into an
+            open digest window (or was a duplicate urgent alert)
+        """
+        data = data or {}
+        channels = channels or [NotificationChannel.IN_APP]
+        if self.coalescer is not None and not self.coalescer.offer(recipient_id, template_key, data, priority, channels, notification_type):
+            return None
+        notification = self.notification_manager.create_notification(recipient_id, template_key, data, priority, channels, notification_type)
+        self.dispatch(notification)
+        return notification
+        
+    def notify_emergency(
+        self,
+        emergency_call_id: str,
+        recipient_id: str,
+        emergency_type: str,
+        priority: str
+    ) -> Optional[Notification]:
+        """Dispatch an emergency assignment (coalesced like notify())"""
+        return self.notify(
+            recipient_id=recipient_id,
+            template_key="emergency_assigned",
+            data={
+                "emergency_type": emergency_type,
+                "priority": priority,
+                "emergency_call_id": emergency_call_id
+            },
+            priority=NotificationPriority.URGENT,
+            channels=[NotificationChannel.SMS, NotificationChannel.IN_APP],
+            notification_type=NotificationType.EMERGENCY
+        )
+        
+    def _send_digest(self, digest: Digest):
+        """Store and dispatch the summary of a closed digest window"""
+        notification = self.notification_manager.build_notification(
+            digest.recipient_id, digest.template_key, digest.data, digest.priority, digest.channels, digest.notification_type
+        )
+        seconds = (digest.last_at - digest.first_at).total_seconds()
+        notification.title = f"{notification.title} (+{digest.count} more)"
+        notification.message = f"{digest.count} more like this in {seconds:.0f}s. Latest: {notification.message}"
+        notification.data = {
+            **digest.data,
+            "digest_count": digest.count,
+            "digest_first_at": digest.first_at.isoformat(),
+            "digest_last_at": digest.last_at.isoformat(),
+        }
+        self.notification_manager.add(notification)
+        self.dispatch(notification)
+        logger.info(f"Sent digest of {digest.count} {digest.template_key} notifications to {digest.recipient_id}")
+        
+    def dispatch(self, notification: Notification) -> Optional[asyncio.Future]:
+        """
+        Queue a notification for delivery without waiting for it
+
+        Inside the event loop it is written to the outbox (when enabled) and
+        goes to the per-channel dispatcher queues; outside one (scripts,
+        worker threads) it is sent inline.
+
+        Returns:
+            Future resolving to the delivery result, None when sent inline
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            self.send_notification(notification)
+            return None
+        if self.outbox_relay is not None:
+            return self.outbox_relay.submit([notification])[0]
+        return self.dispatcher.submit(notification)
+        
+    async def deliver(self, notification: Notification) -> bool:
+        """Send a notification through the dispatcher and wait for every channel"""
+        if self.outbox_relay is not None:
+            return await self.outbox_relay.submit([notification])[0]
+        return await self.dispatcher.submit(notification)
+        
+    async def start(self):
+        """Resume delivery of outbox rows left by a previous run (call at startup)"""
+        if self.outbox_relay is not None:
+            self.outbox_relay.start()
+            self.outbox_relay.notify()
+        
+    async def shutdown(self):
+        """Finish queued deliveries and close pooled connections"""
+        if self.coalescer is not None:
+            self.coalescer.flush(force=True)  # Held-back alerts still get their digest
+        if self.outbox_relay is not None:
+            await self.outbox_relay.stop()
+        await self.dispatcher.stop()
+        if self.outbox is not None:
+            self.outbox.close()
+        self.smtp_pool.close()
+        if self._http_session is not None:
+            self._http_session.close()
+        
     def send_notification(self, notification: Notification) -> bool:
-        """Send notification through specified channels"""
+        """Send notification through specified channels, blocking until done (no retries)"""
         success = True
         
         for channel in notification.channels:
             try:
+                sent = True
                 if channel == NotificationChannel.EMAIL:
-                    success &= self._send_email_notification(notification)
+                    sent = self._send_email_notification(notification)
                 elif channel == NotificationChannel.SMS:
-                    success &= self._send_sms_notification(notification)
+                    sent = self._send_sms_notification(notification)
                 elif channel == NotificationChannel.IN_APP:
-                    success &= self._send_in_app_notification(notification)
+                    sent = self._send_in_app_notification(notification)
                 elif channel == NotificationChannel.WEBHOOK:
-                    success &= self._send_webhook_notification(notification)
+                    sent = self._send_webhook_notification(notification)
                     
+                success &= sent
+                self.deliveries.inc(channel=channel.value, outcome="sent" if sent else "failed")
             except Exception as e:
                 logger.error(f"Failed to send notification via {channel.value}: {e}")
+                self.deliveries.inc(channel=channel.value, outcome="error")
                 success = False
                 
         if success:
@@ -86,74 +252,63 @@ class NotificationService:
         return success
         
     def _send_email_notification(self, notification: Notification) -> bool:
-        """Send email notification"""
-        try:
-            # Get recipient email (in production, would look up from user database)
-            recipient_email = self._get_user_email(notification.recipient_id)
-            if not recipient_email:
-                logger.warning(f"No email found for user {notification.recipient_id}")
-                return False
-                
-            msg = MIMEMultipart()
-            msg['From'] = self.email_config['from_email']
-            msg['To'] = recipient_email
-            msg['Subject'] = notification.title
-            
-            # Create HTML email body
-            html_body = f"""
-            <html>
-                <body>
-                    <h2>{notification.title}</h2>
-                    <p>{notification.message}</p>
-                    <p><small>Priority: {notification.priority.value}</small></p>
-                    <p><small>Sent: {notification.created_at.strftime('%Y-%m-%d %H:%M:%S')}</small></p>
-                </body>
-            </html>
-            """
-            
-            msg.attach(MIMEText(html_body, 'html'))
-            
-            # Send email
-            server = smtplib.SMTP(self.email_config['smtp_server'], self.email_config['smtp_port'])
-            server.starttls()
-            server.login(self.email_config['smtp_username'], self.email_config['smtp_password'])
-            text = msg.as_string()
-            server.sendmail(self.email_config['from_email'], recipient_email, text)
-            server.quit()
-            
-            logger.info(f"Email notification sent to {recipient_email}")
-            return True
-            
-        except Exception as e:
-            logger.error(f"Failed to send email notification: {e}")
+        """Send email notification over a pooled SMTP session (raises on transport errors)"""
+        # Get recipient email (in production, would look up from user database)
+        recipient_email = self._get_user_email(notification.recipient_id)
+        if not recipient_email:
+            logger.warning(f"No email found for user {notification.recipient_id}")
             return False
             
+        msg = MIMEMultipart()
+        msg['From'] = self.email_config['from_email']
+        msg['To'] = recipient_email
+        msg['Subject'] = notification.title
+        
+        # Create HTML email body
+        html_body = f"""
+        <html>
+            <body>
+                <h2>{notification.title}</h2>
+                <p>{notification.message}</p>
+                <p><small>Priority: {notification.priority.value}</small></p>
+                <p><small>Sent: {notification.created_at.strftime('%Y-%m-%d %H:%M:%S')}</small></p>
+            </body>
+        </html>
+        """
+        
+        msg.attach(MIMEText(html_body, 'html'))
+        
+        # Send email
+        self.smtp_pool.send(self.email_config['from_email'], recipient_email, msg.as_string())
+        
+        logger.info(f"Email notification sent to {recipient_email}")
+        return True
+        
     def _send_sms_notification(self, notification: Notification) -> bool:
-        """Send SMS notification using Twilio"""
-        try:
-            from twilio.rest import Client
-            
-            # Get recipient phone number
-            recipient_phone = self._get_user_phone(notification.recipient_id)
-            if not recipient_phone:
-                logger.warning(f"No phone number found for user {notification.recipient_id}")
-                return False
-                
-            client = Client(self.sms_config['twilio_account_sid'], self.sms_config['twilio_auth_token'])
-            
-            message = client.messages.create(
-                body=f"{notification.title}: {notification.message}",
-                from_=self.sms_config['twilio_phone_number'],
-                to=recipient_phone
-            )
-            
-            logger.info(f"SMS notification sent to {recipient_phone}: {message.sid}")
-            return True
-            
-        except Exception as e:
-            logger.error(f"Failed to send SMS notification: {e}")
+        """Send SMS notification using a shared Twilio client (raises on transport errors)"""
+        # Get recipient phone number
+        recipient_phone = self._get_user_phone(notification.recipient_id)
+        if not recipient_phone:
+            logger.warning(f"No phone number found for user {notification.recipient_id}")
             return False
             
+        message = self._get_twilio_client().messages.create(
+            body=f"{notification.title}: {notification.message}",
+            from_=self.sms_config['twilio_phone_number'],
+            to=recipient_phone
+        )
+        
+        logger.info(f"SMS notification sent to {recipient_phone}: {message.sid}")
+        return True
+        
+    def _get_twilio_client(self):
+        """Twilio client shared by all SMS workers (keeps its HTTP connections alive)"""
+        with self._client_lock:
+            if self._twilio_client is None:
+                from twilio.rest import Client
+                self._twilio_client = Client(self.sms_config['twilio_account_sid'], self.sms_config['twilio_auth_token'])
+            return self._twilio_client
+            
     def _send_in_app_notification(self, notification: Notification) -> bool:
         """Send in-app notification (mark as delivered)"""
         # In a real implementation, this would use WebSocket or push notifications
@@ -162,35 +317,46 @@ class NotificationService:
         return True
         
     def _send_webhook_notification(self, notification: Notification) -> bool:
-        """Send webhook notification"""
-        try:
-            import requests
-            
-            webhook_url = os.getenv("WEBHOOK_URL", "")
-            if not webhook_url:
-                logger.warning("No webhook URL configured")
-                return False
-                
-            payload = {
-                "notification_id": notification.id,
-                "recipient_id": notification.recipient_id,
-                "title": notification.title,
-                "message": notification.message,
-                "type": notification.notification_type.value,
-                "priority": notification.priority.value,
-                "data": notification.data,
-                "timestamp": notification.created_at.isoformat()
-            }
-            
-            response = requests.post(webhook_url, json=payload, timeout=10)
-            response.raise_for_status()
-            
-            logger.info(f"Webhook notification sent: {response.status_code}")
-            return True
+        """Send webhook notification on a keep-alive HTTP session (raises on transport errors and 5xx/429)"""
+        webhook_url = os.getenv("WEBHOOK_URL", "")
+        if not webhook_url:
+            logger.warning("No webhook URL configured")
+            return False
             
-        except Exception as e:
-            logger.error(f"Failed to send webhook notification: {e}")
+        payload = {
+            "notification_id": notification.id,
+            "recipient_id": notification.recipient_id,
+            "title": notification.title,
+            "message": notification.message,
+            "type": notification.notification_type.value,
+            "priority": notification.priority.value,
+            "data": notification.data,
+            "timestamp": notification.created_at.isoformat()
+        }
+        
+        response = self._get_http_session().post(webhook_url, json=payload, timeout=10)
+        if 400 <= response.status_code < 500 and response.status_code != 429:
+            # Rejected by the receiver, resending the same payload will not help
+            logger.error(f"Webhook rejected notification {notification.id}: {response.status_code}")
             return False
+        response.raise_for_status()
+        
+        logger.info(f"Webhook notification sent: {response.status_code}")
+        return True
+        
+    def _get_http_session(self):
+        """requests session with a connection pool sized for the webhook workers"""
+        with self._client_lock:
+            if self._http_session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+                workers = DEFAULT_CHANNEL_LIMITS[NotificationChannel.WEBHOOK][0]
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=workers, pool_maxsize=workers)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                self._http_session = session
+            return self._http_session
             
     def _get_user_email(self, user_id: str) -> Optional[str]:
         """Get user email from team service"""
@@ -216,13 +382,9 @@ class NotificationService:
         
     def mark_notification_read(self, notification_id: str, user_id: str) -> bool:
         """Mark notification as read"""
-        notification = next(
-            (n for n in self.notification_manager.notifications 
-             if n.id == notification_id and n.recipient_id == user_id),
-            None
-        )
+        notification = self.notification_manager.get_notification(notification_id)
         
-        if notification:
+        if notification and notification.recipient_id == user_id:
             notification.mark_read()
             logger.info(f"Notification {notification_id} marked as read")
             return True
@@ -237,7 +399,13 @@ class NotificationService:
         priority: NotificationPriority = NotificationPriority.MEDIUM,
         channels: List[NotificationChannel] = None
     ) -> List[Notification]:
-        """Send bulk notifications to multiple recipients"""
+        """
+        Send bulk notifications to multiple recipients
+
+        All of them are sent concurrently: queued on the dispatcher when
+        called from the event loop (the returned notifications are still
+        pending), otherwise sent on a thread pool before returning.
+        """
         notifications = []
         
         for recipient_id in recipient_ids:
@@ -252,70 +420,85 @@ class NotificationService:
             notifications.append(notification)
             
         # Send all notifications
-        for notification in notifications:
-            self.send_notification(notification)
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            self._send_concurrently(notifications)
+        else:
+            if self.outbox_relay is not None:
+                self.outbox_relay.submit(notifications)  # One outbox transaction for the whole batch
+            else:
+                for notification in notifications:
+                    self.dispatcher.submit(notification)
             
         return notifications
         
+    def _send_concurrently(self, notifications: List[Notification]) -> List[bool]:
+        """Blocking send of many notifications on a thread pool, results in input order"""
+        if len(notifications) <= 1:
+            return [self.send_notification(notification) for notification in notifications]
+        workers = min(len(notifications), sum(workers for workers, _ in DEFAULT_CHANNEL_LIMITS.values()))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="notify") as executor:
+            return list(executor.map(self.send_notification, notifications))
+        
     def process_pending_notifications(self) -> int:
-        """Process all pending notifications"""
+        """
+        Process all pending notifications
+
+        With the outbox this is one batched write: pending notifications not
+        yet in it are added, every pending row is made due now and the relay
+        is woken to send them. Returns the number of rows queued.
+        """
         pending = self.notification_manager.get_pending_notifications()
-        processed = 0
-        
-        for notification in pending:
-            if self.send_notification(notification):
-                processed += 1
+        if self.outbox is not None:
+            self.outbox.enqueue(pending)
+            queued = self.outbox.requeue((PENDING,))
+            self._wake_outbox_relay()
+            logger.info(f"Queued {queued} pending notifications")
+            return queued
+        processed = sum(self._send_concurrently(pending))
                 
         logger.info(f"Processed {processed} pending notifications")
         return processed
         
     def retry_failed_notifications(self) -> int:
-        """Retry failed notifications"""
+        """Retry failed notifications (with the outbox: make failed rows due now and wake the relay)"""
+        if self.outbox is not None:
+            queued = self.outbox.requeue((FAILED,))
+            self._wake_outbox_relay()
+            logger.info(f"Queued {queued} failed notifications for retry")
+            return queued
         failed = self.notification_manager.get_failed_notifications()
-        retried = 0
-        
-        for notification in failed:
-            if self.send_notification(notification):
-                retried += 1
+        retried = sum(self._send_concurrently(failed))
                 
         logger.info(f"Retried {retried} failed notifications")
         return retried
         
+    def _wake_outbox_relay(self):
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return  # The relay of the serving process picks the rows up on its next poll
+        self.outbox_relay.start()
+        self.outbox_relay.notify()
+        
     def get_notification_statistics(self) -> Dict[str, Any]:
         """Get notification statistics"""
-        total_notifications = len(self.notification_manager.notifications)
-        
-        # Count by status
-        status_counts = {}
-        for notification in self.notification_manager.notifications:
-            status = notification.status.value
-            status_counts[status] = status_counts.get(status, 0) + 1
-            
-        # Count by type
-        type_counts = {}
-        for notification in self.notification_manager.notifications:
-            notification_type = notification.notification_type.value
-            type_counts[notification_type] = type_counts.get(notification_type, 0) + 1
-            
-        # Count by priority
-        priority_counts = {}
-        for notification in self.notification_manager.notifications:
-            priority = notification.priority.value
-            priority_counts[priority] = priority_counts.get(priority, 0) + 1
-            
+        manager = self.notification_manager
         return {
-            "total_notifications": total_notifications,
-            "status_distribution": status_counts,
-            "type_distribution": type_counts,
-            "priority_distribution": priority_counts,
-            "pending_count": len(self.notification_manager.get_pending_notifications()),
-            "failed_count": len(self.notification_manager.get_failed_notifications())
+            "total_notifications": len(manager),
+            "status_distribution": manager.status_counts(),
+            "type_distribution": manager.type_distribution(),
+            "priority_distribution": manager.priority_distribution(),
+            "pending_count": manager.status_counts().get(NotificationStatus.PENDING.value, 0),
+            "failed_count": len(manager.get_failed_notifications()),
+            "outbox": self.outbox.counts() if self.outbox is not None else None
         }
         
     def cleanup_old_notifications(self, days: int = 30):
         """Clean up old notifications"""
-        self.notification_manager.cleanup_old_notifications(days)
-        logger.info(f"Cleaned up notifications older than {days} days")
+        removed = self.notification_manager.cleanup_old_notifications(days)
+        logger.info(f"Cleaned up {removed} notifications older than {days} days")
 
 
 # Import required modules
@@ -6,8 +6,11 @@ Generates safety precautions, guidance, and voice-friendly responses
 import ollama
 import json
 import logging
+import time
 from typing import Dict, Optional
 from models.emergency_schema import TriageResult, SeverityLevel, EmergencyType
+from utils.tracing import tracer
+from utils.metrics_registry import metrics
 
 logger = logging.getLogger(__name__)
 
@@ -16,7 +19,13 @@ class OllamaResponseGenerator:
     def __init__(self, model_name: str = "qwen2.5:0.5b"):
         """Initialize response generator"""
         self.model_name = model_name
-        logger.info(f"🎤 Ollama Response Generator initialized with model: {model_name}")
+        # Shares the Ollama latency family with the triage service
+        self.latency = metrics.histogram(
+            "ollama_triage_latency_ms",
+            "Ollama triage latency in milliseconds by stage and model",
+            ("stage", "model")
+        )
+        logger.info("🎤 Ollama Response Generator initialized with model: %s", model_name)
     
     def generate_voice_response(self, triage_result: TriageResult) -> Dict:
         """
@@ -32,20 +41,23 @@ class OllamaResponseGenerator:
             # Build prompt for voice response generation
             prompt = self._build_voice_response_prompt(triage_result)
             
-            logger.debug(f"📝 Generating voice response for {triage_result.emergency_type.value}")
+            logger.debug("📝 Generating voice response for %s", triage_result.emergency_type.value)
             
             # Call Ollama for voice response
-            response = ollama.chat(
-                model=self.model_name,
-                format='json',
-                messages=[{'role': 'user', 'content': prompt}],
-                stream=False
-            )
+            llm_start = time.time()
+            with tracer.span("ollama.voice_response", model=self.model_name):
+                response = ollama.chat(
+                    model=self.model_name,
+                    format='json',
+                    messages=[{'role': 'user', 'content': prompt}],
+                    stream=False
+                )
+            self.latency.labels(stage="voice_response", model=self.model_name).record((time.time() - llm_start) * 1000)
             
             response_text = response['message']['content']
             response_data = json.loads(response_text)
             
-            logger.debug(f"✅ Voice response generated")
+            logger.debug("✅ Voice response generated")
             
             return {
                 "voice_response": response_data.get('voice_response', ''),
@@ -15,6 +15,8 @@ from models.emergency_schema import (
     ClassificationResult, SeverityResult, RoutingResult,
     TriageResult
 )
+from utils.tracing import tracer
+from utils.metrics_registry import metrics
 
 logger = logging.getLogger(__name__)
 
@@ -30,9 +32,19 @@ class OllamaTriageService:
         """
         self.model_name = model_name
         self.temperature = temperature
-        self.processing_times = []
+        # Fixed-memory latency histograms per stage ("llm", "total") and model
+        self.latency = metrics.histogram(
+            "ollama_triage_latency_ms",
+            "Ollama triage latency in milliseconds by stage and model",
+            ("stage", "model")
+        )
+        self.requests = metrics.counter(
+            "ollama_triage_requests_total",
+            "Ollama triage requests by model and outcome",
+            ("model", "outcome")
+        )
         
-        logger.info(f"🤖 Ollama Triage Service initialized with model: {model_name}")
+        logger.info("🤖 Ollama Triage Service initialized with model: %s", model_name)
     
     async def process(self, transcript: str) -> TriageResult:
         """
@@ -48,39 +60,45 @@ class OllamaTriageService:
         start_time = time.time()
         
         try:
-            logger.info(f"🎯 Ollama processing started for transcript: {transcript[:50]}...")
+            logger.info("🎯 Ollama processing started for transcript: %.50s...", transcript)
             
             # Call Ollama with structured prompt
             prompt = self._build_triage_prompt(transcript)
-            logger.debug(f"📝 Prompt sent to Ollama: {prompt[:100]}...")
+            logger.debug("📝 Prompt sent to Ollama: %.100s...", prompt)
             
             # Call Ollama model with optimized settings
-            response = ollama.chat(
-                model=self.model_name,
-                format='json',
-                messages=[{'role': 'user', 'content': prompt}],
-                stream=False,
-                options={
-                    'temperature': self.temperature,
-                    'num_ctx': 256,  # Reduced context for speed
-                    'num_predict': 100,  # Limit output tokens
-                    'top_k': 5,  # Reduced top_k for speed
-                    'timeout': 3  # 3 second timeout
-                }
-            )
+            llm_start = time.time()
+            with tracer.span("ollama.chat", model=self.model_name):
+                response = ollama.chat(
+                    model=self.model_name,
+                    format='json',
+                    messages=[{'role': 'user', 'content': prompt}],
+                    stream=False,
+                    options={
+                        'temperature': self.temperature,
+                        'num_ctx': 256,  # Reduced context for speed
+                        'num_predict': 100,  # Limit output tokens
+                        'top_k': 5,  # Reduced top_k for speed
+                        'timeout': 3  # 3 second timeout
+                    }
+                )
+            self.latency.labels(stage="llm", model=self.model_name).record((time.time() - llm_start) * 1000)
             
             # Extract and parse response
             response_text = response['message']['content']
-            logger.debug(f"📥 Raw Ollama response: {response_text[:200]}...")
+            logger.debug("📥 Raw Ollama response: %.200s...", response_text)
             
             # Parse JSON response
-            triage_data = json.loads(response_text)
-            logger.debug(f"✅ Parsed triage data: {json.dumps(triage_data, indent=2)[:300]}...")
+            with tracer.span("ollama.parse"):
+                triage_data = json.loads(response_text)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("✅ Parsed triage data: %.300s...", json.dumps(triage_data, indent=2))
             
             # Calculate processing time
             processing_time = (time.time() - start_time) * 1000  # milliseconds
-            self.processing_times.append(processing_time)
-            logger.info(f"⏱️  Triage processing completed in {processing_time:.2f}ms")
+            self.latency.labels(stage="total", model=self.model_name).record(processing_time)
+            self.requests.inc(model=self.model_name, outcome="success")
+            logger.info("⏱️  Triage processing completed in %.2fms", processing_time)
             
             # Build TriageResult from parsed data
             triage_result = self._build_triage_result(
@@ -89,18 +107,20 @@ class OllamaTriageService:
                 processing_time=processing_time
             )
             
-            logger.info(f"✅ Final triage result ready")
-            logger.info(f"   Type: {triage_result.emergency_type}")
-            logger.info(f"   Severity: {triage_result.severity_level}")
-            logger.info(f"   Service: {triage_result.assigned_service}")
+            logger.info("✅ Final triage result ready")
+            logger.info("   Type: %s", triage_result.emergency_type)
+            logger.info("   Severity: %s", triage_result.severity_level)
+            logger.info("   Service: %s", triage_result.assigned_service)
             
             return triage_result
             
         except json.JSONDecodeError as e:
             logger.error(f"❌ JSON parsing failed: {e}")
+            self.requests.inc(model=self.model_name, outcome="invalid_json")
             return self._create_error_result(transcript, start_time, "JSON parsing error")
         except Exception as e:
             logger.error(f"❌ Ollama processing failed: {e}")
+            self.requests.inc(model=self.model_name, outcome="error")
             logger.error(f"   Exception: {type(e).__name__}: {str(e)}")
             return self._create_error_result(transcript, start_time, str(e))
     
@@ -241,7 +261,7 @@ JSON:
             except:
                 pass
             
-            logger.warning(f"Could not parse enum value '{value}', using default: {default}")
+            logger.warning("Could not parse enum value '%s', using default: %s", value, default)
             return default
     
     def _create_error_result(
@@ -284,30 +304,39 @@ JSON:
         Returns:
             Average processing time
         """
-        if not self.processing_times:
+        histogram = self.latency.labels(stage="total", model=self.model_name)
+        if not histogram.total_count:
             return 0.0
-        return sum(self.processing_times) / len(self.processing_times)
+        return histogram.total_sum / histogram.total_count
     
-    def get_stats(self) -> dict:
+    def get_stats(self, window_seconds: Optional[int] = None) -> dict:
         """
         Get service statistics
         
+        Args:
+            window_seconds: Window for the percentiles, defaults to the full histogram window
+            
         Returns:
-            Dictionary with processing stats
+            Dictionary with lifetime totals and windowed percentiles
         """
-        if not self.processing_times:
+        histogram = self.latency.labels(stage="total", model=self.model_name)
+        window = histogram.snapshot(window_seconds)
+        
+        if not histogram.total_count:
             return {
                 'total_calls': 0,
                 'avg_ms': 0.0,
                 'min_ms': 0.0,
-                'max_ms': 0.0
+                'max_ms': 0.0,
+                'percentiles': window
             }
         
         return {
-            'total_calls': len(self.processing_times),
-            'avg_ms': sum(self.processing_times) / len(self.processing_times),
-            'min_ms': min(self.processing_times),
-            'max_ms': max(self.processing_times)
+            'total_calls': histogram.total_count,
+            'avg_ms': histogram.total_sum / histogram.total_count,
+            'min_ms': histogram.min,
+            'max_ms': histogram.max,
+            'percentiles': window
         }
 
 
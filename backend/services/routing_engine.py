@@ -1,11 +1,15 @@
+import json
 import logging
-from typing import Dict, Any
+import os
+from types import MappingProxyType
+from typing import Dict, Any, Mapping, Optional, Tuple
+from config import settings
 from models.emergency_schema import EmergencyType, SeverityLevel, EmergencyService, RoutingResult
 
 logger = logging.getLogger(__name__)
 
 class RoutingEngine:
-    def __init__(self):
+    def __init__(self, matrix_path: Optional[str] = None):
         # Define routing rules based on emergency type
         self.routing_rules = {
             EmergencyType.MEDICAL: EmergencyService.AMBULANCE,
@@ -31,6 +35,10 @@ class RoutingEngine:
                 "description": "Ambulance and Police required"
             }
         }
+        
+        # Type x severity decision matrix, compiled once; optionally tuned from a JSON file
+        self.matrix_path = matrix_path if matrix_path is not None else settings.ROUTING_MATRIX_PATH
+        self.routing_matrix = self._build_routing_matrix(self.matrix_path)
     
     def route_emergency(self, emergency_type: EmergencyType, severity_level: SeverityLevel) -> RoutingResult:
         """
@@ -43,85 +51,122 @@ class RoutingEngine:
         Returns:
             RoutingResult with assigned service and priority
         """
-        logger.debug(f"🚑 ROUTING ENGINE STARTING")
-        logger.debug(f"   Emergency Type: {emergency_type.value}")
-        logger.debug(f"   Severity Level: {severity_level.value}")
+        try:
+            result = self.routing_matrix[(emergency_type, severity_level)]
+        except KeyError:
+            result = self._compute_default_routing(emergency_type, severity_level)
         
-        # Base routing by emergency type
-        base_routing = {
-            EmergencyType.MEDICAL: EmergencyService.AMBULANCE,
-            EmergencyType.FIRE: EmergencyService.FIRE_DEPARTMENT,
-            EmergencyType.POLICE: EmergencyService.POLICE,
-            EmergencyType.ACCIDENT: EmergencyService.MULTIPLE,
-            EmergencyType.MENTAL_HEALTH: EmergencyService.CRISIS_RESPONSE,
-            EmergencyType.OTHER: EmergencyService.POLICE
+        logger.info("🚑 ROUTING COMPLETE: %s (priority: %s)", result.assigned_service.value, result.priority)
+        return result
+    
+    def reload_routing_matrix(self, matrix_path: Optional[str] = None) -> int:
+        """
+        Rebuild the decision matrix from the routing config file
+        
+        Args:
+            matrix_path: Config file to load, defaults to the configured path
+            
+        Returns:
+            Number of matrix cells overridden by the config file
+        """
+        if matrix_path is not None:
+            self.matrix_path = matrix_path
+        matrix = self._build_routing_matrix(self.matrix_path)
+        overridden = sum(
+            1 for key, result in matrix.items()
+            if result != self._compute_default_routing(*key)
+        )
+        # Swap in one assignment so concurrent lookups see either the old or new matrix
+        self.routing_matrix = matrix
+        logger.info(f"🚑 Routing matrix reloaded ({overridden} cells differ from defaults)")
+        return overridden
+    
+    def _build_routing_matrix(self, matrix_path: Optional[str]) -> Mapping[Tuple[EmergencyType, SeverityLevel], RoutingResult]:
+        """Compile every type x severity combination into an immutable lookup table"""
+        matrix = {
+            (emergency_type, severity_level): self._compute_default_routing(emergency_type, severity_level)
+            for emergency_type in EmergencyType
+            for severity_level in SeverityLevel
         }
         
-        assigned_service = base_routing.get(emergency_type, EmergencyService.POLICE)
+        if matrix_path:
+            matrix.update(self._load_matrix_overrides(matrix_path))
         
-        logger.debug(f"   🎯 BASE ROUTING:")
-        logger.debug(f"      Type -> Service: {emergency_type.value} -> {assigned_service.value}")
+        return MappingProxyType(matrix)
+    
+    def _load_matrix_overrides(self, matrix_path: str) -> Dict[Tuple[EmergencyType, SeverityLevel], RoutingResult]:
+        """
+        Load routing overrides from a JSON config file
         
-        # Adjust for multi-service emergencies
-        if emergency_type == EmergencyType.ACCIDENT:
-            logger.debug(f"      🚗 ACCIDENT DETECTED - Multiple services needed")
-            if severity_level in [SeverityLevel.LEVEL_1, SeverityLevel.LEVEL_2]:
-                logger.debug(f"         High severity accident -> Ambulance + Fire + Police")
-                assigned_service = EmergencyService.MULTIPLE
-            else:
-                logger.debug(f"         Low severity accident -> Police + Ambulance")
-                assigned_service = EmergencyService.MULTIPLE
+        The file maps emergency type -> severity level -> {"assigned_service", "priority"},
+        e.g. {"FIRE": {"LEVEL_3": {"assigned_service": "FIRE_DEPARTMENT", "priority": 2}}}.
+        Cells that are missing or invalid keep their default routing.
+        """
+        if not os.path.exists(matrix_path):
+            logger.warning(f"Routing matrix file not found: {matrix_path}, using defaults")
+            return {}
+        
+        try:
+            with open(matrix_path, "r") as f:
+                config = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.error(f"❌ Failed to read routing matrix {matrix_path}: {e}")
+            return {}
+        
+        if not isinstance(config, dict):
+            logger.error(f"❌ Routing matrix {matrix_path} must be a JSON object, using defaults")
+            return {}
+        
+        overrides = {}
+        for type_name, levels in config.items():
+            try:
+                emergency_type = EmergencyType(type_name.upper())
+            except ValueError:
+                logger.warning(f"Unknown emergency type in routing matrix: {type_name}")
+                continue
+            if not isinstance(levels, dict):
+                logger.warning(f"Invalid routing matrix entry {type_name}: expected an object of severity levels")
+                continue
+            
+            for level_name, cell in levels.items():
+                try:
+                    severity_level = SeverityLevel(level_name.upper())
+                    default = self._compute_default_routing(emergency_type, severity_level)
+                    overrides[(emergency_type, severity_level)] = RoutingResult(
+                        assigned_service=cell.get("assigned_service", default.assigned_service),
+                        priority=cell.get("priority", default.priority)
+                    )
+                except Exception as e:
+                    logger.warning(f"Invalid routing matrix cell {type_name}/{level_name}: {e}")
+        
+        logger.info(f"🚑 Loaded {len(overrides)} routing overrides from {matrix_path}")
+        return overrides
+    
+    def _compute_default_routing(self, emergency_type: EmergencyType, severity_level: SeverityLevel) -> RoutingResult:
+        """Built-in routing rules used to seed the decision matrix"""
+        # Base routing by emergency type (accidents always need multiple services)
+        assigned_service = self.routing_rules.get(emergency_type, EmergencyService.POLICE)
         
         # Calculate priority based on severity
-        priority_mapping = {
-            SeverityLevel.LEVEL_1: 1,  # Critical - highest priority
-            SeverityLevel.LEVEL_2: 2,  # High
-            SeverityLevel.LEVEL_3: 4,  # Moderate
-            SeverityLevel.LEVEL_4: 6   # Low - lowest priority
-        }
-        
-        base_priority = priority_mapping.get(severity_level, 4)
-        
-        logger.debug(f"   📊 PRIORITY CALCULATION:")
-        logger.debug(f"      Severity -> Base Priority: {severity_level.value} -> {base_priority}")
+        base_priority = self.priority_rules.get(severity_level, 4)
         
         # Adjust priority based on emergency type
         if emergency_type == EmergencyType.MEDICAL:
-            if severity_level == SeverityLevel.LEVEL_1:
-                priority = 1
-                logger.debug(f"      🏥 Critical medical -> Priority 1 (highest)")
-            else:
-                priority = base_priority - 1
-                logger.debug(f"      🏥 Medical emergency -> Priority {priority} (elevated)")
+            priority = 1 if severity_level == SeverityLevel.LEVEL_1 else base_priority - 1
         elif emergency_type == EmergencyType.FIRE:
             priority = base_priority - 1
-            logger.debug(f"      🔥 Fire emergency -> Priority {priority} (elevated)")
         elif emergency_type == EmergencyType.POLICE:
-            if severity_level == SeverityLevel.LEVEL_1:
-                priority = 1
-                logger.debug(f"      👮 Critical police -> Priority 1 (highest)")
-            else:
-                priority = base_priority
-                logger.debug(f"      👮 Police emergency -> Priority {priority} (standard)")
+            priority = 1 if severity_level == SeverityLevel.LEVEL_1 else base_priority
         else:
             priority = base_priority
-            logger.debug(f"      📋 Standard routing -> Priority {priority}")
         
         # Ensure priority is within valid range
         priority = max(1, min(10, priority))
         
-        logger.debug(f"   🎯 FINAL ROUTING DECISION:")
-        logger.debug(f"      Assigned Service: {assigned_service.value}")
-        logger.debug(f"      Final Priority: {priority}")
-        logger.debug(f"      Priority Range: 1 (highest) to 10 (lowest)")
-        
-        result = RoutingResult(
+        return RoutingResult(
             assigned_service=assigned_service,
             priority=priority
         )
-        
-        logger.info(f"🚑 ROUTING COMPLETE: {assigned_service.value} (priority: {priority})")
-        return result
     
     def _adjust_priority(self, emergency_type: EmergencyType, severity_level: SeverityLevel, base_priority: int) -> int:
         """
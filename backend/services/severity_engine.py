@@ -100,16 +100,16 @@ class SeverityEngine:
         Returns:
             SeverityResult with level, score, and risk indicators
         """
-        logger.debug(f"⚡ SEVERITY ENGINE STARTING")
-        logger.debug(f"   Input Transcript: '{transcript}'")
-        logger.debug(f"   Emergency Type: {emergency_type.value}")
+        debug = logger.isEnabledFor(logging.DEBUG)
+        if debug:
+            logger.debug("⚡ SEVERITY ENGINE STARTING")
+            logger.debug("   Input Transcript: '%s'", transcript)
+            logger.debug("   Emergency Type: %s", emergency_type.value)
         
         transcript_lower = transcript.lower()
         severity_score = 0
         risk_indicators = []
         
-        logger.debug(f"   🔍 CHECKING SEVERITY KEYWORDS:")
-        
         # Check for severity indicators using the rules dictionary
         for indicator, points in self.severity_rules.items():
             if indicator in transcript_lower:
@@ -117,14 +117,15 @@ class SeverityEngine:
                 risk_indicators.append(indicator)
                 
                 # Categorize severity level for logging
-                if points >= 70:
-                    logger.debug(f"      🚨 CRITICAL: Found '{indicator}' (+{points})")
-                elif points >= 40:
-                    logger.debug(f"      ⚠️  HIGH: Found '{indicator}' (+{points})")
-                elif points >= 20:
-                    logger.debug(f"      📋 MODERATE: Found '{indicator}' (+{points})")
-                else:
-                    logger.debug(f"      ℹ️  LOW: Found '{indicator}' (+{points})")
+                if debug:
+                    if points >= 70:
+                        logger.debug("      🚨 CRITICAL: Found '%s' (+%s)", indicator, points)
+                    elif points >= 40:
+                        logger.debug("      ⚠️  HIGH: Found '%s' (+%s)", indicator, points)
+                    elif points >= 20:
+                        logger.debug("      📋 MODERATE: Found '%s' (+%s)", indicator, points)
+                    else:
+                        logger.debug("      ℹ️  LOW: Found '%s' (+%s)", indicator, points)
         
         # Apply emergency type multipliers
         type_multipliers = {
@@ -139,12 +140,11 @@ class SeverityEngine:
         multiplier = type_multipliers.get(emergency_type, 1.0)
         final_score = severity_score * multiplier
         
-        logger.debug(f"   📊 SEVERITY CALCULATION:")
-        logger.debug(f"      Base Score: {severity_score}")
-        logger.debug(f"      Type Multiplier: {multiplier} ({emergency_type.value})")
-        logger.debug(f"      Final Score: {final_score:.1f}")
-        logger.debug(f"      Risk Indicators Found: {len(risk_indicators)}")
-        logger.debug(f"      Risk Indicators: {risk_indicators}")
+        if debug:
+            logger.debug("   📊 SEVERITY CALCULATION:")
+            logger.debug("      Base Score: %s, Type Multiplier: %s (%s), Final Score: %.1f",
+                         severity_score, multiplier, emergency_type.value, final_score)
+            logger.debug("      Risk Indicators (%d): %s", len(risk_indicators), risk_indicators)
         
         # Determine severity level
         if final_score >= 80:
@@ -160,10 +160,9 @@ class SeverityEngine:
             level = SeverityLevel.LEVEL_4
             level_name = "Level 4 - Low"
         
-        logger.debug(f"   🎯 SEVERITY LEVEL DETERMINED:")
-        logger.debug(f"      Score: {final_score:.1f}")
-        logger.debug(f"      Level: {level_name}")
-        logger.debug(f"      Thresholds: ≥80=Critical, ≥60=High, ≥40=Moderate, <40=Low")
+        if debug:
+            logger.debug("   🎯 SEVERITY LEVEL DETERMINED: %s (score %.1f; ≥80=Critical, ≥60=High, ≥40=Moderate, <40=Low)",
+                         level_name, final_score)
         
         result = SeverityResult(
             level=level,
@@ -171,7 +170,7 @@ class SeverityEngine:
             risk_indicators=risk_indicators
         )
         
-        logger.info(f"⚡ SEVERITY COMPLETE: {level_name} (score: {final_score:.1f})")
+        logger.info("⚡ SEVERITY COMPLETE: %s (score: %.1f)", level_name, final_score)
         return result
     
     def _determine_level(self, score: float) -> SeverityLevel:
@@ -8,12 +8,13 @@ logger = logging.getLogger(__name__)
 
 class SummaryEngine:
     def __init__(self):
-        # Common patterns for extracting key information
+        # Common patterns for extracting key information, in priority order
+        street_suffix = r'(?:Street|St|Avenue|Ave|Road|Rd|Drive|Dr|Lane|Ln|Boulevard|Blvd)'
         self.location_patterns = [
-            r'at\s+([A-Z][a-z]+\s+(Street|St|Avenue|Ave|Road|Rd|Drive|Dr|Lane|Ln|Boulevard|Blvd))',
-            r'on\s+([A-Z][a-z]+\s+(Street|St|Avenue|Ave|Road|Rd|Drive|Dr|Lane|Ln|Boulevard|Blvd))',
-            r'(\d+\s+[A-Z][a-z]+\s+(Street|St|Avenue|Ave|Road|Rd|Drive|Dr|Lane|Ln|Boulevard|Blvd))',
-            r'([A-Z][a-z]+\s+(Street|St|Avenue|Ave|Road|Rd|Drive|Dr|Lane|Ln|Boulevard|Blvd))',
+            r'at\s+([A-Z][a-z]+\s+' + street_suffix + r')',
+            r'on\s+([A-Z][a-z]+\s+' + street_suffix + r')',
+            r'(\d+\s+[A-Z][a-z]+\s+' + street_suffix + r')',
+            r'([A-Z][a-z]+\s+' + street_suffix + r')',
             r'(MG\s+Road| Brigade\s+Road| Commercial\s+Street| Residency\s+Road)',
             r'([A-Z][a-z]+\s+Area|[A-Z][a-z]+\s+Nagar|[A-Z][a-z]+\s+Colony)',
         ]
@@ -30,6 +31,25 @@ class SummaryEngine:
             r'(just\s+now|recently|earlier)',
             r'(this\s+morning|this\s+afternoon|tonight|last\s+night)',
         ]
+        
+        # Compile once at init instead of going through the re module cache per call
+        self._location_regexes = self._compile_field(self.location_patterns)
+        self._victim_regexes = self._compile_field(self.victim_patterns)
+        self._time_regexes = self._compile_field(self.time_patterns)
+    
+    @staticmethod
+    def _compile_field(patterns: List[str]) -> tuple:
+        """Compile a field's patterns, keeping their priority order"""
+        return tuple(re.compile(pattern, re.IGNORECASE) for pattern in patterns)
+    
+    @staticmethod
+    def _search_field(regexes: tuple, transcript: str) -> Optional[str]:
+        """Return the first group of the highest-priority pattern that matches"""
+        for regex in regexes:
+            match = regex.search(transcript)
+            if match:
+                return match.group(1).strip()
+        return None
     
     def generate(self, transcript: str, emergency_type: EmergencyType, 
                  severity_level: SeverityLevel, risk_indicators: List[str]) -> str:
@@ -45,80 +65,50 @@ class SummaryEngine:
         Returns:
             Concise, operational summary for dispatchers
         """
-        logger.debug(f"📝 SUMMARY ENGINE STARTING")
-        logger.debug(f"   Input Transcript: '{transcript}'")
-        logger.debug(f"   Emergency Type: {emergency_type.value}")
-        logger.debug(f"   Severity Level: {severity_level.value}")
-        logger.debug(f"   Risk Indicators: {risk_indicators}")
-        
         try:
-            logger.info(f"Generating summary for {emergency_type.value} emergency")
+            logger.info("Generating summary for %s emergency", emergency_type.value)
             
             # Extract key information
-            victim_count = self._extract_victim_count(transcript)
+            victim_info = self._extract_victim_info(transcript)
             location = self._extract_location(transcript)
             time_info = self._extract_time_info(transcript)
             key_details = self._extract_key_details(transcript, risk_indicators)
             
-            logger.debug(f"   🔍 INFORMATION EXTRACTION:")
-            logger.debug(f"      Victim Count: {victim_count}")
-            logger.debug(f"      Location: '{location}'")
-            logger.debug(f"      Time Info: '{time_info}'")
-            logger.debug(f"      Key Details: '{key_details}'")
-            
             # Build summary parts
             summary_parts = []
             
             # Emergency type and severity
             severity_desc = self._get_severity_description(severity_level)
             summary_parts.append(f"{severity_desc} {emergency_type.value} emergency")
-            logger.debug(f"      Base Summary: '{severity_desc} {emergency_type.value} emergency'")
             
             # Victim information
-            if victim_count:
-                victim_text = f"Victim(s): {victim_count}"
-                summary_parts.append(victim_text)
-                logger.debug(f"      Added Victim Info: '{victim_text}'")
+            if victim_info:
+                summary_parts.append(f"Victim(s): {victim_info}")
             
             # Key details
             if key_details:
                 summary_parts.append(f"Details: {key_details}")
-                logger.debug(f"      Added Details: 'Details: {key_details}'")
             
             # Location if available
             if location:
                 summary_parts.append(f"Location: {location}")
-                logger.debug(f"      Added Location: 'Location: {location}'")
             
             # Time information if available
             if time_info:
                 summary_parts.append(f"Time: {time_info}")
-                logger.debug(f"      Added Time: 'Time: {time_info}'")
             
             # Add action required based on emergency type
             action_required = self._get_action_required(emergency_type, severity_level)
             summary_parts.append(f"Action: {action_required}")
-            logger.debug(f"      Added Action: 'Action: {action_required}'")
             
             # Combine into final summary
             summary = ". ".join(summary_parts) + "."
             
-            logger.debug(f"   📋 SUMMARY CONSTRUCTION:")
-            logger.debug(f"      Summary Parts: {summary_parts}")
-            logger.debug(f"      Raw Summary: '{summary}'")
-            logger.debug(f"      Summary Length: {len(summary)} characters")
-            
             # Ensure summary is concise (max 200 characters for dispatcher readability)
             if len(summary) > 200:
-                original_summary = summary
                 summary = self._truncate_summary(summary)
-                logger.debug(f"      Summary Truncated: '{original_summary}' -> '{summary}'")
-            
-            logger.debug(f"   🎯 FINAL SUMMARY:")
-            logger.debug(f"      Final Summary: '{summary}'")
-            logger.debug(f"      Final Length: {len(summary)} characters")
             
-            logger.info(f"📝 SUMMARY COMPLETE: '{summary}'")
+            logger.info("📝 SUMMARY COMPLETE: '%s'", summary)
             return summary
             
         except Exception as e:
@@ -135,27 +125,15 @@ class SummaryEngine:
     
     def _extract_location(self, transcript: str) -> Optional[str]:
         """Extract location information from transcript"""
-        for pattern in self.location_patterns:
-            match = re.search(pattern, transcript, re.IGNORECASE)
-            if match:
-                return match.group(1).strip()
-        return None
+        return self._search_field(self._location_regexes, transcript)
     
     def _extract_victim_info(self, transcript: str) -> Optional[str]:
         """Extract victim information from transcript"""
-        for pattern in self.victim_patterns:
-            match = re.search(pattern, transcript, re.IGNORECASE)
-            if match:
-                return match.group(1).strip()
-        return None
+        return self._search_field(self._victim_regexes, transcript)
     
     def _extract_time_info(self, transcript: str) -> Optional[str]:
         """Extract time information from transcript"""
-        for pattern in self.time_patterns:
-            match = re.search(pattern, transcript, re.IGNORECASE)
-            if match:
-                return match.group(1).strip()
-        return None
+        return self._search_field(self._time_regexes, transcript)
     
     def _extract_key_details(self, transcript: str, risk_indicators: List[str]) -> str:
         """Extract key incident details from risk indicators and transcript"""
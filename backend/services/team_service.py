@@ -4,6 +4,10 @@ import logging
 from backend.app.models.team import TeamMember, Team, TeamRole, TeamStatus
 from backend.app.models.notifications import NotificationManager, NotificationType, NotificationPriority
 from backend.config import settings
+from backend.utils.metrics_registry import metrics
+from backend.services.assignment_index import AssignmentIndex, UNTEAMED
+from backend.services import batch_assignment
+from backend.services.team_statistics import TeamStatistics
 
 logger = logging.getLogger(__name__)
 
@@ -13,6 +17,19 @@ class TeamService:
         self.teams: Dict[str, Team] = {}
         self.team_members: Dict[str, TeamMember] = {}
         self.notification_manager = NotificationManager()
+        self.assignment_index = AssignmentIndex()  # Available members by specialization and skill
+        self.statistics = TeamStatistics()  # Counters and leaderboards, updated on every member change
+        
+        # Utilization metrics, maintained incrementally on call start/end
+        self.calls_in_progress = metrics.gauge("team_calls_in_progress", "Calls currently handled by team members")
+        self.call_capacity = metrics.gauge("team_call_capacity", "Concurrent calls team members can handle")
+        metrics.gauge(
+            "team_utilization_ratio",
+            "Calls in progress divided by total concurrent call capacity"
+        ).set_function(
+            lambda: self.calls_in_progress.value() / self.call_capacity.value() if self.call_capacity.value() else 0.0
+        )
+        
         self._initialize_default_teams()
         
     def _initialize_default_teams(self):
@@ -74,14 +91,27 @@ class TeamService:
                 team_member.add_skill(skill)
                 
         self.team_members[team_member.id] = team_member
+        self.call_capacity.inc(team_member.max_concurrent_calls)
         
         # Add to team if specified
         if team_id and team_id in self.teams:
             self.teams[team_id].add_member(team_member)
+        self.assignment_index.add(team_member, self._assignment_pool(team_member))
+        self.statistics.update(team_member)
             
         logger.info(f"Created team member: {team_member.name} ({team_member.id})")
         return team_member
         
+    def _assignment_pool(self, member: TeamMember):
+        """Index pool of a member: its team's specialization, or UNTEAMED"""
+        member_team = self.teams.get(member.team_id) if member.team_id else None
+        return member_team.specialization if member_team else UNTEAMED
+        
+    def _reindex_member(self, member: TeamMember):
+        """Refresh the assignment index and statistics after a member changes"""
+        self.assignment_index.update(member, self._assignment_pool(member))
+        self.statistics.update(member)
+        
     def get_team_member(self, member_id: str) -> Optional[TeamMember]:
         """Get team member by ID"""
         return self.team_members.get(member_id)
@@ -98,6 +128,7 @@ class TeamService:
             
         old_status = member.status
         member.update_status(status)
+        self._reindex_member(member)
         
         # Create notification if member went offline
         if status == TeamStatus.OFFLINE and old_status != TeamStatus.OFFLINE:
@@ -119,51 +150,101 @@ class TeamService:
         required_skills: List[str] = None
     ) -> Optional[TeamMember]:
         """Assign a call to the best available team member"""
-        required_skills = required_skills or []
-        
-        # Find suitable team members
-        suitable_members = []
+        # Members of the matching specialization team, plus members without a team
+        pools = [emergency_type, UNTEAMED] if emergency_type else None
+        best_member = self.assignment_index.best(pools, required_skills)
         
-        for member in self.team_members.values():
-            if not member.is_available_for_call():
-                continue
-                
-            # Check if member has required skills
-            if required_skills and not any(skill in member.skills for skill in required_skills):
-                continue
-                
-            # Check team specialization
-            if emergency_type:
-                member_team = self.teams.get(member.team_id) if member.team_id else None
-                if member_team and member_team.specialization == emergency_type:
-                    suitable_members.append(member)
-                elif not member_team:  # General team members
-                    suitable_members.append(member)
-            else:
-                suitable_members.append(member)
-                
-        if not suitable_members:
+        if not best_member:
             logger.warning(f"No available team members for call {call_sid}")
             return None
             
-        # Select best member (fewest current calls, then best response time)
-        best_member = min(
-            suitable_members,
-            key=lambda m: (m.current_calls, m.avg_response_time)
-        )
-        
         # Assign call
-        if best_member.start_call():
-            logger.info(f"Assigned call {call_sid} to {best_member.name}")
+        if self.start_call_for_team_member(best_member.id, call_sid):
             return best_member
             
         return None
         
+    def assign_calls_batch(self, calls: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Assign a queue of calls to available members in one optimal matching
+        
+        Unlike repeated assign_call_to_team_member calls, a responder is not
+        taken by whichever call comes first when a later, more urgent call
+        needs their skills. Eligibility matches the single-call path (team
+        specialization, at least one required skill); the weight of each pair
+        comes from batch_assignment.pair_weight.
+        
+        Args:
+            calls: Dicts with call_sid and optional emergency_type,
+                required_skills and priority (1 = critical .. 10, default 5)
+                
+        Returns:
+            Assigned (call_sid, member) pairs, unassigned call SIDs, total
+            weight and the solver used
+        """
+        queue = [
+            {
+                "call_sid": call["call_sid"],
+                "emergency_type": call.get("emergency_type"),
+                "required_skills": call.get("required_skills") or [],
+                "priority": call.get("priority") or 5,
+            }
+            for call in calls
+        ]
+        # One slot per free concurrent-call seat, loaded with the calls already ahead of it
+        slots = [
+            {"member": member, "load": load}
+            for member in self.assignment_index.available()
+            for load in range(member.current_calls, member.max_concurrent_calls)
+        ]
+        pools = {member.id: self._assignment_pool(member) for member in (slot["member"] for slot in slots)}
+        
+        def eligible(call, member):
+            if call["emergency_type"] and pools[member.id] not in (call["emergency_type"], UNTEAMED):
+                return False
+            return not call["required_skills"] or any(skill in member.skills for skill in call["required_skills"])
+            
+        pairs, total_weight = batch_assignment.solve(queue, slots, eligible)
+        
+        assignments = []
+        for call_index, slot_index in sorted(pairs):
+            call_sid = queue[call_index]["call_sid"]
+            member = slots[slot_index]["member"]
+            if self.start_call_for_team_member(member.id, call_sid):
+                assignments.append((call_sid, member))
+        assigned_sids = {call_sid for call_sid, _ in assignments}
+        unassigned = [call["call_sid"] for call in queue if call["call_sid"] not in assigned_sids]
+        
+        logger.info(f"Batch assigned {len(assignments)}/{len(queue)} calls across {len(slots)} open slots")
+        return {
+            "assignments": assignments,
+            "unassigned": unassigned,
+            "total_weight": total_weight,
+            "solver": "scipy" if batch_assignment.HAS_SCIPY else "hungarian",
+        }
+        
+    def start_call_for_team_member(self, member_id: str, call_sid: str) -> bool:
+        """Start a call for a team member, keeping team counters in sync"""
+        member = self.team_members.get(member_id)
+        if not member or not member.start_call():
+            return False
+            
+        self._reindex_member(member)
+        self.calls_in_progress.inc()
+        if member.team_id and member.team_id in self.teams:
+            self.teams[member.team_id].active_calls += 1
+            
+        logger.info(f"Assigned call {call_sid} to {member.name}")
+        return True
+        
     def end_call_for_team_member(self, member_id: str, call_sid: str, response_time: Optional[int] = None):
         """End a call for a team member"""
         member = self.team_members.get(member_id)
         if member:
+            if member.current_calls > 0:
+                self.calls_in_progress.dec()
             member.end_call(response_time)
+            self._reindex_member(member)
             
             # Update team stats
             if member.team_id and member.team_id in self.teams:
@@ -183,38 +264,27 @@ class TeamService:
         
     def get_team_statistics(self) -> Dict[str, Any]:
         """Get comprehensive team statistics"""
-        total_members = len(self.team_members)
-        active_members = len([
-            m for m in self.team_members.values() 
-            if m.status != TeamStatus.OFFLINE
-        ])
-        available_members = len([
-            m for m in self.team_members.values() 
-            if m.is_available_for_call()
-        ])
-        
-        # Role distribution
-        role_counts = {}
-        for member in self.team_members.values():
-            role = member.role.value
-            role_counts[role] = role_counts.get(role, 0) + 1
-            
-        # Skill distribution
-        skill_counts = {}
-        for member in self.team_members.values():
-            for skill in member.skills:
-                skill_counts[skill] = skill_counts.get(skill, 0) + 1
-                
+        stats = self.statistics
+        role_counts, skill_counts = stats.distributions()
+        
         # Team statistics
         team_stats = {}
         for team in self.teams.values():
-            team_stats[team.id] = team.get_team_stats()
+            active_members, available_members = stats.team_counts(team.id)
+            team_stats[team.id] = {
+                "total_members": len(team.members),
+                "active_members": active_members,
+                "available_members": available_members,
+                "active_calls": team.active_calls,
+                "total_calls_handled": team.total_calls_handled,
+                "specialization": team.specialization
+            }
             
         return {
-            "total_members": total_members,
-            "active_members": active_members,
-            "available_members": available_members,
-            "members_on_calls": len([m for m in self.team_members.values() if m.is_on_call]),
+            "total_members": stats.total_members,
+            "active_members": stats.active_members,
+            "available_members": stats.available_members,
+            "members_on_calls": stats.members_on_calls,
             "role_distribution": role_counts,
             "skill_distribution": skill_counts,
             "team_statistics": team_stats
@@ -222,24 +292,14 @@ class TeamService:
         
     def get_available_team_members(self, skill_filter: Optional[List[str]] = None) -> List[TeamMember]:
         """Get available team members, optionally filtered by skills"""
-        available = [
-            member for member in self.team_members.values()
-            if member.is_available_for_call()
-        ]
-        
-        if skill_filter:
-            available = [
-                member for member in available
-                if any(skill in member.skills for skill in skill_filter)
-            ]
-            
-        return available
+        return self.assignment_index.available(skill_filter)
         
     def add_skill_to_member(self, member_id: str, skill: str) -> bool:
         """Add a skill to a team member"""
         member = self.team_members.get(member_id)
         if member:
             member.add_skill(skill)
+            self._reindex_member(member)
             logger.info(f"Added skill '{skill}' to {member.name}")
             return True
         return False
@@ -250,44 +310,34 @@ class TeamService:
         if member:
             # Simple average update (in production, would use weighted average)
             member.rating = (member.rating + rating) / 2
+            self.statistics.update(member)
             logger.info(f"Updated {member.name} rating to {member.rating}")
             return True
         return False
         
     def get_performance_leaderboard(self, metric: str = "total_calls_handled", limit: int = 10) -> List[Dict[str, Any]]:
         """Get performance leaderboard"""
-        members_data = []
-        
-        for member in self.team_members.values():
-            members_data.append({
+        return [
+            {
                 "id": member.id,
                 "name": member.name,
                 "total_calls_handled": member.total_calls_handled,
                 "avg_response_time": member.avg_response_time,
                 "rating": member.rating,
                 "current_calls": member.current_calls
-            })
-            
-        # Sort by specified metric
-        reverse_order = metric != "avg_response_time"  # Lower response time is better
-        members_data.sort(key=lambda x: x[metric], reverse=reverse_order)
-        
-        return members_data[:limit]
+            }
+            for member in self.statistics.leaderboard(metric, limit)
+        ]
         
     def check_workload_balance(self) -> Dict[str, Any]:
         """Check workload balance across team members"""
-        active_members = [
-            member for member in self.team_members.values()
-            if member.status == TeamStatus.ACTIVE
-        ]
-        
-        if not active_members:
+        workload = self.statistics.workload()
+        if not workload:
             return {"status": "no_active_members", "message": "No active team members"}
             
-        current_calls = [member.current_calls for member in active_members]
-        avg_calls = sum(current_calls) / len(current_calls)
-        max_calls = max(current_calls)
-        min_calls = min(current_calls)
+        avg_calls = workload["average_calls_per_member"]
+        max_calls = workload["max_calls"]
+        min_calls = workload["min_calls"]
         
         # Check if workload is balanced (difference less than 2 calls)
         is_balanced = (max_calls - min_calls) <= 2
@@ -297,7 +347,7 @@ class TeamService:
             "average_calls_per_member": avg_calls,
             "max_calls": max_calls,
             "min_calls": min_calls,
-            "active_members": len(active_members),
+            "active_members": workload["active_members"],
             "recommendation": self._get_workload_recommendation(is_balanced, avg_calls, max_calls)
         }
         
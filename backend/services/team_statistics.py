@@ -0,0 +1,139 @@
+"""
+Team Statistics
+Running counters and leaderboards for TeamService, updated whenever a member
+is created or changes (status, calls, skills, rating), so statistics are
+O(teams + roles + skills) and a top-k leaderboard is O(k) instead of a pass
+and a full sort over every member per request.
+"""
+
+from bisect import bisect_left, insort
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+from backend.app.models.team import TeamStatus
+
+# Leaderboard metric -> True when higher is better
+LEADERBOARD_METRICS = {
+    "total_calls_handled": True,
+    "avg_response_time": False,  # Lower response time is better
+    "rating": True,
+    "current_calls": True,
+}
+
+
+class TeamStatistics:
+    """
+    Incrementally maintained member counters and per-metric rankings
+
+    Each member's last counted state is remembered, so update() subtracts
+    the old contribution and adds the new one. Leaderboards are sorted
+    lists of (sort value, creation order, member id): ties keep creation
+    order, like the stable sort they replace.
+    """
+
+    def __init__(self):
+        self.total_members = 0
+        self.active_members = 0  # Any status but offline
+        self.available_members = 0
+        self.members_on_calls = 0
+        self.role_counts: Counter = Counter()
+        self.skill_counts: Counter = Counter()
+        self.team_active: Counter = Counter()
+        self.team_available: Counter = Counter()
+
+        # Workload of members in ACTIVE status: count, call sum, members per call count
+        self.working_members = 0
+        self.working_calls = 0
+        self.working_load: Counter = Counter()
+
+        self._counted: Dict[str, Tuple] = {}
+        self._order: Dict[str, int] = {}
+        self._members: Dict[str, Any] = {}
+        self._boards: Dict[str, List[Tuple]] = {metric: [] for metric in LEADERBOARD_METRICS}
+        self._ranked: Dict[str, Dict[str, Tuple]] = {metric: {} for metric in LEADERBOARD_METRICS}
+
+    @staticmethod
+    def _snapshot(member) -> Tuple:
+        return (
+            member.status,
+            member.is_available_for_call(),
+            member.is_on_call,
+            member.role.value,
+            tuple(member.skills),
+            member.team_id,
+            member.current_calls,
+        )
+
+    def _apply(self, snapshot: Tuple, sign: int):
+        status, available, on_call, role, skills, team_id, current_calls = snapshot
+        active = status != TeamStatus.OFFLINE
+        self.active_members += sign * active
+        self.available_members += sign * available
+        self.members_on_calls += sign * on_call
+        self.role_counts[role] += sign
+        for skill in skills:
+            self.skill_counts[skill] += sign
+        if team_id:
+            self.team_active[team_id] += sign * active
+            self.team_available[team_id] += sign * available
+        if status == TeamStatus.ACTIVE:
+            self.working_members += sign
+            self.working_calls += sign * current_calls
+            self.working_load[current_calls] += sign
+
+    def update(self, member):
+        """Count a new member, or re-count one after any change"""
+        previous = self._counted.get(member.id)
+        if previous is None:
+            self.total_members += 1
+            self._order[member.id] = len(self._order)
+            self._members[member.id] = member
+        else:
+            self._apply(previous, -1)
+        snapshot = self._snapshot(member)
+        self._apply(snapshot, 1)
+        self._counted[member.id] = snapshot
+
+        for metric, higher_is_better in LEADERBOARD_METRICS.items():
+            value = getattr(member, metric)
+            entry = (-value if higher_is_better else value, self._order[member.id], member.id)
+            ranked = self._ranked[metric]
+            old_entry = ranked.get(member.id)
+            if old_entry == entry:
+                continue
+            board = self._boards[metric]
+            if old_entry is not None:
+                del board[bisect_left(board, old_entry)]
+            insort(board, entry)
+            ranked[member.id] = entry
+
+    def leaderboard(self, metric: str, limit: int) -> List:
+        """
+        Best `limit` members by a metric
+
+        Raises:
+            KeyError: Unknown metric
+        """
+        return [self._members[member_id] for _, _, member_id in self._boards[metric][:limit]]
+
+    def team_counts(self, team_id: str) -> Tuple[int, int]:
+        """(active, available) members of a team"""
+        return self.team_active[team_id], self.team_available[team_id]
+
+    def distributions(self) -> Tuple[Dict[str, int], Dict[str, int]]:
+        """(role counts, skill counts), without zero entries"""
+        return (
+            {role: count for role, count in self.role_counts.items() if count},
+            {skill: count for skill, count in self.skill_counts.items() if count},
+        )
+
+    def workload(self) -> Optional[Dict[str, Any]]:
+        """Call load across ACTIVE members, None if there are none"""
+        if not self.working_members:
+            return None
+        loads = [calls for calls, count in self.working_load.items() if count]
+        return {
+            "active_members": self.working_members,
+            "average_calls_per_member": self.working_calls / self.working_members,
+            "max_calls": max(loads),
+            "min_calls": min(loads),
+        }
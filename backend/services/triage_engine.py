@@ -5,6 +5,8 @@ from models.emergency_schema import (
     TriageResult, EmergencyType, SeverityLevel, EmergencyService
 )
 from services.ollama_triage_service import ollama_triage_service
+from utils.tracing import tracer
+from utils.metrics_registry import metrics
 
 logger = logging.getLogger(__name__)
 
@@ -13,10 +15,14 @@ class TriageEngine:
     def __init__(self):
         """Initialize Triage Engine with Ollama-based processing"""
         self.ollama_service = ollama_triage_service
-        # Processing time tracking
-        self.processing_times = []
+        # Processing time tracking (fixed-memory histogram)
+        self.latency = metrics.histogram(
+            "triage_engine_latency_ms",
+            "End-to-end triage engine latency in milliseconds"
+        )
         logger.info("🤖 TriageEngine initialized with Ollama-based processing (RAPID-100 Model)")
     
+    @tracer.traced("triage.process")
     async def process(self, transcript: str) -> TriageResult:
         """
         Main triage processing pipeline using Ollama AI model
@@ -31,8 +37,8 @@ class TriageEngine:
         start_time = time.time()
         
         try:
-            logger.info(f"🚀 Processing emergency transcript with Ollama...")
-            logger.debug(f"   Input: {transcript[:100]}...")
+            logger.info("🚀 Processing emergency transcript with Ollama...")
+            logger.debug("   Input: %.100s...", transcript)
             
             # Single unified call to Ollama AI for complete triage
             # Replaces: classification + severity + routing + summary in ONE call
@@ -40,17 +46,17 @@ class TriageEngine:
             
             # Track processing time
             processing_time = triage_result.processing_time_ms
-            self.processing_times.append(processing_time)
+            self.latency.labels().record(processing_time)
             
             # Log results
-            logger.info(f"✅ Triage Results:")
-            logger.info(f"   📍 Type: {triage_result.emergency_type.value}")
-            logger.info(f"   🔴 Severity: {triage_result.severity_level.value} (Score: {triage_result.severity_score})")
-            logger.info(f"   🏥 Service: {triage_result.assigned_service.value}")
-            logger.info(f"   ⚡ Priority: {triage_result.priority}/10")
+            logger.info("✅ Triage Results:")
+            logger.info("   📍 Type: %s", triage_result.emergency_type.value)
+            logger.info("   🔴 Severity: %s (Score: %s)", triage_result.severity_level.value, triage_result.severity_score)
+            logger.info("   🏥 Service: %s", triage_result.assigned_service.value)
+            logger.info("   ⚡ Priority: %s/10", triage_result.priority)
             logger.info(f"   🎯 Confidence: {triage_result.confidence:.2%}")
-            logger.info(f"   ⏱️  Processing: {processing_time:.2f}ms")
-            logger.info(f"   📝 Summary: {triage_result.summary}")
+            logger.info("   ⏱️  Processing: %.2fms", processing_time)
+            logger.info("   📝 Summary: %s", triage_result.summary)
             
             return triage_result
             
@@ -84,12 +90,17 @@ class TriageEngine:
             Dictionary with processing statistics
         """
         stats = self.ollama_service.get_stats()
+        window = self.latency.labels().snapshot()
         return {
             "engine": "Ollama AI (RAPID-100)",
             "total_processed": stats['total_calls'],
             "average_time_ms": stats['avg_ms'],
             "min_time_ms": stats['min_ms'],
             "max_time_ms": stats['max_ms'],
+            "p50_time_ms": window['p50'],
+            "p90_time_ms": window['p90'],
+            "p99_time_ms": window['p99'],
+            "p999_time_ms": window['p999'],
             "model_name": self.ollama_service.model_name,
             "performance_summary": f"{stats['avg_ms']:.2f}ms average latency"
         }
@@ -110,15 +121,15 @@ class TriageEngine:
             return False
         
         if result.confidence < 0.3:
-            logger.warning(f"Low confidence in triage result: {result.confidence}")
+            logger.warning("Low confidence in triage result: %s", result.confidence)
         
         if result.severity_score < 0 or result.severity_score > 100:
-            logger.warning(f"Invalid severity score: {result.severity_score}")
+            logger.warning("Invalid severity score: %s", result.severity_score)
             return False
         
         # Check severity level matches score ranges
         if result.severity_level == SeverityLevel.LEVEL_1 and result.severity_score < 80:
-            logger.warning(f"LEVEL_1 severity but score {result.severity_score} < 80")
+            logger.warning("LEVEL_1 severity but score %s < 80", result.severity_score)
         
         return True
 
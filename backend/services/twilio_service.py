@@ -1,84 +1,90 @@
 from twilio.twiml.voice_response import VoiceResponse, Gather, Record
-from typing import Optional
+from typing import Dict, Optional
 from config import settings
 from models.emergency_schema import TriageResult
 from services.ollama_response_generator import ollama_response_generator
+from utils.tracing import tracer
+from utils.twiml import TwimlTemplate, element, gather, say, say_slot
 import logging
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_ERROR_MESSAGE = "I'm sorry, I'm experiencing technical difficulties"
+
+
 class TwilioService:
     def __init__(self):
         self.ai_voice = settings.AI_ASSISTANT_VOICE
+        self.templates = self._compile_templates()
     
-    def generate_emergency_speech_response(self) -> str:
-        """Generate emergency triage TwiML response using Twilio's free speech recognition"""
-        response = VoiceResponse()
-        
-        # Create gather to capture user speech using Twilio's free speech recognition
-        gather = Gather(
-            input='speech',
-            timeout=settings.SPEECH_TIMEOUT,
-            action='/api/voice/process',
-            method='POST',
-            language='en-US',
-            speech_timeout=5,  # Wait 5 seconds for speech
-            speech_model='phone_call'  # Optimized for phone calls
-        )
-        
-        emergency_message = "Emergency services. Please describe your emergency clearly and calmly."
-        gather.say(emergency_message, voice=self.ai_voice, language='en-US')
-        
-        response.append(gather)
-        
-        # If no speech detected, try again
-        response.say("I didn't catch that. Please state your emergency now.", voice=self.ai_voice, language='en-US')
-        
-        # Final fallback
-        response.say("If you need immediate assistance, please call back. Goodbye.", voice=self.ai_voice, language='en-US')
-        response.hangup()
-        
-        return str(response)
+    def _compile_templates(self) -> Dict[str, TwimlTemplate]:
+        """
+        TwiML for every fixed-shape response, compiled once at startup
+
+        Responses without slots are encoded to bytes here and served as-is;
+        the others only escape and splice in their slot values per call.
+        """
+        voice = self.ai_voice
+        hangup = element("Hangup", {})
+        process = {"action": "/api/voice/process", "timeout": settings.SPEECH_TIMEOUT}
+        phone_call = {"speech_timeout": 5, "speech_model": "phone_call"}  # Wait 5 seconds for speech; model optimized for phone calls
+        welcome_message = f"Hello! This is {settings.AI_ASSISTANT_NAME}, your AI assistant. How can I help you today?"
+        return {
+            "emergency_speech": TwimlTemplate(
+                gather(say("Emergency services. Please describe your emergency clearly and calmly.", voice), **process, **phone_call)
+                + say("I didn't catch that. Please state your emergency now.", voice)
+                + say("If you need immediate assistance, please call back. Goodbye.", voice)
+                + hangup
+            ),
+            "emergency_retry": TwimlTemplate(
+                gather(say("Please describe your emergency. What services do you need?", voice), **process, **phone_call)
+                + say("Emergency recorded. Assistance is being dispatched.", voice)
+                + hangup
+            ),
+            "emergency_confirmation": TwimlTemplate(say("Emergency recorded. Assistance is being dispatched.", voice) + hangup),
+            "welcome": TwimlTemplate(
+                gather(say(welcome_message, voice) + say("I didn't catch that. How can I help you?", voice), **process)
+                + say("Thank you for calling. Goodbye!", voice)
+                + hangup
+            ),
+            "conversation": TwimlTemplate(
+                gather(say_slot("message", voice), **process) + say("Thank you for calling. Goodbye!", voice) + hangup
+            ),
+            "error": TwimlTemplate(say_slot("message", voice) + say("Please try again later. Goodbye!", voice) + hangup),
+            "error_default": TwimlTemplate(say(DEFAULT_ERROR_MESSAGE, voice) + say("Please try again later. Goodbye!", voice) + hangup),
+            "goodbye": TwimlTemplate(say("Thank you for calling. Have a great day! Goodbye!", voice) + hangup),
+            # Ultra-fast voice route: speaks the triage response, then asks the danger question or closes
+            "ultra_fast_followup": TwimlTemplate(
+                say_slot("message", "alice", language=None)
+                + element("Pause", {"length": 1})
+                + gather(
+                    say("Is the situation more dangerous? Please say yes or no.", "alice", language=None),
+                    action="/voice/ultra-fast/followup", timeout=5, language=None
+                )
+            ),
+            "ultra_fast_final": TwimlTemplate(
+                say_slot("message", "alice", language=None)
+                + element("Pause", {"length": 2})
+                + say("Help is on the way. Stay safe and we will end the call when help arrives.", "alice", language=None)
+            ),
+            "ultra_fast_error": TwimlTemplate(
+                say("I'm having trouble understanding. Please stay on the line for assistance.", "alice", language=None)
+            ),
+        }
     
-    def generate_emergency_retry_response(self) -> str:
-        """Generate retry response for emergency input using speech recognition"""
-        response = VoiceResponse()
-        
-        # Create gather to capture emergency description using speech recognition
-        gather = Gather(
-            input='speech',
-            timeout=settings.SPEECH_TIMEOUT,
-            action='/api/voice/process',
-            method='POST',
-            language='en-US',
-            speech_timeout=5,
-            speech_model='phone_call'
-        )
-        
-        retry_message = "Please describe your emergency. What services do you need?"
-        gather.say(retry_message, voice=self.ai_voice, language='en-US')
-        
-        response.append(gather)
-        
-        # Final fallback
-        response.say("Emergency recorded. Assistance is being dispatched.", voice=self.ai_voice, language='en-US')
-        response.hangup()
-        
-        return str(response)
+    def generate_emergency_speech_response(self) -> bytes:
+        """Emergency triage TwiML using Twilio's free speech recognition (pre-rendered)"""
+        return self.templates["emergency_speech"].render()
     
-    def generate_emergency_confirmation_response(self, triage_result: TriageResult) -> str:
-        """Generate confirmation response after triage processing"""
-        response = VoiceResponse()
-        
-        # Standard emergency confirmation message
-        confirmation_message = "Emergency recorded. Assistance is being dispatched."
-        response.say(confirmation_message, voice=self.ai_voice, language='en-US')
-        
-        # End call
-        response.hangup()
-        
-        return str(response)
+    def generate_emergency_retry_response(self) -> bytes:
+        """Retry response for emergency input using speech recognition (pre-rendered)"""
+        return self.templates["emergency_retry"].render()
+    
+    def generate_emergency_confirmation_response(self, triage_result: TriageResult) -> bytes:
+        """Confirmation response after triage processing (pre-rendered)"""
+        return self.templates["emergency_confirmation"].render()
     
+    @tracer.traced("twiml.render")
     def generate_emergency_safety_response(self, triage_result) -> str:
         """Generate enhanced emergency response with personalized safety instructions"""
         response = VoiceResponse()
@@ -227,75 +233,32 @@ class TwilioService:
         else:
             return "Your situation has been recorded. Help will arrive soon."
     
-    def generate_welcome_response(self) -> str:
-        """Generate initial TwiML response for incoming call"""
-        response = VoiceResponse()
-        
-        # Create gather to capture user speech
-        gather = Gather(
-            input='speech',
-            timeout=settings.SPEECH_TIMEOUT,
-            action='/api/voice/process',
-            method='POST',
-            language='en-US'
-        )
-        
-        welcome_message = f"Hello! This is {settings.AI_ASSISTANT_NAME}, your AI assistant. How can I help you today?"
-        gather.say(welcome_message, voice=self.ai_voice, language='en-US')
-        
-        # If no input received, ask again
-        gather.say("I didn't catch that. How can I help you?", voice=self.ai_voice, language='en-US')
-        
-        response.append(gather)
-        
-        # If no speech detected after timeout, end call
-        response.say("Thank you for calling. Goodbye!", voice=self.ai_voice, language='en-US')
-        response.hangup()
-        
-        return str(response)
+    def generate_welcome_response(self) -> bytes:
+        """Initial TwiML response for an incoming call (pre-rendered)"""
+        return self.templates["welcome"].render()
     
-    def generate_conversation_response(self, ai_response: str) -> str:
-        """Generate TwiML response with AI speaking"""
-        response = VoiceResponse()
-        
-        # Create gather for next user input
-        gather = Gather(
-            input='speech',
-            timeout=settings.SPEECH_TIMEOUT,
-            action='/api/voice/process',
-            method='POST',
-            language='en-US'
-        )
-        
-        # Say AI response
-        gather.say(ai_response, voice=self.ai_voice, language='en-US')
-        
-        response.append(gather)
-        
-        # If no speech detected, say goodbye
-        response.say("Thank you for calling. Goodbye!", voice=self.ai_voice, language='en-US')
-        response.hangup()
-        
-        return str(response)
+    def generate_conversation_response(self, ai_response: str) -> bytes:
+        """TwiML response with AI speaking (the response text is escaped)"""
+        return self.templates["conversation"].render(message=ai_response)
     
-    def generate_error_response(self, error_message: str = "I'm sorry, I'm experiencing technical difficulties") -> str:
-        """Generate TwiML response for error cases"""
-        response = VoiceResponse()
-        
-        response.say(error_message, voice=self.ai_voice, language='en-US')
-        response.say("Please try again later. Goodbye!", voice=self.ai_voice, language='en-US')
-        response.hangup()
-        
-        return str(response)
+    def generate_error_response(self, error_message: str = DEFAULT_ERROR_MESSAGE) -> bytes:
+        """TwiML response for error cases (pre-rendered for the default message)"""
+        if error_message == DEFAULT_ERROR_MESSAGE:
+            return self.templates["error_default"].render()
+        return self.templates["error"].render(message=error_message)
     
-    def generate_goodbye_response(self) -> str:
-        """Generate TwiML response for ending call"""
-        response = VoiceResponse()
-        
-        response.say("Thank you for calling. Have a great day! Goodbye!", voice=self.ai_voice, language='en-US')
-        response.hangup()
-        
-        return str(response)
+    def generate_goodbye_response(self) -> bytes:
+        """TwiML response for ending call (pre-rendered)"""
+        return self.templates["goodbye"].render()
+    
+    def generate_ultra_fast_voice_response(self, voice_response: str, awaiting_followup: bool) -> bytes:
+        """Ultra-fast route TwiML: speak the triage response, then ask the danger question or close (text is escaped)"""
+        template = self.templates["ultra_fast_followup" if awaiting_followup else "ultra_fast_final"]
+        return template.render(message=voice_response)
+    
+    def generate_ultra_fast_error_response(self) -> bytes:
+        """Ultra-fast route fallback (pre-rendered)"""
+        return self.templates["ultra_fast_error"].render()
 
 
 # Global instance
@@ -8,6 +8,8 @@ from fastapi import FastAPI
 
 from config import settings
 from models.database import CallRecord, CallStatus
+from utils.tracing import tracer
+from utils.metrics_registry import metrics
 
 logger = logging.getLogger(__name__)
 
@@ -31,6 +33,15 @@ class WebSocketService:
         
         # Connected clients
         self.connected_clients: Dict[str, Dict[str, Any]] = {}
+        self.clients_gauge = metrics.gauge(
+            "websocket_connected_clients",
+            "Currently connected Socket.IO clients"
+        )
+        self.messages_sent = metrics.counter(
+            "websocket_messages_total",
+            "Socket.IO messages emitted by event",
+            ("event",)
+        )
         
         logger.info("WebSocket service initialized")
     
@@ -47,9 +58,10 @@ class WebSocketService:
                 'user_agent': environ.get('HTTP_USER_AGENT', 'unknown')
             }
             self.connected_clients[sid] = client_info
+            self.clients_gauge.inc()
             
             logger.info(f"WebSocket client connected: {sid}")
-            await self.sio.emit('connected', {'message': 'Connected to HackAura WebSocket'}, room=sid)
+            await self._emit('connected', {'message': 'Connected to HackAura WebSocket'}, room=sid)
             
             # Send current stats to newly connected client
             await self.broadcast_stats_update()
@@ -59,25 +71,27 @@ class WebSocketService:
             """Handle client disconnection"""
             if sid in self.connected_clients:
                 del self.connected_clients[sid]
+                self.clients_gauge.dec()
             logger.info(f"WebSocket client disconnected: {sid}")
         
         @self.sio.event
         async def subscribe_calls(sid, data):
             """Subscribe to call updates"""
             logger.info(f"Client {sid} subscribed to call updates")
-            await self.sio.emit('subscribed', {'type': 'calls'}, room=sid)
+            await self._emit('subscribed', {'type': 'calls'}, room=sid)
         
         @self.sio.event
         async def subscribe_analytics(sid, data):
             """Subscribe to analytics updates"""
             logger.info(f"Client {sid} subscribed to analytics updates")
-            await self.sio.emit('subscribed', {'type': 'analytics'}, room=sid)
+            await self._emit('subscribed', {'type': 'analytics'}, room=sid)
         
         @self.sio.event
         async def ping(sid, data):
             """Handle ping for connection health check"""
-            await self.sio.emit('pong', {'timestamp': datetime.utcnow().isoformat()}, room=sid)
+            await self._emit('pong', {'timestamp': datetime.utcnow().isoformat()}, room=sid)
     
+    @tracer.traced("websocket.broadcast")
     async def broadcast_new_call(self, call: CallRecord):
         """Broadcast new call to all connected clients"""
         if not self.sio:
@@ -100,7 +114,7 @@ class WebSocketService:
                 'priority': call.priority
             }
             
-            await self.sio.emit('new_call', call_data)
+            await self._emit('new_call', call_data)
             logger.info(f"Broadcasted new call {call.id} to {len(self.connected_clients)} clients")
             
         except Exception as e:
@@ -120,7 +134,7 @@ class WebSocketService:
                 'updated_at': call.updated_at.isoformat() if call.updated_at else None
             }
             
-            await self.sio.emit('call_update', call_data)
+            await self._emit('call_update', call_data)
             logger.info(f"Broadcasted call update {call.id} to {len(self.connected_clients)} clients")
             
         except Exception as e:
@@ -145,7 +159,7 @@ class WebSocketService:
                 'timestamp': datetime.utcnow().isoformat()
             }
             
-            await self.sio.emit('stats_update', stats)
+            await self._emit('stats_update', stats)
             logger.debug(f"Broadcasted stats update to {len(self.connected_clients)} clients")
             
         except Exception as e:
@@ -162,7 +176,7 @@ class WebSocketService:
             analytics_data = database_service.get_analytics()
             analytics_data['timestamp'] = datetime.utcnow().isoformat()
             
-            await self.sio.emit('analytics_update', analytics_data)
+            await self._emit('analytics_update', analytics_data)
             logger.info(f"Broadcasted analytics update to {len(self.connected_clients)} clients")
             
         except Exception as e:
@@ -182,12 +196,17 @@ class WebSocketService:
                 'timestamp': datetime.utcnow().isoformat()
             }
             
-            await self.sio.emit('notification', notification)
+            await self._emit('notification', notification)
             logger.info(f"Sent notification: {notification_type}")
             
         except Exception as e:
             logger.error(f"Failed to send notification: {e}")
     
+    async def _emit(self, event: str, data: Any, room: str = None):
+        """Emit an event and count it"""
+        await self.sio.emit(event, data, room=room)
+        self.messages_sent.inc(event=event)
+    
     def get_connected_clients_count(self) -> int:
         """Get number of connected clients"""
         return len(self.connected_clients)
@@ -0,0 +1,137 @@
+"""
+Local stand-in for an OTLP/HTTP trace collector, plus a latency breakdown
+report for traces captured by the "file" exporter.
+
+Usage examples:
+
+# Receive spans from the backend (TRACING_EXPORTER=otlp) and store them:
+python trace_collector.py --port 4318 --output traces.ndjson
+
+# Per-stage latency breakdown of captured spans:
+python trace_collector.py --summarize traces.ndjson
+
+Notes:
+- Only the OTLP JSON encoding is accepted (that is what utils/tracing.py sends).
+- Stored spans use the same NDJSON layout as the file exporter, so both can
+  be summarized the same way.
+"""
+
+import argparse
+import json
+import logging
+import threading
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger("trace_collector")
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+
+def _attribute_value(value: dict):
+    for key in ("stringValue", "boolValue", "doubleValue"):
+        if key in value:
+            return value[key]
+    if "intValue" in value:
+        return int(value["intValue"])
+    return None
+
+
+def otlp_to_spans(payload: dict):
+    """Flatten an OTLP ExportTraceServiceRequest into file-exporter span dicts"""
+    for resource_spans in payload.get("resourceSpans", []):
+        for scope_spans in resource_spans.get("scopeSpans", []):
+            for span in scope_spans.get("spans", []):
+                start_ns = int(span["startTimeUnixNano"])
+                end_ns = int(span["endTimeUnixNano"])
+                yield {
+                    "trace_id": span["traceId"],
+                    "span_id": span["spanId"],
+                    "parent_id": span.get("parentSpanId"),
+                    "name": span["name"],
+                    "start_ns": start_ns,
+                    "end_ns": end_ns,
+                    "duration_ms": round((end_ns - start_ns) / 1_000_000, 3),
+                    "status": "ERROR" if span.get("status", {}).get("code") == 2 else "OK",
+                    "attributes": {a["key"]: _attribute_value(a["value"]) for a in span.get("attributes", [])},
+                }
+
+
+def make_handler(output_path: str):
+    write_lock = threading.Lock()
+
+    class CollectorHandler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            if self.path != "/v1/traces":
+                self.send_error(404)
+                return
+            try:
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                spans = list(otlp_to_spans(json.loads(body)))
+            except (ValueError, KeyError) as e:
+                self.send_error(400, f"Invalid OTLP JSON payload: {e}")
+                return
+
+            with write_lock, open(output_path, "a") as f:
+                for span in spans:
+                    f.write(json.dumps(span) + "\n")
+            for span in spans:
+                if span["parent_id"] is None:
+                    logger.info(f"{span['trace_id'][:8]} {span['name']} {span['duration_ms']:.2f}ms")
+
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.end_headers()
+            self.wfile.write(b"{}")
+
+        def log_message(self, format, *args):
+            pass
+
+    return CollectorHandler
+
+
+def summarize(path: str):
+    """Print count / mean / p50 / p95 / max per span name"""
+    durations = defaultdict(list)
+    traces = set()
+    with open(path) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            span = json.loads(line)
+            durations[span["name"]].append(span["duration_ms"])
+            traces.add(span["trace_id"])
+
+    print(f"{len(traces)} traces, {sum(len(v) for v in durations.values())} spans\n")
+    print(f"{'span':<28}{'count':>8}{'mean':>10}{'p50':>10}{'p95':>10}{'max':>10}")
+    for name, values in sorted(durations.items(), key=lambda item: -sum(item[1])):
+        values.sort()
+        p50 = values[len(values) // 2]
+        p95 = values[min(len(values) - 1, int(len(values) * 0.95))]
+        mean = sum(values) / len(values)
+        print(f"{name:<28}{len(values):>8}{mean:>10.2f}{p50:>10.2f}{p95:>10.2f}{values[-1]:>10.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local OTLP/HTTP trace collector")
+    parser.add_argument("--host", default="127.0.0.1", help="Address to listen on")
+    parser.add_argument("--port", type=int, default=4318, help="Port to listen on (OTLP/HTTP default 4318)")
+    parser.add_argument("--output", default="traces.ndjson", help="NDJSON file receiving spans")
+    parser.add_argument("--summarize", metavar="FILE", help="Print a latency breakdown of FILE and exit")
+    args = parser.parse_args()
+
+    if args.summarize:
+        summarize(args.summarize)
+        return
+
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(args.output))
+    logger.info(f"Collecting spans on http://{args.host}:{args.port}/v1/traces -> {args.output}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
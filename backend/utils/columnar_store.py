@@ -0,0 +1,297 @@
+"""
+Columnar Call Detail Store
+Analytics detail rows kept as parallel typed arrays instead of one dict per
+call: numeric columns in array.array, timestamps as epoch seconds and
+low-cardinality strings (call type, outcome, team member, location)
+dictionary-encoded to small integer codes. Filters and aggregates run as
+C-level passes (map/compress/sum) over column slices.
+"""
+
+import bisect
+import math
+import operator
+import sys
+from array import array
+from collections import Counter
+from datetime import datetime, timezone
+from itertools import compress, repeat
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+_NAN = float("nan")
+_MISSING_CODE = -1
+
+
+class DictionaryColumn:
+    """String column stored as int32 codes into a table of distinct values (None is -1)"""
+
+    __slots__ = ("codes", "values", "_index")
+
+    def __init__(self):
+        self.codes = array("i")
+        self.values: List[str] = []
+        self._index: Dict[str, int] = {}
+
+    def encode(self, value: Optional[str]) -> int:
+        if value is None:
+            return _MISSING_CODE
+        code = self._index.get(value)
+        if code is None:
+            code = len(self.values)
+            self._index[value] = code
+            self.values.append(value)
+        return code
+
+    def code_of(self, value: Optional[str]) -> Optional[int]:
+        """Code for an existing value, or None if it never occurred"""
+        if value is None:
+            return _MISSING_CODE
+        return self._index.get(value)
+
+    def decode(self, code: int) -> Optional[str]:
+        return None if code == _MISSING_CODE else self.values[code]
+
+    def append(self, value: Optional[str]):
+        self.codes.append(self.encode(value))
+
+    def __getitem__(self, row: int) -> Optional[str]:
+        return self.decode(self.codes[row])
+
+    def nbytes(self) -> int:
+        return self.codes.itemsize * len(self.codes)
+
+
+def _optional_number(value: float):
+    # NaN marks a missing value; whole numbers come back as int like they went in
+    if math.isnan(value):
+        return None
+    return int(value) if value.is_integer() else value
+
+
+def _isoformat(timestamp: float) -> str:
+    # Same naive-UTC layout as datetime.utcnow().isoformat()
+    return datetime.fromtimestamp(timestamp, timezone.utc).replace(tzinfo=None).isoformat()
+
+
+class CallDetailStore:
+    """
+    Append-only columnar table of call detail rows
+
+    Rows are expected roughly in time order; range queries bisect the
+    timestamp column, so out-of-order rows are only found by full scans.
+    Row numbers are stable, so a call_sid -> row index gives O(1) lookups
+    and the newest calls are simply the last rows.
+    """
+
+    CATEGORICAL = ("call_type", "outcome", "team_member_id", "caller_location")
+
+    def __init__(self):
+        self.call_sid: List[str] = []
+        self._row_by_sid: Dict[str, int] = {}  # First row recorded for each call_sid
+        self.timestamp = array("d")       # epoch seconds
+        self.duration = array("q")
+        self.is_emergency = array("b")
+        self.response_time = array("d")   # NaN when unknown
+        self.quality_score = array("d")   # NaN when unrated
+        self.call_type = DictionaryColumn()
+        self.outcome = DictionaryColumn()
+        self.team_member_id = DictionaryColumn()
+        self.caller_location = DictionaryColumn()
+
+    def __len__(self) -> int:
+        return len(self.call_sid)
+
+    def append(
+        self,
+        call_sid: str,
+        timestamp: float,
+        duration: int,
+        is_emergency: bool = False,
+        call_type: str = "standard",
+        outcome: str = "completed",
+        response_time: Optional[int] = None,
+        team_member_id: Optional[str] = None,
+        caller_location: Optional[str] = None,
+        quality_score: Optional[float] = None
+    ) -> int:
+        """
+        Append one call and return its row number
+
+        Every value is converted to its column type before any column is
+        touched, so a value the column cannot hold (e.g. a duration past
+        int64) raises TypeError/OverflowError and leaves the table unchanged.
+        """
+        numbers = (
+            array("d", (timestamp,)),
+            array("q", (duration,)),
+            array("d", (_NAN if response_time is None else response_time,)),
+            array("d", (_NAN if quality_score is None else quality_score,))
+        )
+        strings = (call_type, outcome, team_member_id, caller_location)
+        if not isinstance(call_sid, str) or not all(value is None or isinstance(value, str) for value in strings):
+            raise TypeError("call_sid and categorical columns must be strings")
+
+        row = len(self.call_sid)
+        self._row_by_sid.setdefault(call_sid, row)
+        self.call_sid.append(call_sid)
+        self.timestamp.extend(numbers[0])
+        self.duration.extend(numbers[1])
+        self.is_emergency.append(1 if is_emergency else 0)
+        self.response_time.extend(numbers[2])
+        self.quality_score.extend(numbers[3])
+        self.call_type.append(call_type)
+        self.outcome.append(outcome)
+        self.team_member_id.append(team_member_id)
+        self.caller_location.append(caller_location)
+        return row
+
+    def row(self, i: int) -> Dict[str, Any]:
+        """Materialize one row in the original call_detail dict layout"""
+        return {
+            "call_sid": self.call_sid[i],
+            "duration": self.duration[i],
+            "is_emergency": bool(self.is_emergency[i]),
+            "call_type": self.call_type[i],
+            "outcome": self.outcome[i],
+            "response_time": _optional_number(self.response_time[i]),
+            "team_member_id": self.team_member_id[i],
+            "caller_location": self.caller_location[i],
+            "quality_score": _optional_number(self.quality_score[i]),
+            "timestamp": _isoformat(self.timestamp[i])
+        }
+
+    def rows(self, indices: Iterable[int]) -> List[Dict[str, Any]]:
+        return [self.row(i) for i in indices]
+
+    def find(self, call_sid: str) -> Optional[int]:
+        """Row number of the first row for call_sid"""
+        return self._row_by_sid.get(call_sid)
+
+    def recent(self, limit: int) -> List[int]:
+        """
+        Row numbers of the `limit` newest rows, newest first
+
+        Only the tail is read; it is re-sorted by timestamp to absorb calls
+        that were recorded slightly out of order.
+        """
+        tail = range(max(0, len(self) - limit), len(self))
+        return sorted(tail, key=self.timestamp.__getitem__, reverse=True)
+
+    def time_range(self, start: float, end: float) -> Tuple[int, int]:
+        """Half-open row range [lo, hi) with start <= timestamp <= end"""
+        return bisect.bisect_left(self.timestamp, start), bisect.bisect_right(self.timestamp, end)
+
+    def select(
+        self,
+        lo: int = 0,
+        hi: Optional[int] = None,
+        is_emergency: Optional[bool] = None,
+        **equals: Optional[str]
+    ) -> List[int]:
+        """
+        Row numbers in [lo, hi) matching every given filter
+
+        Args:
+            lo: First row
+            hi: End row (exclusive), defaults to all rows
+            is_emergency: Keep only emergency (True) or non-emergency (False) rows
+            **equals: Exact matches on categorical columns, e.g. outcome="completed"
+
+        Returns:
+            Ascending list of row numbers
+        """
+        hi = len(self) if hi is None else hi
+        masks = []
+        for column_name, value in equals.items():
+            if column_name not in self.CATEGORICAL:
+                raise ValueError(f"Cannot filter on column '{column_name}'")
+            code = getattr(self, column_name).code_of(value)
+            if code is None:
+                return []
+            masks.append(map(operator.eq, getattr(self, column_name).codes[lo:hi], repeat(code)))
+        if is_emergency is not None:
+            masks.append(map(operator.eq, self.is_emergency[lo:hi], repeat(1 if is_emergency else 0)))
+        if not masks:
+            return list(range(lo, hi))
+        mask = masks[0]
+        for other in masks[1:]:
+            mask = map(operator.and_, mask, other)
+        return list(compress(range(lo, hi), mask))
+
+    def aggregate(self, lo: int = 0, hi: Optional[int] = None, rows: Optional[List[int]] = None) -> Dict[str, Any]:
+        """
+        Totals over a contiguous row range, or over explicit row numbers
+
+        Returns:
+            Dictionary with calls, emergencies, duration_total, response_count,
+            response_total, quality_count, quality_total and outcomes
+        """
+        if rows is None:
+            hi = len(self) if hi is None else hi
+            durations = self.duration[lo:hi]
+            emergencies = self.is_emergency[lo:hi]
+            responses = self.response_time[lo:hi]
+            qualities = self.quality_score[lo:hi]
+            outcome_codes = self.outcome.codes[lo:hi]
+        else:
+            durations = [self.duration[i] for i in rows]
+            emergencies = [self.is_emergency[i] for i in rows]
+            responses = [self.response_time[i] for i in rows]
+            qualities = [self.quality_score[i] for i in rows]
+            outcome_codes = [self.outcome.codes[i] for i in rows]
+
+        # NaN != NaN, so comparing a column with itself masks out missing values
+        known_responses = list(compress(responses, map(operator.eq, responses, responses)))
+        known_qualities = list(compress(qualities, map(operator.eq, qualities, qualities)))
+
+        outcome_counts = Counter(outcome_codes)
+
+        return {
+            "calls": len(durations),
+            "emergencies": sum(emergencies),
+            "duration_total": sum(durations),
+            "response_count": len(known_responses),
+            "response_total": sum(known_responses),
+            "quality_count": len(known_qualities),
+            "quality_total": sum(known_qualities),
+            "outcomes": {self.outcome.decode(code): count for code, count in outcome_counts.items()}
+        }
+
+    def to_state(self) -> Dict[str, Any]:
+        """Copy of every column (arrays pickle as raw bytes)"""
+        state = {
+            "call_sid": list(self.call_sid),
+            "timestamp": self.timestamp[:],
+            "duration": self.duration[:],
+            "is_emergency": self.is_emergency[:],
+            "response_time": self.response_time[:],
+            "quality_score": self.quality_score[:],
+        }
+        for name in self.CATEGORICAL:
+            column = getattr(self, name)
+            state[name] = (column.codes[:], list(column.values))
+        return state
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "CallDetailStore":
+        store = cls()
+        store.call_sid = list(state["call_sid"])
+        for name in ("timestamp", "duration", "is_emergency", "response_time", "quality_score"):
+            setattr(store, name, state[name][:])
+        for name in cls.CATEGORICAL:
+            codes, values = state[name]
+            column = getattr(store, name)
+            column.codes = codes[:]
+            column.values = list(values)
+            column._index = {value: code for code, value in enumerate(column.values)}
+        for row, call_sid in enumerate(store.call_sid):
+            store._row_by_sid.setdefault(call_sid, row)
+        return store
+
+    def nbytes(self) -> int:
+        """Approximate memory held by the columns (excluding call_sid strings)"""
+        numeric = sum(
+            column.itemsize * len(column)
+            for column in (self.timestamp, self.duration, self.is_emergency, self.response_time, self.quality_score)
+        )
+        categorical = sum(getattr(self, name).nbytes() for name in self.CATEGORICAL)
+        return numeric + categorical + 8 * len(self.call_sid) + sys.getsizeof(self._row_by_sid)
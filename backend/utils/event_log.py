@@ -0,0 +1,201 @@
+"""
+Append-only Event Log with Snapshots
+Crash-safe persistence for in-memory aggregates. Every event is appended to
+a segment file as a length-prefixed, CRC-checked record; periodic snapshots
+of the aggregate state let startup load the latest snapshot and replay only
+the log tail instead of rebuilding from the database.
+
+Record layout (little endian):
+    u32 payload length | u32 crc32(seq + payload) | u64 seq | payload (JSON)
+
+A torn or corrupt record at the end of the newest segment (crash mid-write)
+is truncated away when the log is opened.
+"""
+
+import json
+import logging
+import os
+import pickle
+import struct
+import threading
+import zlib
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_HEADER = struct.Struct("<IIQ")
+_SEQ = struct.Struct("<Q")
+SEGMENT_SUFFIX = ".log"
+SNAPSHOT_PREFIX = "snapshot-"
+SNAPSHOT_SUFFIX = ".pickle"
+
+
+class CorruptRecordError(Exception):
+    """Raised when a record fails its length or CRC check before the log tail"""
+    pass
+
+
+def _segment_name(first_seq: int) -> str:
+    return f"{first_seq:020d}{SEGMENT_SUFFIX}"
+
+
+def iter_records(path: str) -> Iterator[Tuple[int, bytes, int]]:
+    """Yield (seq, payload, end offset) until the end of the file or the first bad record"""
+    with open(path, "rb") as f:
+        offset = 0
+        while True:
+            header = f.read(_HEADER.size)
+            if len(header) < _HEADER.size:
+                return
+            length, crc, seq = _HEADER.unpack(header)
+            payload = f.read(length)
+            if len(payload) < length or zlib.crc32(payload, zlib.crc32(_SEQ.pack(seq))) != crc:
+                return
+            offset += _HEADER.size + length
+            yield seq, payload, offset
+
+
+class EventLog:
+    """
+    Segmented append-only log of JSON events
+
+    Args:
+        directory: Directory holding the segment and snapshot files
+        segment_bytes: Size after which a new segment file is started
+        fsync: fsync after every append (survives power loss, not just crashes)
+    """
+
+    def __init__(self, directory: str, segment_bytes: int = 64 * 1024 * 1024, fsync: bool = False):
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.fsync = fsync
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+        self.last_seq = 0
+        self._file = None
+        self._recover()
+        # Never reuse sequence numbers a snapshot already covers (e.g. segments deleted by hand)
+        snapshots = self._snapshots()
+        if snapshots:
+            self.last_seq = max(self.last_seq, snapshots[-1][0])
+
+    def _segments(self) -> List[str]:
+        names = sorted(n for n in os.listdir(self.directory) if n.endswith(SEGMENT_SUFFIX))
+        return [os.path.join(self.directory, n) for n in names]
+
+    def _recover(self):
+        """Find the last good record and cut off any torn tail"""
+        segments = self._segments()
+        if not segments:
+            return
+        for path in reversed(segments):
+            end = 0
+            for seq, _, end in iter_records(path):
+                self.last_seq = seq
+            if end != os.path.getsize(path):
+                logger.warning(f"⚠️ Truncating {os.path.getsize(path) - end} torn bytes from {path}")
+                with open(path, "r+b") as f:
+                    f.truncate(end)
+            if self.last_seq:
+                break
+        self._file = open(segments[-1], "ab")
+
+    def _roll_segment(self, first_seq: int):
+        if self._file is not None:
+            self._file.close()
+        self._file = open(os.path.join(self.directory, _segment_name(first_seq)), "ab")
+
+    def append(self, event: Dict[str, Any]) -> int:
+        """Durably append one event and return its sequence number"""
+        payload = json.dumps(event, separators=(",", ":"), default=str).encode("utf-8")
+        with self._lock:
+            seq = self.last_seq + 1
+            if self._file is None or self._file.tell() >= self.segment_bytes:
+                self._roll_segment(seq)
+            crc = zlib.crc32(payload, zlib.crc32(_SEQ.pack(seq)))
+            self._file.write(_HEADER.pack(len(payload), crc, seq) + payload)
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+            self.last_seq = seq
+        return seq
+
+    def read(self, after_seq: int = 0) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """
+        Events with seq > after_seq, oldest first
+
+        Raises:
+            CorruptRecordError: A record in an older segment is damaged
+        """
+        segments = self._segments()
+        # Skip whole segments that end before after_seq (names hold their first seq)
+        starts = [int(os.path.basename(p)[:-len(SEGMENT_SUFFIX)]) for p in segments]
+        first = 0
+        for i, start in enumerate(starts):
+            if start <= after_seq + 1:
+                first = i
+        for i in range(first, len(segments)):
+            path = segments[i]
+            end = 0
+            for seq, payload, end in iter_records(path):
+                if seq > after_seq:
+                    yield seq, json.loads(payload)
+            if i < len(segments) - 1 and end != os.path.getsize(path):
+                raise CorruptRecordError(f"Damaged record in {path} at byte {end}")
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    # Snapshots
+
+    def _snapshots(self) -> List[Tuple[int, str]]:
+        snapshots = []
+        for name in os.listdir(self.directory):
+            if name.startswith(SNAPSHOT_PREFIX) and name.endswith(SNAPSHOT_SUFFIX):
+                seq = int(name[len(SNAPSHOT_PREFIX):-len(SNAPSHOT_SUFFIX)])
+                snapshots.append((seq, os.path.join(self.directory, name)))
+        return sorted(snapshots)
+
+    def write_snapshot(self, seq: int, state: Dict[str, Any], keep: int = 2) -> str:
+        """
+        Atomically write the state as of `seq` and prune older snapshots
+
+        The file is written under a temporary name, fsynced and renamed, so a
+        crash never leaves a half-written snapshot behind.
+        """
+        path = os.path.join(self.directory, f"{SNAPSHOT_PREFIX}{seq:020d}{SNAPSHOT_SUFFIX}")
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump({"seq": seq, "state": state}, f, protocol=pickle.HIGHEST_PROTOCOL)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+        for _, old_path in self._snapshots()[:-keep]:
+            os.remove(old_path)
+        return path
+
+    def load_snapshot(self) -> Tuple[int, Optional[Dict[str, Any]]]:
+        """
+        Newest readable snapshot
+
+        Returns:
+            (seq, state), or (0, None) when there is no usable snapshot
+        """
+        for seq, path in reversed(self._snapshots()):
+            try:
+                # Only snapshots written by write_snapshot() live in this directory
+                with open(path, "rb") as f:
+                    snapshot = pickle.load(f)
+                return snapshot["seq"], snapshot["state"]
+            except Exception as e:
+                logger.warning(f"⚠️ Skipping unreadable snapshot {path}: {e}")
+        return 0, None
+
+    def clear_snapshots(self):
+        for _, path in self._snapshots():
+            os.remove(path)
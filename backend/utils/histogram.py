@@ -0,0 +1,237 @@
+"""
+Streaming Latency Histograms
+Fixed-memory, log-bucketed histograms with sliding-window percentiles.
+Memory depends only on the bucket layout and window length, never on how
+many values were recorded, so they can replace ever-growing lists of
+processing times.
+"""
+
+import math
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_QUANTILES = (0.5, 0.9, 0.99, 0.999)
+
+
+class _Slot:
+    """Counts for one time slice of the sliding window (sparse: bucket -> count)"""
+
+    __slots__ = ("epoch", "counts", "count", "total", "min", "max")
+
+    def __init__(self):
+        self.counts: Dict[int, int] = {}
+        self.reset(-1)
+
+    def reset(self, epoch: int):
+        self.epoch = epoch
+        self.counts.clear()
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+
+class LatencyHistogram:
+    """
+    Log-bucketed latency histogram over a ring of time slots
+
+    Bucket i covers [min_value * g^i, min_value * g^(i+1)) with
+    g = (1 + precision) / (1 - precision), so any reported percentile is
+    within `precision` relative error of the true value. Values below
+    min_value land in the first bucket, values above max_value in the last.
+
+    Args:
+        min_value: Smallest distinguishable value (ms)
+        max_value: Largest distinguishable value (ms)
+        precision: Relative error of reported percentiles
+        slot_seconds: Width of one ring slot
+        slots: Number of slots; the longest window is slot_seconds * slots
+    """
+
+    def __init__(
+        self,
+        min_value: float = 0.01,
+        max_value: float = 120_000.0,
+        precision: float = 0.02,
+        slot_seconds: int = 10,
+        slots: int = 90
+    ):
+        self.min_value = min_value
+        self.max_value = max_value
+        self.slot_seconds = slot_seconds
+        self._growth = (1 + precision) / (1 - precision)
+        self._log_growth = math.log(self._growth)
+        self.bucket_count = int(math.ceil(math.log(max_value / min_value) / self._log_growth)) + 1
+        self._slots = [_Slot() for _ in range(slots)]
+        self._lock = threading.Lock()
+
+        # Lifetime totals (Prometheus _count / _sum, and all-time min/max)
+        self.total_count = 0
+        self.total_sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def _bucket_index(self, value: float) -> int:
+        if value <= self.min_value:
+            return 0
+        index = int(math.log(value / self.min_value) / self._log_growth)
+        return min(index, self.bucket_count - 1)
+
+    def _bucket_value(self, index: int) -> float:
+        # Geometric midpoint of the bucket, which bounds the relative error
+        return self.min_value * self._growth ** (index + 0.5)
+
+    def record(self, value: float, now: Optional[float] = None):
+        """Record one observation (milliseconds)"""
+        epoch = int((now if now is not None else time.time()) // self.slot_seconds)
+        index = self._bucket_index(value)
+        with self._lock:
+            slot = self._slots[epoch % len(self._slots)]
+            if slot.epoch != epoch:
+                slot.reset(epoch)
+            slot.counts[index] = slot.counts.get(index, 0) + 1
+            slot.count += 1
+            slot.total += value
+            if value < slot.min:
+                slot.min = value
+            if value > slot.max:
+                slot.max = value
+
+            self.total_count += 1
+            self.total_sum += value
+            if value < self.min:
+                self.min = value
+            if value > self.max:
+                self.max = value
+
+    @property
+    def window_seconds(self) -> int:
+        """Longest window the ring can answer for"""
+        return self.slot_seconds * len(self._slots)
+
+    def snapshot(
+        self,
+        window_seconds: Optional[int] = None,
+        quantiles: Iterable[float] = DEFAULT_QUANTILES,
+        now: Optional[float] = None
+    ) -> Dict[str, float]:
+        """
+        Summary over the most recent window
+
+        Args:
+            window_seconds: Window length, defaults to the full ring
+            quantiles: Percentiles to report, as fractions
+            now: Reference time (defaults to time.time())
+
+        Returns:
+            Dictionary with count, mean, min, max and p50/p90/... keys
+        """
+        window_seconds = min(window_seconds or self.window_seconds, self.window_seconds)
+        current = int((now if now is not None else time.time()) // self.slot_seconds)
+        oldest = current - max(1, window_seconds // self.slot_seconds) + 1
+
+        merged: Dict[int, int] = {}
+        count, total, low, high = 0, 0.0, math.inf, -math.inf
+        with self._lock:
+            for slot in self._slots:
+                if oldest <= slot.epoch <= current and slot.count:
+                    for i, c in slot.counts.items():
+                        merged[i] = merged.get(i, 0) + c
+                    count += slot.count
+                    total += slot.total
+                    low = min(low, slot.min)
+                    high = max(high, slot.max)
+
+        result = {
+            'window_seconds': window_seconds,
+            'count': count,
+            'mean': total / count if count else 0.0,
+            'min': low if count else 0.0,
+            'max': high if count else 0.0,
+        }
+        for q, value in zip(quantiles, self._quantiles(merged, count, quantiles, low, high)):
+            result[_quantile_key(q)] = value
+        return result
+
+    def _quantiles(self, counts: Dict[int, int], count: int, quantiles: Iterable[float], low: float, high: float) -> List[float]:
+        if not count:
+            return [0.0 for _ in quantiles]
+        ordered = sorted(counts.items())
+        values = []
+        for q in quantiles:
+            rank = max(1, int(math.ceil(q * count)))
+            seen = 0
+            for i, c in ordered:
+                seen += c
+                if seen >= rank:
+                    # Clamp to observed extremes so p0/p100 are exact
+                    values.append(min(max(self._bucket_value(i), low), high))
+                    break
+        return values
+
+    def prometheus_lines(self, name: str, labels: Optional[Dict[str, str]] = None,
+                         quantiles: Iterable[float] = DEFAULT_QUANTILES) -> List[str]:
+        """Samples in Prometheus summary format (windowed quantiles, lifetime sum/count)"""
+        snapshot = self.snapshot(quantiles=quantiles)
+        base = format_labels(labels)
+        lines = []
+        for q in quantiles:
+            quantile_labels = format_labels(dict(labels or {}, quantile=str(q)))
+            lines.append(f"{name}{quantile_labels} {snapshot[_quantile_key(q)]:.6g}")
+        lines.append(f"{name}_sum{base} {self.total_sum!r}")
+        lines.append(f"{name}_count{base} {self.total_count}")
+        return lines
+
+
+class HistogramFamily:
+    """Set of LatencyHistograms sharing a metric name, keyed by label values"""
+
+    def __init__(self, name: str, description: str, label_names: Tuple[str, ...] = (), **histogram_options):
+        self.name = name
+        self.description = description
+        self.label_names = tuple(label_names)
+        self._histogram_options = histogram_options
+        self._children: Dict[Tuple[str, ...], LatencyHistogram] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, **label_values) -> LatencyHistogram:
+        """Histogram for one label combination, created on first use"""
+        key = tuple(str(label_values[label]) for label in self.label_names)
+        histogram = self._children.get(key)
+        if histogram is None:
+            with self._lock:
+                histogram = self._children.setdefault(key, LatencyHistogram(**self._histogram_options))
+        return histogram
+
+    def items(self):
+        for key, histogram in list(self._children.items()):
+            yield dict(zip(self.label_names, key)), histogram
+
+    def snapshot(self, window_seconds: Optional[int] = None) -> List[Dict]:
+        """Per-label-set summaries for JSON stats endpoints"""
+        return [
+            dict(labels, **histogram.snapshot(window_seconds))
+            for labels, histogram in self.items()
+        ]
+
+    def render_prometheus(self) -> str:
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} summary"]
+        for labels, histogram in self.items():
+            lines.extend(histogram.prometheus_lines(self.name, labels))
+        return "\n".join(lines) + "\n"
+
+
+def _quantile_key(q: float) -> str:
+    # 0.5 -> p50, 0.99 -> p99, 0.999 -> p999
+    return "p" + f"{q * 100:g}".replace(".", "")
+
+
+def _escape_label_value(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_labels(labels: Optional[Dict[str, str]]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape_label_value(value)}"' for key, value in labels.items()) + "}"
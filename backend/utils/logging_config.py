@@ -0,0 +1,104 @@
+"""
+Logging Setup
+Request handlers only enqueue log records; a background listener thread does
+the formatting and the console/file I/O so slow disks never stall a webhook
+"""
+
+import atexit
+import logging
+import logging.handlers
+import queue
+from typing import Optional
+from config import settings
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Loggers on the per-call triage path, tuned by LOG_TRIAGE_STEPS / VERBOSE_LOGGING
+TRIAGE_LOGGERS = (
+    'routes.voice',
+    'services.triage_engine',
+    'services.classification_engine',
+    'services.severity_engine',
+    'services.routing_engine',
+    'services.summary_engine',
+    'services.hybrid_triage_service',
+    'services.ollama_triage_service',
+    'services.twilio_service',
+)
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that leaves formatting to the listener thread
+
+    The stock prepare() runs the full Formatter (timestamps, tracebacks) in
+    the calling thread; records never leave the process here, so only the
+    message arguments are merged to snapshot them.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+def triage_log_level() -> int:
+    """
+    Level for the triage loggers
+
+    VERBOSE_LOGGING turns on per-step debug output, LOG_TRIAGE_STEPS keeps the
+    one-line-per-stage summaries, otherwise only warnings and errors are kept.
+    """
+    if settings.VERBOSE_LOGGING:
+        return logging.DEBUG
+    if settings.LOG_TRIAGE_STEPS:
+        return logging.INFO
+    return logging.WARNING
+
+
+def configure_logging(log_file: Optional[str] = 'debug.log') -> logging.handlers.QueueListener:
+    """
+    Install a non-blocking QueueHandler on the root logger
+
+    Args:
+        log_file: File that receives a copy of every record, None to disable
+
+    Returns:
+        The running QueueListener (stopped automatically at exit)
+    """
+    global _listener
+    if _listener is not None:
+        return _listener
+
+    formatter = logging.Formatter(LOG_FORMAT)
+    handlers = [logging.StreamHandler()]  # Console output
+    if log_file:
+        handlers.append(logging.FileHandler(log_file, mode='w'))  # File output
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(DeferredQueueHandler(log_queue))
+    root.setLevel(logging.INFO)
+
+    level = triage_log_level()
+    for name in TRIAGE_LOGGERS:
+        logging.getLogger(name).setLevel(level)
+
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+    return _listener
+
+
+def stop_logging():
+    """Flush queued records and stop the listener thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -0,0 +1,142 @@
+"""
+Metrics Registry
+Central counters, gauges and latency histograms, updated at the point of
+the event and rendered in Prometheus text format by the /metrics endpoint.
+Rendering only walks the registered series, so its cost does not depend on
+how many calls, notifications or team members the services hold.
+"""
+
+import sys
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+from .histogram import HistogramFamily, format_labels
+
+
+class _Metric:
+    """Base for labelled series of float values"""
+
+    metric_type = "untyped"
+
+    def __init__(self, name: str, description: str, label_names: Tuple[str, ...] = ()):
+        self.name = name
+        self.description = description
+        self.label_names = tuple(label_names)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels[label]) for label in self.label_names)
+
+    def _add(self, amount: float, labels: Dict[str, str]):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> List[Tuple[Dict[str, str], float]]:
+        return [(dict(zip(self.label_names, key)), value) for key, value in list(self._values.items())]
+
+    def render_prometheus(self) -> str:
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} {self.metric_type}"]
+        for labels, value in self.samples():
+            lines.append(f"{self.name}{format_labels(labels)} {value!r}")
+        return "\n".join(lines) + "\n"
+
+
+class Counter(_Metric):
+    """Monotonically increasing count"""
+
+    metric_type = "counter"
+
+    def inc(self, amount: float = 1.0, **labels):
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        self._add(amount, labels)
+
+
+class Gauge(_Metric):
+    """Value that can go up and down, or be read from a callback"""
+
+    metric_type = "gauge"
+
+    def __init__(self, name: str, description: str, label_names: Tuple[str, ...] = ()):
+        super().__init__(name, description, label_names)
+        self._functions: Dict[Tuple[str, ...], Callable[[], float]] = {}
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def inc(self, amount: float = 1.0, **labels):
+        self._add(amount, labels)
+
+    def dec(self, amount: float = 1.0, **labels):
+        self._add(-amount, labels)
+
+    def set_function(self, function: Callable[[], float], **labels):
+        """Read the value from `function` at render time (must be O(1))"""
+        self._functions[self._key(labels)] = function
+
+    def value(self, **labels) -> float:
+        function = self._functions.get(self._key(labels))
+        return float(function()) if function else super().value(**labels)
+
+    def samples(self) -> List[Tuple[Dict[str, str], float]]:
+        samples = super().samples()
+        for key, function in list(self._functions.items()):
+            samples.append((dict(zip(self.label_names, key)), float(function())))
+        return samples
+
+
+class MetricsRegistry:
+    """Get-or-create access to named metrics plus Prometheus rendering"""
+
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, name: str, factory: Callable[[], object], expected_type: type):
+        metric = self._metrics.get(name)
+        if metric is None:
+            with self._lock:
+                metric = self._metrics.get(name)
+                if metric is None:
+                    metric = factory()
+                    self._metrics[name] = metric
+        if not isinstance(metric, expected_type):
+            raise ValueError(f"Metric {name} is already registered as {type(metric).__name__}")
+        return metric
+
+    def counter(self, name: str, description: str, label_names: Tuple[str, ...] = ()) -> Counter:
+        return self._get_or_create(name, lambda: Counter(name, description, label_names), Counter)
+
+    def gauge(self, name: str, description: str, label_names: Tuple[str, ...] = ()) -> Gauge:
+        return self._get_or_create(name, lambda: Gauge(name, description, label_names), Gauge)
+
+    def histogram(self, name: str, description: str, label_names: Tuple[str, ...] = (), **histogram_options) -> HistogramFamily:
+        return self._get_or_create(
+            name,
+            lambda: HistogramFamily(name, description, label_names, **histogram_options),
+            HistogramFamily
+        )
+
+    def get(self, name: str) -> Optional[object]:
+        return self._metrics.get(name)
+
+    def render_prometheus(self) -> str:
+        """All registered metrics in Prometheus text exposition format"""
+        return "".join(metric.render_prometheus() for _, metric in sorted(self._metrics.items()))
+
+
+# Global instance
+metrics = MetricsRegistry()
+
+# main.py (run from backend/) loads this module as utils.metrics_registry, the team,
+# notification and emergency services (run from the repository root) as
+# backend.utils.metrics_registry. Whichever loads first is registered under both
+# names, so there is one registry and /metrics serves every series.
+for _name in ("utils.metrics_registry", "backend.utils.metrics_registry"):
+    sys.modules.setdefault(_name, sys.modules[__name__])
@@ -0,0 +1,239 @@
+"""
+Time-bucketed Call Aggregates
+Per-minute and per-hour rings of pre-aggregated call counters, so trend and
+report queries cost O(buckets) instead of a scan over every stored call.
+Memory is fixed by the retention of each ring, never by call volume.
+"""
+
+import math
+import threading
+import time
+from typing import Dict, Optional
+
+
+class CallBucket:
+    """Pre-aggregated counters for the calls that ended in one time bucket"""
+
+    __slots__ = (
+        "epoch", "calls", "emergencies", "duration_total",
+        "response_count", "response_total", "quality_count", "quality_total", "outcomes"
+    )
+
+    def __init__(self, epoch: int = -1):
+        self.outcomes: Dict[str, int] = {}
+        self.reset(epoch)
+
+    def reset(self, epoch: int):
+        self.epoch = epoch
+        self.calls = 0
+        self.emergencies = 0
+        self.duration_total = 0
+        self.response_count = 0
+        self.response_total = 0
+        self.quality_count = 0
+        self.quality_total = 0.0
+        self.outcomes.clear()
+
+    def add_call(
+        self,
+        duration: int,
+        is_emergency: bool,
+        outcome: str,
+        response_time: Optional[int],
+        quality_score: Optional[float]
+    ):
+        self.calls += 1
+        self.duration_total += duration
+        if is_emergency:
+            self.emergencies += 1
+        if response_time is not None:
+            self.response_count += 1
+            self.response_total += response_time
+        if quality_score is not None:
+            self.quality_count += 1
+            self.quality_total += quality_score
+        self.outcomes[outcome] = self.outcomes.get(outcome, 0) + 1
+
+    def merge(self, other: "CallBucket"):
+        self.calls += other.calls
+        self.emergencies += other.emergencies
+        self.duration_total += other.duration_total
+        self.response_count += other.response_count
+        self.response_total += other.response_total
+        self.quality_count += other.quality_count
+        self.quality_total += other.quality_total
+        for outcome, count in other.outcomes.items():
+            self.outcomes[outcome] = self.outcomes.get(outcome, 0) + count
+
+    def to_state(self) -> tuple:
+        return (
+            self.epoch, self.calls, self.emergencies, self.duration_total, self.response_count,
+            self.response_total, self.quality_count, self.quality_total, dict(self.outcomes)
+        )
+
+    @classmethod
+    def from_state(cls, state: tuple) -> "CallBucket":
+        bucket = cls()
+        (bucket.epoch, bucket.calls, bucket.emergencies, bucket.duration_total, bucket.response_count,
+         bucket.response_total, bucket.quality_count, bucket.quality_total, outcomes) = state
+        bucket.outcomes.update(outcomes)
+        return bucket
+
+    @property
+    def avg_duration(self) -> float:
+        return self.duration_total / self.calls if self.calls else 0
+
+    @property
+    def avg_response_time(self) -> float:
+        return self.response_total / self.response_count if self.response_count else 0
+
+    @property
+    def avg_quality(self) -> float:
+        return self.quality_total / self.quality_count if self.quality_count else 0
+
+
+class BucketRing:
+    """
+    Fixed ring of CallBuckets, bucket i holding epoch e where e % buckets == i
+
+    Args:
+        bucket_seconds: Width of one bucket
+        buckets: Number of buckets; retention is bucket_seconds * buckets
+    """
+
+    def __init__(self, bucket_seconds: int, buckets: int):
+        self.bucket_seconds = bucket_seconds
+        self._buckets = [CallBucket() for _ in range(buckets)]
+        self._lock = threading.Lock()
+
+    @property
+    def retention_seconds(self) -> int:
+        return self.bucket_seconds * len(self._buckets)
+
+    def epoch_of(self, timestamp: float) -> int:
+        return int(timestamp // self.bucket_seconds)
+
+    def oldest_epoch(self, now: float) -> int:
+        """Oldest bucket epoch that cannot have been overwritten yet"""
+        return self.epoch_of(now) - len(self._buckets) + 1
+
+    def record(self, timestamp: float, **call):
+        epoch = self.epoch_of(timestamp)
+        with self._lock:
+            bucket = self._buckets[epoch % len(self._buckets)]
+            if bucket.epoch != epoch:
+                if bucket.epoch > epoch:
+                    return  # Older than the retention window
+                bucket.reset(epoch)
+            bucket.add_call(**call)
+
+    def merge_into(self, total: CallBucket, first_epoch: int, last_epoch: int):
+        """Add buckets with first_epoch <= epoch <= last_epoch to `total`"""
+        if first_epoch > last_epoch:
+            return
+        with self._lock:
+            if last_epoch - first_epoch + 1 < len(self._buckets):
+                candidates = (self._buckets[e % len(self._buckets)] for e in range(first_epoch, last_epoch + 1))
+            else:
+                candidates = iter(self._buckets)
+            for bucket in candidates:
+                if first_epoch <= bucket.epoch <= last_epoch:
+                    total.merge(bucket)
+
+    def to_state(self) -> list:
+        """Non-empty buckets only"""
+        with self._lock:
+            return [bucket.to_state() for bucket in self._buckets if bucket.calls]
+
+    def load_state(self, state: list):
+        with self._lock:
+            for bucket_state in state:
+                bucket = CallBucket.from_state(bucket_state)
+                self._buckets[bucket.epoch % len(self._buckets)] = bucket
+
+
+class CallTimeBuckets:
+    """
+    Minute and hour rings answering aggregate queries over arbitrary ranges
+
+    A range is split into whole hours (hour ring) and the partial hours at
+    either edge (minute ring), so results are exact to the minute while the
+    edges fall inside the minute retention, and to the hour beyond it.
+
+    Args:
+        minute_buckets: Minute-ring retention (default 25 hours, so a 24h window stays minute-exact)
+        hour_buckets: Hour-ring retention (default 35 days)
+    """
+
+    def __init__(self, minute_buckets: int = 25 * 60, hour_buckets: int = 35 * 24):
+        self.minutes = BucketRing(60, minute_buckets)
+        self.hours = BucketRing(3600, hour_buckets)
+
+    def record(
+        self,
+        timestamp: float,
+        duration: int,
+        is_emergency: bool = False,
+        outcome: str = "completed",
+        response_time: Optional[int] = None,
+        quality_score: Optional[float] = None
+    ):
+        """Add one call to both rings (timestamp in epoch seconds)"""
+        call = {
+            "duration": duration,
+            "is_emergency": is_emergency,
+            "outcome": outcome,
+            "response_time": response_time,
+            "quality_score": quality_score,
+        }
+        self.minutes.record(timestamp, **call)
+        self.hours.record(timestamp, **call)
+
+    def covers(self, start: float, now: Optional[float] = None) -> bool:
+        """Whether a range starting at `start` is still fully retained"""
+        now = time.time() if now is None else now
+        return self.hours.epoch_of(start) >= self.hours.oldest_epoch(now)
+
+    def aggregate(self, start: float, end: float, now: Optional[float] = None) -> CallBucket:
+        """
+        Totals for calls with start <= timestamp <= end
+
+        Args:
+            start: Range start (epoch seconds)
+            end: Range end (epoch seconds)
+            now: Reference time for retention checks (defaults to time.time())
+
+        Returns:
+            CallBucket holding the merged counters
+        """
+        now = time.time() if now is None else now
+        total = CallBucket()
+        if start > end:
+            return total
+
+        first_hour = int(math.ceil(start / 3600))
+        end_hour = int(end // 3600)  # Hour containing `end`, only partially in range
+        if first_hour >= end_hour:
+            self._merge_edge(total, start, end, now)
+            return total
+
+        self.hours.merge_into(total, max(first_hour, self.hours.oldest_epoch(now)), end_hour - 1)
+        if start < first_hour * 3600:
+            self._merge_edge(total, start, first_hour * 3600 - 1, now)
+        self._merge_edge(total, end_hour * 3600, end, now)
+        return total
+
+    def _merge_edge(self, total: CallBucket, start: float, end: float, now: float):
+        # Sub-hour range: minute precision when retained, otherwise the whole hour(s)
+        first_minute, last_minute = self.minutes.epoch_of(start), self.minutes.epoch_of(end)
+        if first_minute >= self.minutes.oldest_epoch(now):
+            self.minutes.merge_into(total, first_minute, last_minute)
+        else:
+            self.hours.merge_into(total, self.hours.epoch_of(start), self.hours.epoch_of(end))
+
+    def to_state(self) -> Dict[str, list]:
+        return {"minutes": self.minutes.to_state(), "hours": self.hours.to_state()}
+
+    def load_state(self, state: Dict[str, list]):
+        self.minutes.load_state(state["minutes"])
+        self.hours.load_state(state["hours"])
@@ -0,0 +1,291 @@
+"""
+Request-scoped Latency Tracing
+Lightweight spans propagated through contextvars, so nested stages of one
+webhook (parsing, triage, Ollama, DB commit, broadcast, TwiML) share a trace
+even across awaits. Finished spans are exported from a background thread to
+an NDJSON file or an OTLP/HTTP (JSON) collector.
+"""
+
+import atexit
+import contextvars
+import functools
+import inspect
+import json
+import logging
+import queue
+import random
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("current_span", default=None)
+
+
+class Span:
+    """One timed operation within a trace"""
+
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "start_ns", "end_ns", "attributes", "status")
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], attributes: Dict[str, Any]):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = "%016x" % random.getrandbits(64)
+        self.parent_id = parent_id
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.attributes = attributes
+        self.status = "OK"
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    @property
+    def duration_ms(self) -> float:
+        end_ns = self.end_ns if self.end_ns is not None else time.time_ns()
+        return (end_ns - self.start_ns) / 1_000_000
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "duration_ms": round(self.duration_ms, 3),
+            "status": self.status,
+            "attributes": self.attributes,
+        }
+
+
+class _NoopSpan:
+    """Returned when tracing is disabled so call sites never need to check"""
+
+    __slots__ = ()
+
+    def set_attribute(self, key: str, value: Any):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class _ActiveSpan:
+    """Context manager that activates a span for the current task/thread"""
+
+    __slots__ = ("tracer", "span", "token")
+
+    def __init__(self, tracer: "Tracer", span: Span):
+        self.tracer = tracer
+        self.span = span
+        self.token = None
+
+    def __enter__(self) -> Span:
+        self.token = _current_span.set(self.span)
+        return self.span
+
+    def __exit__(self, exc_type, exc, tb):
+        span = self.span
+        span.end_ns = time.time_ns()
+        if exc is not None:
+            span.status = "ERROR"
+            span.attributes["error"] = f"{exc_type.__name__}: {exc}"
+        _current_span.reset(self.token)
+        self.tracer.exporter.export(span)
+        return False
+
+
+class SpanExporter(ABC):
+    """
+    Batches finished spans on a queue and ships them from a daemon thread
+
+    Subclasses implement export_batch(); request handlers only pay for a
+    queue put.
+    """
+
+    def __init__(self, batch_size: int = 256, flush_interval: float = 1.0):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"{type(self).__name__}", daemon=True)
+        self._thread.start()
+        atexit.register(self.shutdown)
+
+    def export(self, span: Span):
+        self._queue.put(span)
+
+    @abstractmethod
+    def export_batch(self, spans: List[Span]):
+        """Ship one batch of finished spans (called on the exporter thread)"""
+
+    def _run(self):
+        while not self._stopped.is_set() or not self._queue.empty():
+            batch = []
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+            if batch:
+                try:
+                    self.export_batch(batch)
+                except Exception as e:
+                    logger.warning(f"⚠️ Span export failed ({len(batch)} spans dropped): {e}")
+
+    def shutdown(self):
+        """Flush remaining spans and stop the export thread"""
+        if not self._stopped.is_set():
+            self._stopped.set()
+            self._thread.join(timeout=5)
+
+
+class FileSpanExporter(SpanExporter):
+    """Appends one JSON object per span to a local NDJSON file"""
+
+    def __init__(self, path: str, **kwargs):
+        self.path = path
+        super().__init__(**kwargs)
+
+    def export_batch(self, spans: List[Span]):
+        with open(self.path, "a") as f:
+            for span in spans:
+                f.write(json.dumps(span.to_dict(), default=str))
+                f.write("\n")
+
+
+class OTLPHttpSpanExporter(SpanExporter):
+    """Posts spans to an OTLP/HTTP collector using the JSON encoding"""
+
+    def __init__(self, endpoint: str, service_name: str, timeout: float = 2.0, **kwargs):
+        import requests
+
+        self.endpoint = endpoint
+        self.service_name = service_name
+        self.timeout = timeout
+        self._session = requests.Session()
+        self._session.headers["Content-Type"] = "application/json"
+        super().__init__(**kwargs)
+
+    def export_batch(self, spans: List[Span]):
+        payload = {
+            "resourceSpans": [{
+                "resource": {"attributes": [_otlp_attribute("service.name", self.service_name)]},
+                "scopeSpans": [{
+                    "scope": {"name": "hackaura.tracing"},
+                    "spans": [_otlp_span(span) for span in spans],
+                }],
+            }]
+        }
+        response = self._session.post(self.endpoint, data=json.dumps(payload, default=str), timeout=self.timeout)
+        response.raise_for_status()
+
+
+def _otlp_attribute(key: str, value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+def _otlp_span(span: Span) -> Dict[str, Any]:
+    otlp = {
+        "traceId": span.trace_id,
+        "spanId": span.span_id,
+        "name": span.name,
+        "kind": 1,  # SPAN_KIND_INTERNAL
+        "startTimeUnixNano": str(span.start_ns),
+        "endTimeUnixNano": str(span.end_ns),
+        "attributes": [_otlp_attribute(k, v) for k, v in span.attributes.items()],
+        "status": {"code": 2 if span.status == "ERROR" else 1},
+    }
+    if span.parent_id:
+        otlp["parentSpanId"] = span.parent_id
+    return otlp
+
+
+class Tracer:
+    """Creates spans; a tracer without an exporter hands out no-op spans"""
+
+    def __init__(self, exporter: Optional[SpanExporter] = None):
+        self.exporter = exporter
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+
+    def span(self, name: str, **attributes):
+        """
+        Time a block as a child of the current span
+
+        Usage:
+            with tracer.span("db.commit", table="call_records") as span:
+                ...
+        """
+        if self.exporter is None:
+            return _NOOP_SPAN
+        parent = _current_span.get()
+        if parent is None:
+            span = Span(name, "%032x" % random.getrandbits(128), None, attributes)
+        else:
+            span = Span(name, parent.trace_id, parent.span_id, attributes)
+        return _ActiveSpan(self, span)
+
+    def current_span(self):
+        """The active span, or a no-op span outside of any trace"""
+        return _current_span.get() or _NOOP_SPAN
+
+    def traced(self, name: str):
+        """Decorator wrapping a sync or async function in a span"""
+        def decorator(func):
+            if inspect.iscoroutinefunction(func):
+                @functools.wraps(func)
+                async def async_wrapper(*args, **kwargs):
+                    with self.span(name):
+                        return await func(*args, **kwargs)
+                return async_wrapper
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.span(name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+
+def create_tracer() -> Tracer:
+    """Build the tracer selected by TRACING_EXPORTER"""
+    exporter_name = settings.TRACING_EXPORTER.lower()
+
+    if exporter_name == "file":
+        logger.info(f"🔭 Tracing: spans written to {settings.TRACING_FILE_PATH}")
+        return Tracer(FileSpanExporter(settings.TRACING_FILE_PATH))
+
+    if exporter_name == "otlp":
+        logger.info(f"🔭 Tracing: spans sent to {settings.TRACING_OTLP_ENDPOINT}")
+        return Tracer(OTLPHttpSpanExporter(settings.TRACING_OTLP_ENDPOINT, settings.SYSTEM_NAME))
+
+    if exporter_name not in ("none", ""):
+        logger.warning(f"Unknown TRACING_EXPORTER '{exporter_name}', tracing disabled")
+    return Tracer()
+
+
+# Global instance
+tracer = create_tracer()
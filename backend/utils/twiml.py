@@ -0,0 +1,132 @@
+"""
+TwiML rendering without the builder
+
+TwiML documents are written once as text with $name slots and compiled into
+literal chunks; rendering joins the chunks with the escaped slot values and
+encodes the result. A document without slots is encoded once at compile
+time and returned as-is on every call. Slot values are always XML-escaped
+and stripped of control characters XML does not allow, so caller speech or
+model output cannot inject markup into a response.
+
+The helpers below produce the same markup as twilio's VoiceResponse builder
+(attributes sorted by name, self-closing tags as "<Hangup />"), so a
+compiled template renders byte-for-byte what the builder would.
+"""
+
+import re
+from string import Template
+from typing import Dict, List, Optional, Tuple
+
+XML_DECLARATION = '<?xml version="1.0" encoding="UTF-8"?>'
+
+_INVALID_XML_CHARS = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]")
+
+
+def escape(value) -> str:
+    """XML-escape element text (chained replaces, as ElementTree does: far cheaper than str.translate)"""
+    text = str(value)
+    if _INVALID_XML_CHARS.search(text):
+        text = _INVALID_XML_CHARS.sub("", text)
+    if "&" in text:
+        text = text.replace("&", "&amp;")
+    if "<" in text:
+        text = text.replace("<", "&lt;")
+    if ">" in text:
+        text = text.replace(">", "&gt;")
+    return text
+
+
+def _escape_attribute(value) -> str:
+    return escape(value).replace('"', "&quot;").replace("\n", "&#10;")
+
+
+class TwimlTemplate:
+    """
+    Compiled TwiML document
+
+    Args:
+        body: The markup inside <Response>, with $name / ${name} slots in
+            element text ($$ for a literal dollar sign)
+    """
+
+    def __init__(self, body: str):
+        source = f"{XML_DECLARATION}<Response>{body}</Response>"
+        chunks: List[str] = []  # chunks[i] is the literal text before slot i; the last one follows the last slot
+        slots: List[str] = []
+        literal = ""
+        position = 0
+        for match in Template.pattern.finditer(source):
+            if match.group("invalid") is not None:
+                raise ValueError(f"Invalid TwiML template slot at offset {match.start()}")
+            literal += source[position:match.start()]
+            position = match.end()
+            if match.group("escaped") is not None:
+                literal += "$"
+            else:
+                chunks.append(literal)
+                slots.append(match.group("named") or match.group("braced"))
+                literal = ""
+        chunks.append(literal + source[position:])
+        self.slots: Tuple[str, ...] = tuple(slots)
+        self._chunks = chunks
+        self._static = chunks[0].encode("utf-8") if not slots else None
+
+    def render(self, **values) -> bytes:
+        """The document with every slot filled in (escaped); static documents are pre-encoded"""
+        if self._static is not None:
+            return self._static
+        chunks = self._chunks
+        parts = [chunks[0]]
+        for index, name in enumerate(self.slots):
+            parts.append(escape(values[name]))
+            parts.append(chunks[index + 1])
+        return "".join(parts).encode("utf-8")
+
+
+def element(tag: str, attributes: Dict[str, object], body: Optional[str] = None) -> str:
+    """
+    Markup for one verb, safe to embed in a template body
+
+    Args:
+        tag: Verb name (Say, Gather, Pause, Hangup ...)
+        attributes: TwiML attribute names and values; None values are left out
+        body: Inner markup, used as-is (None for a self-closing verb)
+    """
+    rendered = "".join(
+        f' {name}="{_escape_attribute(value)}"'
+        for name, value in sorted(attributes.items())
+        if value is not None
+    ).replace("$", "$$")
+    if body is None:
+        return f"<{tag}{rendered} />"
+    return f"<{tag}{rendered}>{body}</{tag}>"
+
+
+def say(text: str, voice: str, language: Optional[str] = "en-US") -> str:
+    """<Say> with fixed text, escaped now (at template build time)"""
+    return element("Say", {"voice": voice, "language": language}, escape(text).replace("$", "$$"))
+
+
+def say_slot(slot: str, voice: str, language: Optional[str] = "en-US") -> str:
+    """<Say> speaking the value of a template slot"""
+    return element("Say", {"voice": voice, "language": language}, f"${{{slot}}}")
+
+
+def gather(
+    body: str,
+    action: str,
+    timeout: int,
+    speech_timeout: Optional[int] = None,
+    speech_model: Optional[str] = None,
+    language: Optional[str] = "en-US"
+) -> str:
+    """<Gather input="speech" method="POST"> around body"""
+    return element("Gather", {
+        "input": "speech",
+        "timeout": timeout,
+        "action": action,
+        "method": "POST",
+        "language": language,
+        "speechTimeout": speech_timeout,
+        "speechModel": speech_model,
+    }, body)